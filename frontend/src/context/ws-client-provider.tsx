@@ -255,6 +255,10 @@ export function WsClientProvider({
     }
   }
 
+  function handleMessageBatch(events: Record<string, unknown>[]) {
+    events.forEach(handleMessage);
+  }
+
   function handleDisconnect(data: unknown) {
     setWebSocketStatus("DISCONNECTED");
     const sio = sioRef.current;
@@ -314,6 +318,7 @@ export function WsClientProvider({
       latest_event_id: lastEvent?.id ?? -1,
       conversation_id: conversationId,
       providers_set: providers,
+      batch_events: true,
       session_api_key: conversation.session_api_key, // Have to set here because socketio doesn't support custom headers. :(
     };
 
@@ -330,6 +335,7 @@ export function WsClientProvider({
     });
     sio.on("connect", handleConnect);
     sio.on("oh_event", handleMessage);
+    sio.on("oh_event_batch", handleMessageBatch);
     sio.on("connect_error", handleError);
     sio.on("connect_failed", handleError);
     sio.on("disconnect", handleDisconnect);
@@ -339,6 +345,7 @@ export function WsClientProvider({
     return () => {
       sio.off("connect", handleConnect);
       sio.off("oh_event", handleMessage);
+      sio.off("oh_event_batch", handleMessageBatch);
       sio.off("connect_error", handleError);
       sio.off("connect_failed", handleError);
       sio.off("disconnect", handleDisconnect);
@@ -71,7 +71,6 @@ from openhands.events.observation import (
 from openhands.events.serialization.event import truncate_content
 from openhands.llm.llm import LLM
 from openhands.llm.metrics import Metrics, TokenUsage
-from openhands.memory.view import View
 from openhands.storage.files import FileStore
 
 # note: RESUME is only available on web GUI
@@ -946,7 +945,7 @@ class AgentController:
 
     def _handle_long_context_error(self) -> None:
         # When context window is exceeded, keep roughly half of agent interactions
-        current_view = View.from_events(self.state.history)
+        current_view = self.state.view
         kept_events = self._apply_conversation_window(current_view.events)
         kept_event_ids = {e.id for e in kept_events}
 
@@ -12,6 +12,10 @@ from openhands.controller.state.control_flags import (
     BudgetControlFlag,
     IterationControlFlag,
 )
+from openhands.controller.state.state_snapshot import (
+    SnapshotNotSerializable,
+    StateSnapshotWriter,
+)
 from openhands.core.logger import openhands_logger as logger
 from openhands.core.schema import AgentState
 from openhands.events.action import (
@@ -20,7 +24,7 @@ from openhands.events.action import (
 from openhands.events.action.agent import AgentFinishAction
 from openhands.events.event import Event, EventSource
 from openhands.llm.metrics import Metrics
-from openhands.memory.view import View
+from openhands.memory.view import View, ViewBuilder
 from openhands.storage.files import FileStore
 from openhands.storage.locations import get_conversation_agent_state_filename
 
@@ -64,7 +68,7 @@ class State:
 
     - Data for saving and restoring the agent:
       - save to and restore from a session
-      - serialize with pickle and base64
+      - serialize as a versioned JSON snapshot, with append-only logs of metrics
 
     - Save / restore data about message history
       - start and end IDs for events in agent's history
@@ -119,33 +123,98 @@ class State:
     def save_to_session(
         self, sid: str, file_store: FileStore, user_id: str | None
     ) -> None:
-        pickled = pickle.dumps(self)
         logger.debug(f'Saving state to session {sid}:{self.agent_state}')
-        encoded = base64.b64encode(pickled).decode('utf-8')
+        writer = self._get_snapshot_writer(sid, user_id)
         try:
-            file_store.write(
-                get_conversation_agent_state_filename(sid, user_id), encoded
-            )
-
-            # see if state is in the old directory on saas/remote use cases and delete it.
-            if user_id:
-                filename = get_conversation_agent_state_filename(sid)
+            try:
+                writer.save(self, file_store)
+            except SnapshotNotSerializable as e:
+                # Fall back to a pickle, which restore_from_session still reads
+                logger.debug(f'Saving state to session as a pickle: {e}')
+                self._save_pickle(sid, file_store, user_id)
+                self._snapshot_writer = StateSnapshotWriter(sid, user_id)
                 try:
-                    file_store.delete(filename)
+                    file_store.delete(writer.path)
                 except Exception:
                     pass
+                return
+
+            if not writer.removed_legacy_snapshots:
+                # see if state was pickled, or is in the old directory on saas/remote
+                # use cases, and delete it.
+                filenames = [get_conversation_agent_state_filename(sid, user_id)]
+                if user_id:
+                    filenames.append(get_conversation_agent_state_filename(sid))
+                for filename in filenames:
+                    try:
+                        file_store.delete(filename)
+                    except Exception:
+                        pass
+                writer.removed_legacy_snapshots = True
         except Exception as e:
             logger.error(f'Failed to save state to session: {e}')
             raise e
 
+    def _save_pickle(
+        self, sid: str, file_store: FileStore, user_id: str | None
+    ) -> None:
+        pickled = pickle.dumps(self)
+        encoded = base64.b64encode(pickled).decode('utf-8')
+        file_store.write(get_conversation_agent_state_filename(sid, user_id), encoded)
+
+        # see if state is in the old directory on saas/remote use cases and delete it.
+        if user_id:
+            filename = get_conversation_agent_state_filename(sid)
+            try:
+                file_store.delete(filename)
+            except Exception:
+                pass
+
+    def _get_snapshot_writer(
+        self, sid: str, user_id: str | None
+    ) -> StateSnapshotWriter:
+        writer = getattr(self, '_snapshot_writer', None)
+        if writer is None or not writer.is_for(sid, user_id):
+            writer = self._snapshot_writer = StateSnapshotWriter(sid, user_id)
+        return writer
+
     @staticmethod
     def restore_from_session(
         sid: str, file_store: FileStore, user_id: str | None = None
     ) -> 'State':
         """
         Restores the state from the previously saved session.
+
+        Falls back to the pickled state saved by earlier versions.
         """
 
+        state: State
+        writer = StateSnapshotWriter(sid, user_id)
+        try:
+            state = writer.load(file_store)
+            state._snapshot_writer = writer
+        except FileNotFoundError:
+            state = State._restore_pickle(sid, file_store, user_id)
+        except Exception as e:
+            logger.debug(f'Could not restore state from session: {e}')
+            raise e
+
+        # update state
+        if state.agent_state in RESUMABLE_STATES:
+            state.resume_state = state.agent_state
+        else:
+            state.resume_state = None
+
+        # first state after restore
+        state.agent_state = AgentState.LOADING
+
+        # We don't need to clean up deprecated fields here
+        # They will be handled by __getstate__ when the state is saved again
+
+        return state
+
+    @staticmethod
+    def _restore_pickle(sid: str, file_store: FileStore, user_id: str | None) -> State:
         state: State
         try:
             encoded = file_store.read(
@@ -168,19 +237,6 @@ class State:
         except Exception as e:
             logger.debug(f'Could not restore state from session: {e}')
             raise e
-
-        # update state
-        if state.agent_state in RESUMABLE_STATES:
-            state.resume_state = state.agent_state
-        else:
-            state.resume_state = None
-
-        # first state after restore
-        state.agent_state = AgentState.LOADING
-
-        # We don't need to clean up deprecated fields here
-        # They will be handled by __getstate__ when the state is saved again
-
         return state
 
     def __getstate__(self) -> dict:
@@ -192,6 +248,8 @@ class State:
         # history after that gets reloaded.
         state.pop('_history_checksum', None)
         state.pop('_view', None)
+        state.pop('_view_builder', None)
+        state.pop('_snapshot_writer', None)
 
         # Remove deprecated fields before pickling
         state.pop('iteration', None)
@@ -289,15 +347,19 @@ class State:
 
     @property
     def view(self) -> View:
-        # Compute a simple checksum from the history to see if we can re-use any
-        # cached view.
-        history_checksum = len(self.history)
-        old_history_checksum = getattr(self, '_history_checksum', -1)
-
-        # If the history has changed, we need to re-create the view and update
-        # the caching.
-        if history_checksum != old_history_checksum:
-            self._history_checksum = history_checksum
-            self._view = View.from_events(self.history)
-
-        return self._view
+        # The view is maintained incrementally as events are appended to the history,
+        # and rebuilt when the history is replaced.
+        return self._get_view_builder().get_view(self.history)
+
+    @property
+    def view_generation(self) -> int:
+        """A counter that increases whenever the view changes, for caching what is derived from it."""
+        view_builder = self._get_view_builder()
+        view_builder.get_view(self.history)
+        return view_builder.generation
+
+    def _get_view_builder(self) -> ViewBuilder:
+        view_builder = getattr(self, '_view_builder', None)
+        if view_builder is None:
+            view_builder = self._view_builder = ViewBuilder()
+        return view_builder
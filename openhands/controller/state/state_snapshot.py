@@ -0,0 +1,234 @@
+"""Incremental, versioned snapshots of the State of an agent.
+
+A snapshot is a JSON document holding the scalar fields of the State, while the lists
+of costs, response latencies and token usages of its metrics, which grow with the
+length of the conversation, are kept in append-only JSON lines logs:
+
+    agent_state.json                   {"version": 1, "iteration_flag": {...}, "metrics": {...}, ...}
+    agent_state_metrics.jsonl          lines of the form {"start": [0, 0, 0], "costs": [...], ...}
+    agent_state_parent_metrics.jsonl   the same, for the parent metrics snapshot of a delegate
+
+Each save appends only the metrics entries added since the previous save, and skips
+writing the document when it has not changed. A log line replaces the entries of each
+list from its `start` offset onwards, and the document records how many entries of
+each list it covers, so a line torn or appended after the last document was written
+is ignored on restore.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import asdict
+from typing import TYPE_CHECKING, Any
+
+from pydantic import BaseModel, TypeAdapter
+
+from openhands.controller.state.control_flags import (
+    BudgetControlFlag,
+    IterationControlFlag,
+)
+from openhands.core.logger import openhands_logger as logger
+from openhands.core.schema import AgentState
+from openhands.llm.metrics import Cost, Metrics, ResponseLatency, TokenUsage
+from openhands.storage.files import FileStore
+from openhands.storage.locations import (
+    get_conversation_agent_metrics_log_filename,
+    get_conversation_agent_state_json_filename,
+)
+
+if TYPE_CHECKING:
+    from openhands.controller.state.state import State
+
+STATE_SNAPSHOT_VERSION = 1
+
+# The metrics lists kept in the logs, and validators for their entries
+_METRICS_LISTS: tuple[tuple[str, TypeAdapter], ...] = (
+    ('costs', TypeAdapter(list[Cost])),
+    ('response_latencies', TypeAdapter(list[ResponseLatency])),
+    ('token_usages', TypeAdapter(list[TokenUsage])),
+)
+
+_PARENT_METRICS = 'parent_metrics'
+
+
+class SnapshotNotSerializable(ValueError):
+    """Raised when the free-form fields of a State do not survive a JSON round trip."""
+
+
+def _json_field(name: str, value: dict) -> dict:
+    # inputs, outputs and extra_data may hold anything, e.g. tuples or non-string
+    # keys that JSON would silently change, so they must round trip exactly
+    try:
+        if json.loads(json.dumps(value)) == value:
+            return value
+    except (TypeError, ValueError):
+        pass
+    raise SnapshotNotSerializable(f'State field {name} is not JSON serializable')
+
+
+class MetricsLog:
+    """Persists a Metrics object, appending only the entries added since the last save."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        # list name -> (number of entries persisted, last entry persisted)
+        self._persisted: dict[str, tuple[int, BaseModel | None]] = {
+            name: (0, None) for name, _ in _METRICS_LISTS
+        }
+
+    def save(self, metrics: Metrics, file_store: FileStore) -> dict[str, Any]:
+        """Append the new metrics entries to the log, and return the scalars and counts to record in the snapshot."""
+        starts = []
+        line: dict[str, Any] = {}
+        persisted = {}
+        for name, _ in _METRICS_LISTS:
+            entries: list[BaseModel] = getattr(metrics, name)
+            count, last = self._persisted[name]
+            # Lists are only appended to, but may have been replaced, e.g. by another Metrics
+            if count and (len(entries) < count or entries[count - 1] != last):
+                count = 0
+            starts.append(count)
+            if len(entries) > count:
+                line[name] = [entry.model_dump() for entry in entries[count:]]
+            persisted[name] = (len(entries), entries[-1] if entries else None)
+        if line or starts != [count for count, _ in self._persisted.values()]:
+            contents = json.dumps({'start': starts, **line}) + '\n'
+            file_store.append(self.path, contents)
+        self._persisted = persisted
+        return {
+            'model_name': metrics.model_name,
+            'accumulated_cost': metrics.accumulated_cost,
+            'accumulated_token_usage': metrics.accumulated_token_usage.model_dump(),
+            'counts': [count for count, _ in persisted.values()],
+        }
+
+    def load(self, data: dict[str, Any], file_store: FileStore) -> Metrics:
+        """Restore the metrics recorded in a snapshot from the log."""
+        lists: dict[str, list[dict]] = {name: [] for name, _ in _METRICS_LISTS}
+        try:
+            contents = file_store.read(self.path)
+        except FileNotFoundError:
+            contents = ''
+        for raw in contents.splitlines():
+            try:
+                line = json.loads(raw)
+                for (name, _), start in zip(_METRICS_LISTS, line['start']):
+                    entries = lists[name]
+                    del entries[start:]
+                    entries.extend(line.get(name, []))
+            except (ValueError, KeyError, TypeError):
+                # A torn line at the end of the log was not covered by the snapshot
+                logger.debug(f'Skipping invalid metrics log line in {self.path}')
+        metrics = Metrics(model_name=data['model_name'])
+        metrics._accumulated_cost = data['accumulated_cost']
+        metrics._accumulated_token_usage = TokenUsage.model_validate(
+            data['accumulated_token_usage']
+        )
+        persisted = {}
+        for (name, adapter), count in zip(_METRICS_LISTS, data['counts']):
+            if len(lists[name]) < count:
+                raise ValueError(f'Metrics log {self.path} is missing entries')
+            entries = adapter.validate_python(lists[name][:count])
+            setattr(metrics, f'_{name}', entries)
+            persisted[name] = (count, entries[-1] if entries else None)
+        self._persisted = persisted
+        return metrics
+
+
+class StateSnapshotWriter:
+    """Saves and restores the snapshots of a State, remembering what was already persisted.
+
+    A writer assumes it is the only one saving the state of its conversation, as every
+    save appends to the metrics logs.
+    """
+
+    def __init__(self, sid: str, user_id: str | None) -> None:
+        self.sid = sid
+        self.user_id = user_id
+        self.path = get_conversation_agent_state_json_filename(sid, user_id)
+        self._metrics_log = MetricsLog(
+            get_conversation_agent_metrics_log_filename(sid, user_id)
+        )
+        self._parent_metrics_log = MetricsLog(
+            get_conversation_agent_metrics_log_filename(sid, user_id, _PARENT_METRICS)
+        )
+        self._last_contents: str | None = None
+        # Whether pickled snapshots left by earlier versions were deleted
+        self.removed_legacy_snapshots = False
+
+    def is_for(self, sid: str, user_id: str | None) -> bool:
+        return self.sid == sid and self.user_id == user_id
+
+    def save(self, state: State, file_store: FileStore) -> bool:
+        """Save the state, returning whether the snapshot document had to be written.
+
+        Raise a SnapshotNotSerializable error, before writing anything, if the state
+        cannot be saved in this format.
+        """
+        fields = {
+            'inputs': _json_field('inputs', state.inputs),
+            'outputs': _json_field('outputs', state.outputs),
+            'extra_data': _json_field('extra_data', state.extra_data),
+        }
+        parent_metrics = None
+        if state.parent_metrics_snapshot is not None:
+            parent_metrics = self._parent_metrics_log.save(
+                state.parent_metrics_snapshot, file_store
+            )
+        data = {
+            'version': STATE_SNAPSHOT_VERSION,
+            'session_id': state.session_id,
+            'iteration_flag': asdict(state.iteration_flag),
+            'budget_flag': state.budget_flag and asdict(state.budget_flag),
+            'confirmation_mode': state.confirmation_mode,
+            'agent_state': state.agent_state.value,
+            'resume_state': state.resume_state and state.resume_state.value,
+            'metrics': self._metrics_log.save(state.metrics, file_store),
+            'delegate_level': state.delegate_level,
+            'start_id': state.start_id,
+            'end_id': state.end_id,
+            'parent_metrics_snapshot': parent_metrics,
+            'parent_iteration': state.parent_iteration,
+            'last_error': state.last_error,
+            **fields,
+        }
+        contents = json.dumps(data)
+        if contents == self._last_contents:
+            return False
+        file_store.write(self.path, contents)
+        self._last_contents = contents
+        return True
+
+    def load(self, file_store: FileStore) -> State:
+        """Restore the state from its snapshot. Raise a FileNotFoundError if there is none."""
+        from openhands.controller.state.state import State
+
+        contents = file_store.read(self.path)
+        data = json.loads(contents)
+        version = data.get('version')
+        if version != STATE_SNAPSHOT_VERSION:
+            raise ValueError(f'Unsupported state snapshot version: {version}')
+        budget_flag = data['budget_flag']
+        resume_state = data['resume_state']
+        parent_metrics = data['parent_metrics_snapshot']
+        state = State(
+            session_id=data['session_id'],
+            iteration_flag=IterationControlFlag(**data['iteration_flag']),
+            budget_flag=budget_flag and BudgetControlFlag(**budget_flag),
+            confirmation_mode=data['confirmation_mode'],
+            inputs=data['inputs'],
+            outputs=data['outputs'],
+            agent_state=AgentState(data['agent_state']),
+            resume_state=resume_state and AgentState(resume_state),
+            metrics=self._metrics_log.load(data['metrics'], file_store),
+            delegate_level=data['delegate_level'],
+            start_id=data['start_id'],
+            end_id=data['end_id'],
+            parent_metrics_snapshot=parent_metrics
+            and self._parent_metrics_log.load(parent_metrics, file_store),
+            parent_iteration=data['parent_iteration'],
+            extra_data=data['extra_data'],
+            last_error=data['last_error'],
+        )
+        self._last_contents = contents
+        return state
@@ -155,6 +155,42 @@ class StructuredSummaryCondenserConfig(BaseModel):
     model_config = {'extra': 'forbid'}
 
 
+class TokenBudgetCondenserConfig(BaseModel):
+    """Configuration for TokenBudgetCondenser."""
+
+    type: Literal['token_budget'] = Field('token_budget')
+    llm_config: LLMConfig = Field(
+        ...,
+        description='Configuration of the LLM whose tokenizer and context window the history must fit.',
+    )
+    max_input_tokens: int | None = Field(
+        default=None,
+        description="Token budget of the history. Defaults to the LLM's max_input_tokens.",
+        ge=1,
+    )
+    trigger_fraction: float = Field(
+        default=0.8,
+        description='Fraction of the token budget above which the history is condensed.',
+        gt=0,
+        le=1,
+    )
+    target_fraction: float = Field(
+        default=0.5,
+        description='Fraction of the token budget the history is condensed down to.',
+        gt=0,
+        le=1,
+    )
+
+    # at least one event by default, because the best guess is that it's the user task
+    keep_first: int = Field(
+        default=1,
+        description='Number of initial events to always keep in history.',
+        ge=0,
+    )
+
+    model_config = {'extra': 'forbid'}
+
+
 class CondenserPipelineConfig(BaseModel):
     """Configuration for the CondenserPipeline.
 
@@ -180,6 +216,7 @@ CondenserConfig = (
     | AmortizedForgettingCondenserConfig
     | LLMAttentionCondenserConfig
     | StructuredSummaryCondenserConfig
+    | TokenBudgetCondenserConfig
     | CondenserPipelineConfig
 )
 
@@ -221,7 +258,7 @@ def condenser_config_from_toml_section(
 
         # Handle LLM config reference if needed
         if (
-            condenser_type in ('llm', 'llm_attention')
+            condenser_type in ('llm', 'llm_attention', 'token_budget')
             and 'llm_config' in data
             and isinstance(data['llm_config'], str)
         ):
@@ -284,6 +321,7 @@ def create_condenser_config(condenser_type: str, data: dict) -> CondenserConfig:
         'amortized': AmortizedForgettingCondenserConfig,
         'llm_attention': LLMAttentionCondenserConfig,
         'structured': StructuredSummaryCondenserConfig,
+        'token_budget': TokenBudgetCondenserConfig,
     }
 
     if condenser_type not in condenser_classes:
@@ -32,6 +32,17 @@ class OpenHandsConfig(BaseModel):
         file_store_path: Path to the file store.
         file_store_web_hook_url: Optional url for file store web hook
         file_store_web_hook_headers: Optional headers for file_store web hook
+        file_store_event_format: How conversation events are persisted. 'files' writes one JSON file per event,
+            'segmented' appends them to a few rolling segment files, and needs a local or memory file store
+            without a web hook.
+        file_store_write_behind: Whether to persist events in batches on a background writer thread instead of
+            synchronously as they are added.
+        file_store_write_behind_max_events: Number of buffered events that triggers a write-behind flush.
+        file_store_write_behind_max_delay: Maximum seconds an event is buffered before it is flushed.
+        file_store_write_behind_max_bytes: Size of buffered events, in bytes, that triggers a write-behind flush.
+        file_store_write_behind_fsync: Whether to fsync event files after each write-behind flush.
+        file_store_write_behind_flush_before_dispatch: Whether to hold events back from subscribers until they
+            are persisted.
         save_trajectory_path: Either a folder path to store trajectories with auto-generated filenames, or a designated trajectory file path.
         save_screenshots_in_trajectory: Whether to save screenshots in trajectory (in encoded image format).
         replay_trajectory_path: Path to load trajectory and replay. If provided, trajectory would be replayed first before user's instruction.
@@ -67,6 +78,13 @@ class OpenHandsConfig(BaseModel):
     file_store_path: str = Field(default='~/.openhands')
     file_store_web_hook_url: str | None = Field(default=None)
     file_store_web_hook_headers: dict | None = Field(default=None)
+    file_store_event_format: str = Field(default='files')
+    file_store_write_behind: bool = Field(default=False)
+    file_store_write_behind_max_events: int = Field(default=50)
+    file_store_write_behind_max_delay: float = Field(default=0.2)
+    file_store_write_behind_max_bytes: int = Field(default=1_000_000)
+    file_store_write_behind_fsync: bool = Field(default=False)
+    file_store_write_behind_flush_before_dispatch: bool = Field(default=False)
     save_trajectory_path: str | None = Field(default=None)
     save_screenshots_in_trajectory: bool = Field(default=False)
     replay_trajectory_path: str | None = Field(default=None)
@@ -41,6 +41,10 @@ class SandboxConfig(BaseModel):
         trusted_dirs: List of directories that can be trusted to run the OpenHands CLI.
         vscode_port: The port to use for VSCode. If None, a random port will be chosen.
             This is useful when deploying OpenHands in a remote machine where you need to expose a specific port.
+        max_concurrent_read_only_actions: The maximum number of read-only actions (file reads, listings, git status...)
+            sent to the runtime at the same time. Read-only actions do not wait for the actions that mutate the sandbox.
+        compress_responses: Whether the action execution server compresses its large responses, like observations
+            with long outputs. Worth enabling when the runtime is reached over a slow network.
     """
 
     remote_runtime_api_url: str | None = Field(default='http://localhost:8000')
@@ -83,6 +87,8 @@ class SandboxConfig(BaseModel):
     selected_repo: str | None = Field(default=None)
     trusted_dirs: list[str] = Field(default_factory=list)
     vscode_port: int | None = Field(default=None)
+    max_concurrent_read_only_actions: int = Field(default=4, ge=1)
+    compress_responses: bool = Field(default=False)
     volumes: str | None = Field(
         default=None,
         description="Volume mounts in the format 'host_path:container_path[:mode]', e.g. '/my/host/dir:/workspace:rw'. Multiple mounts can be specified using commas, e.g. '/path1:/workspace/path1,/path2:/workspace/path2:ro'",
@@ -231,46 +231,50 @@ class RollingLogger:
         sys.stdout.flush()
 
 
+# Names of the settings whose values are masked wherever they appear as name=value
+_SENSITIVE_NAMES = [
+    'api_key',
+    'aws_access_key_id',
+    'aws_secret_access_key',
+    'e2b_api_key',
+    'github_token',
+    'jwt_secret',
+    'modal_api_token_id',
+    'modal_api_token_secret',
+    'llm_api_key',
+    'sandbox_env_github_token',
+    'daytona_api_key',
+]
+_SENSITIVE_NAME_PATTERN = re.compile(
+    '('
+    + '|'.join(_SENSITIVE_NAMES + [name.upper() for name in _SENSITIVE_NAMES])
+    + r")='?[\w-]+'?"
+)
+
+
 class SensitiveDataFilter(logging.Filter):
+    """Masks the values of secret environment variables and of sensitive settings in log records.
+
+    The secret values are gathered from the environment once, and again only when
+    the environment changes.
+    """
+
+    def __init__(self, name: str = '') -> None:
+        super().__init__(name)
+        self._environ: dict | None = None
+        self._sensitive_values: list[str] = []
+
     def filter(self, record: logging.LogRecord) -> bool:
-        # Gather sensitive values which should not ever appear in the logs.
-        sensitive_values = []
-        for key, value in os.environ.items():
-            key_upper = key.upper()
-            if (
-                len(value) > 2
-                and value != 'default'
-                and any(s in key_upper for s in ('SECRET', '_KEY', '_CODE', '_TOKEN'))
-            ):
-                sensitive_values.append(value)
+        msg = record.getMessage()
 
         # Replace sensitive values from env!
-        msg = record.getMessage()
-        for sensitive_value in sensitive_values:
-            msg = msg.replace(sensitive_value, '******')
+        for sensitive_value in self._get_sensitive_values():
+            if sensitive_value in msg:
+                msg = msg.replace(sensitive_value, '******')
 
         # Replace obvious sensitive values from log itself...
-        sensitive_patterns = [
-            'api_key',
-            'aws_access_key_id',
-            'aws_secret_access_key',
-            'e2b_api_key',
-            'github_token',
-            'jwt_secret',
-            'modal_api_token_id',
-            'modal_api_token_secret',
-            'llm_api_key',
-            'sandbox_env_github_token',
-            'daytona_api_key',
-        ]
-
-        # add env var names
-        env_vars = [attr.upper() for attr in sensitive_patterns]
-        sensitive_patterns.extend(env_vars)
-
-        for attr in sensitive_patterns:
-            pattern = rf"{attr}='?([\w-]+)'?"
-            msg = re.sub(pattern, f"{attr}='******'", msg)
+        if '=' in msg:
+            msg = _SENSITIVE_NAME_PATTERN.sub(r"\1='******'", msg)
 
         # Update the record
         record.msg = msg
@@ -278,6 +282,21 @@ class SensitiveDataFilter(logging.Filter):
 
         return True
 
+    def _get_sensitive_values(self) -> list[str]:
+        """Get the values which should not ever appear in the logs."""
+        # Comparing the underlying dict is much cheaper than decoding the environment
+        environ = getattr(os.environ, '_data', None)
+        if environ is None or environ != self._environ:
+            self._environ = None if environ is None else dict(environ)
+            self._sensitive_values = [
+                value
+                for key, value in os.environ.items()
+                if len(value) > 2
+                and value != 'default'
+                and any(s in key.upper() for s in ('SECRET', '_KEY', '_CODE', '_TOKEN'))
+            ]
+        return self._sensitive_values
+
 
 def get_console_handler(log_level: int = logging.INFO) -> logging.StreamHandler:
     """Returns a console handler for logging."""
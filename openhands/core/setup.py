@@ -15,6 +15,7 @@ from openhands.core.config import (
 from openhands.core.logger import openhands_logger as logger
 from openhands.events import EventStream
 from openhands.events.event import Event
+from openhands.events.write_behind import WriteBehindConfig
 from openhands.integrations.provider import ProviderToken, ProviderType
 from openhands.llm.llm import LLM
 from openhands.memory.memory import Memory
@@ -52,8 +53,14 @@ def create_runtime(
     session_id = sid or generate_sid(config)
 
     # set up the event stream
-    file_store = get_file_store(config.file_store, config.file_store_path)
-    event_stream = EventStream(session_id, file_store)
+    file_store = get_file_store(
+        config.file_store,
+        config.file_store_path,
+        file_store_event_format=config.file_store_event_format,
+    )
+    event_stream = EventStream(
+        session_id, file_store, write_behind=WriteBehindConfig.from_config(config)
+    )
 
     # set up the security analyzer
     if config.security.security_analyzer:
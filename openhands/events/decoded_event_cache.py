@@ -0,0 +1,83 @@
+import copy
+import os
+import threading
+from collections import OrderedDict
+
+from openhands.events.event import Event
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class DecodedEventCache:
+    """A size bounded LRU cache of deserialized events, shared by all event stores in the process.
+
+    Entries are keyed by conversation id and event id, and their size is the length of
+    the serialized event. Callers always get a shallow copy of the cached event, since
+    consumers of events (e.g. ConversationMemory) reassign their attributes.
+    """
+
+    max_bytes: int
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[tuple[str, int], tuple[Event, int]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, sid: str, id: int) -> Event | None:
+        key = (sid, id)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+        return copy.copy(entry[0])
+
+    def put(self, sid: str, id: int, event: Event, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        key = (sid, id)
+        entry = (copy.copy(event), size)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous[1]
+            self._entries[key] = entry
+            self._size += size
+            while self._size > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._size -= evicted_size
+                self._evictions += 1
+
+    def invalidate(self, sid: str, id: int) -> None:
+        with self._lock:
+            entry = self._entries.pop((sid, id), None)
+            if entry is not None:
+                self._size -= entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def get_stats(self) -> dict[str, int]:
+        """Get counters for monitoring the effectiveness of the cache."""
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'evictions': self._evictions,
+                'entries': len(self._entries),
+                'size_bytes': self._size,
+                'max_bytes': self.max_bytes,
+            }
+
+
+decoded_event_cache = DecodedEventCache(
+    int(os.getenv('EVENT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+)
@@ -1,9 +1,13 @@
 import json
 from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
 from openhands.events.event import Event
 from openhands.events.serialization.event import event_to_dict
 
+if TYPE_CHECKING:
+    from openhands.events.event_index import EventIndexEntry
+
 
 @dataclass
 class EventFilter:
@@ -84,6 +88,48 @@ class EventFilter:
 
         return True
 
+    def may_include(self, entry: 'EventIndexEntry') -> bool:
+        """Determine if an event may be included, based on its index entry.
+
+        All criteria except the text query are checked, so events for which this
+        returns False can be skipped without loading them.
+
+        Args:
+            entry: The index entry of the event to check.
+
+        Returns:
+            bool: False if the event certainly fails the filter criteria, True otherwise.
+        """
+        if self.include_types and not issubclass(entry.event_class, self.include_types):
+            return False
+
+        if self.exclude_types is not None and issubclass(
+            entry.event_class, self.exclude_types
+        ):
+            return False
+
+        if self.source and entry.source != self.source:
+            return False
+
+        if (
+            self.start_date
+            and entry.timestamp is not None
+            and entry.timestamp < self.start_date
+        ):
+            return False
+
+        if (
+            self.end_date
+            and entry.timestamp is not None
+            and entry.timestamp > self.end_date
+        ):
+            return False
+
+        if self.exclude_hidden and entry.hidden:
+            return False
+
+        return True
+
     def exclude(self, event: Event) -> bool:
         """Determine if an event should be excluded based on the filter criteria.
 
@@ -0,0 +1,152 @@
+"""A secondary index of the events of a conversation, for filtering without loading events.
+
+For every complete page of events, the index records the type, source, timestamp and
+hidden flag of each event. Pages are appended as JSON lines to one file per range of
+EVENT_INDEX_SEGMENT_SIZE event ids:
+
+    event_index/{segment_start}.jsonl   lines of the form {"start": 25, "entries": [...]}
+
+Pages that are missing from the index (the last, incomplete page of a conversation, or
+conversations written before the index existed) are simply not indexed, and readers fall
+back to loading their events.
+"""
+
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.events.action.action import Action
+from openhands.events.event import Event
+from openhands.events.serialization.action import ACTION_TYPE_TO_CLASS
+from openhands.events.serialization.observation import OBSERVATION_TYPE_TO_CLASS
+from openhands.storage.files import FileStore
+from openhands.storage.locations import get_conversation_event_index_dir
+
+EVENT_INDEX_SEGMENT_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class EventIndexEntry:
+    """The attributes of an event that EventFilter can check without loading it."""
+
+    event_class: type[Event]
+    source: str | None
+    timestamp: str | None
+    hidden: bool
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> 'EventIndexEntry | None':
+        """Create an entry from a serialized event, or None if its type is unknown."""
+        kind = 'action' if 'action' in data else 'observation'
+        return cls.from_json(
+            [
+                kind,
+                data.get(kind),
+                data.get('source'),
+                data.get('timestamp'),
+                data.get('args' if kind == 'action' else 'extras', {}).get(
+                    'hidden', False
+                ),
+            ]
+        )
+
+    def to_json(self) -> list:
+        if issubclass(self.event_class, Action):
+            kind, type_ = 'action', self.event_class.action  # type: ignore[attr-defined]
+        else:
+            kind, type_ = 'observation', self.event_class.observation  # type: ignore[attr-defined]
+        return [kind, type_, self.source, self.timestamp, self.hidden]
+
+    @classmethod
+    def from_json(cls, value: list) -> 'EventIndexEntry | None':
+        kind, type_, source, timestamp, hidden = value
+        types = ACTION_TYPE_TO_CLASS if kind == 'action' else OBSERVATION_TYPE_TO_CLASS
+        event_class = types.get(type_)
+        if event_class is None:
+            return None
+        return cls(
+            event_class=event_class,
+            source=source,
+            timestamp=timestamp,
+            hidden=bool(hidden),
+        )
+
+
+class EventIndex:
+    """Reads and appends pages of the secondary index of a conversation.
+
+    Index pages are immutable once written, so every page read or written is kept in
+    memory, and each index file is read at most once by an instance.
+    """
+
+    file_store: FileStore
+    page_size: int
+
+    def __init__(
+        self,
+        file_store: FileStore,
+        sid: str,
+        user_id: str | None = None,
+        page_size: int = 25,
+    ) -> None:
+        self.file_store = file_store
+        self.page_size = page_size
+        self._index_dir = get_conversation_event_index_dir(sid, user_id)
+        self._lock = threading.Lock()
+        # page start -> entries, for every page loaded or written
+        self._pages: dict[int, list[EventIndexEntry | None]] = {}
+        self._loaded_segments: set[int] = set()
+
+    def get_entry(self, id: int) -> EventIndexEntry | None:
+        """Get the index entry of an event, or None if it is not indexed."""
+        entries = self.get_page(id - id % self.page_size)
+        if entries is None or id % self.page_size >= len(entries):
+            return None
+        return entries[id % self.page_size]
+
+    def get_page(self, start: int) -> list[EventIndexEntry | None] | None:
+        entries = self._pages.get(start)
+        if entries is not None:
+            return entries
+        segment = start - start % EVENT_INDEX_SEGMENT_SIZE
+        with self._lock:
+            if segment not in self._loaded_segments:
+                self._load_segment(segment)
+        return self._pages.get(start)
+
+    def append_page(self, page: list[dict]) -> None:
+        """Index a complete page of serialized events."""
+        start = page[0]['id']
+        entries = [EventIndexEntry.from_dict(data) for data in page]
+        line = json.dumps(
+            {
+                'start': start,
+                'entries': [entry and entry.to_json() for entry in entries],
+            }
+        )
+        segment = start - start % EVENT_INDEX_SEGMENT_SIZE
+        with self._lock:
+            self.file_store.append(self._segment_path(segment), line + '\n')
+            self._pages[start] = entries
+
+    def _segment_path(self, segment: int) -> str:
+        return f'{self._index_dir}{segment}.jsonl'
+
+    def _load_segment(self, segment: int) -> None:
+        self._loaded_segments.add(segment)
+        try:
+            contents = self.file_store.read(self._segment_path(segment))
+        except FileNotFoundError:
+            return
+        for line in contents.splitlines():
+            try:
+                value = json.loads(line)
+                self._pages[value['start']] = [
+                    entry and EventIndexEntry.from_json(entry)
+                    for entry in value['entries']
+                ]
+            except (ValueError, KeyError, TypeError):
+                # A torn line at the end of the file leaves its page unindexed
+                logger.debug(f'Skipping invalid event index line in {segment}')
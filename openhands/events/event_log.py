@@ -0,0 +1,352 @@
+"""Append-only segmented storage for the events of a conversation.
+
+Instead of writing one JSON file per event, events are appended as length-prefixed
+records to rolling segment files, each holding a fixed number of event ids:
+
+    event_log/{segment_start}.log   records of the form b'{id} {length}\\n{json}\\n'
+    event_log/{segment_start}.idx   sparse index lines of the form '{page} {offset}\\n'
+
+The sparse index stores the byte offset of the first record of each page of events
+(pages line up with the pages of the EventStore cache), so reading any event or page
+is a single ranged read of at most one page of records.
+"""
+
+import json
+import threading
+from itertools import groupby
+from typing import Iterator
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.storage.files import FileStore
+from openhands.storage.locations import get_conversation_event_log_dir
+
+EVENT_LOG_SEGMENT_SIZE = 1000
+# Longer than any record header, b'{id} {length}\n'
+_MAX_HEADER_SIZE = 48
+
+
+def _parse_records(
+    raw: bytes, base_offset: int = 0
+) -> Iterator[tuple[int, int, bytes]]:
+    """Yield (id, offset, payload) for each complete record in raw.
+
+    Parsing stops at the first incomplete record, which is what a torn write at the
+    end of a segment looks like.
+    """
+    pos = 0
+    while pos < len(raw):
+        header_end = raw.find(b'\n', pos)
+        if header_end < 0:
+            return
+        try:
+            id_str, length_str = raw[pos:header_end].split(b' ')
+            id, length = int(id_str), int(length_str)
+        except ValueError:
+            logger.warning(f'Corrupt event log record at offset {base_offset + pos}')
+            return
+        payload_end = header_end + 1 + length
+        if payload_end + 1 > len(raw):
+            return
+        yield id, base_offset + pos, raw[header_end + 1 : payload_end]
+        pos = payload_end + 1
+
+
+class SegmentedEventLog:
+    """An append-only log of serialized events, split into fixed size segments."""
+
+    file_store: FileStore
+    page_size: int
+    segment_size: int
+
+    def __init__(
+        self,
+        file_store: FileStore,
+        sid: str,
+        user_id: str | None = None,
+        page_size: int = 25,
+        segment_size: int = EVENT_LOG_SEGMENT_SIZE,
+    ) -> None:
+        if segment_size % page_size:
+            raise ValueError('segment_size must be a multiple of page_size')
+        self.file_store = file_store
+        self.page_size = page_size
+        self.segment_size = segment_size
+        self._log_dir = get_conversation_event_log_dir(sid, user_id)
+        self._lock = threading.Lock()
+        # segment start -> page -> byte offset of the first record of the page
+        self._indexes: dict[int, dict[int, int]] = {}
+        # Byte size of each segment, only tracked for segments this instance writes to
+        self._segment_sizes: dict[int, int] = {}
+        self._segments: list[int] = []
+        self._writable = False
+
+    @property
+    def segments(self) -> list[int]:
+        """The start ids of the segments known to this log, in order."""
+        return list(self._segments)
+
+    def set_segments(self, segments: list[int]) -> None:
+        """Set the known segments from a previously recorded list, avoiding a listing."""
+        self._segments = sorted(segments)
+
+    def list_segments(self) -> list[int]:
+        """List the start ids of all segments in the log, in order."""
+        try:
+            paths = self.file_store.list(self._log_dir)
+        except FileNotFoundError:
+            return []
+        segments = []
+        for path in paths:
+            name = path.rstrip('/').split('/')[-1]
+            if name.endswith('.log'):
+                try:
+                    segments.append(int(name[: -len('.log')]))
+                except ValueError:
+                    logger.warning(f'Unexpected file in event log: {path}')
+        segments.sort()
+        self._segments = segments
+        return list(segments)
+
+    def exists(self) -> bool:
+        return bool(self.list_segments())
+
+    def get_next_id(self) -> int:
+        """Get the id following the last event in the log, reading only the tail of the last segment."""
+        segments = self._segments or self.list_segments()
+        if not segments:
+            return 0
+        for segment in reversed(segments):
+            offset = self._find_last_record_offset(segment, self._load_index(segment))
+            raw = self.file_store.read_range(self._segment_path(segment), offset)
+            ids = [id for id, _, _ in _parse_records(raw, offset)]
+            if ids:
+                return ids[-1] + 1
+        return 0
+
+    def recover(self) -> None:
+        """Prepare the log for appending.
+
+        Drops index entries that were torn or do not point at a record of their page,
+        truncates a torn record at the end of the last segment and adds any index
+        entries that were lost because a write was interrupted.
+        """
+        with self._lock:
+            self._writable = True
+            segments = self._segments or self.list_segments()
+            if not segments:
+                return
+            segment = segments[-1]
+            path = self._segment_path(segment)
+            index, complete = self._read_index(segment)
+            offset = self._find_last_record_offset(segment, index)
+            # Entries past the last verified one are scanned for again below
+            rewrite = not complete or any(o > offset for o in index.values())
+            index = {p: o for p, o in index.items() if o <= offset}
+            self._indexes[segment] = index
+            raw = self.file_store.read_range(path, offset)
+            end = offset
+            new_entries = []
+            for id, record_offset, payload in _parse_records(raw, offset):
+                page = id // self.page_size
+                if page not in index:
+                    index[page] = record_offset
+                    new_entries.append(f'{page} {record_offset}\n')
+                end = record_offset + len(f'{id} {len(payload)}\n') + len(payload) + 1
+            if rewrite:
+                logger.warning(f'Repairing index of event log segment {path}')
+                self.file_store.write(
+                    self._index_path(segment),
+                    ''.join(f'{p} {o}\n' for p, o in sorted(index.items())),
+                )
+            elif new_entries:
+                self.file_store.append(self._index_path(segment), ''.join(new_entries))
+            if end < offset + len(raw):
+                if _is_torn(raw[end - offset :]):
+                    logger.warning(
+                        f'Truncating torn record at end of event log segment {path}'
+                    )
+                    contents = self.file_store.read_range(path, 0, end)
+                    self.file_store.write(path, contents)
+                else:
+                    # Keep the data after a corrupt record, and append after it
+                    logger.error(f'Corrupt record at offset {end} of {path}')
+                    end = offset + len(raw)
+            self._segment_sizes[segment] = end
+
+    def append(self, id: int, contents: str) -> None:
+        """Append the serialized event with the given id. Ids must be appended in increasing order."""
+        self.append_many([(id, contents)])
+
+    def append_many(self, records: list[tuple[int, str]]) -> list[str]:
+        """Append serialized events, in increasing order of id, with one write per segment.
+
+        Returns the paths of the segments written to.
+        """
+        paths = []
+        with self._lock:
+            self._writable = True
+            for segment, group in groupby(
+                records, key=lambda r: self.segment_for_id(r[0])
+            ):
+                paths.append(self._append_to_segment(segment, list(group)))
+        return paths
+
+    def _append_to_segment(self, segment: int, records: list[tuple[int, str]]) -> str:
+        offset = self._segment_sizes.get(segment, 0)
+        index = self._load_index(segment)
+        data = bytearray()
+        index_entries = []
+        for id, contents in records:
+            payload = contents.encode('utf-8')
+            page = id // self.page_size
+            if page not in index:
+                index[page] = offset + len(data)
+                index_entries.append(f'{page} {offset + len(data)}\n')
+            data += f'{id} {len(payload)}\n'.encode('utf-8') + payload + b'\n'
+        path = self._segment_path(segment)
+        try:
+            # The records are written before the index entries, so the index never points past the data
+            self.file_store.append(path, bytes(data))
+        except Exception:
+            for entry in index_entries:
+                del index[int(entry.split(' ')[0])]
+            raise
+        self._segment_sizes[segment] = offset + len(data)
+        if not self._segments or segment > self._segments[-1]:
+            self._segments.append(segment)
+        if index_entries:
+            try:
+                self.file_store.append(
+                    self._index_path(segment), ''.join(index_entries)
+                )
+            except Exception as e:
+                # The records are already persisted, and readers scan past missing index entries
+                logger.warning(f'Failed to update index of {path}: {e}')
+        return path
+
+    def read_page(self, start: int, end: int) -> tuple[list[dict | None] | None, int]:
+        """Read the events with ids in [start, end), which must lie within one page.
+
+        Returns a list with one entry per id (None for ids not in the log), or None if
+        the log holds no events in the range, along with the length of the events read.
+        """
+        payloads = self._read_payloads(start, end)
+        if not payloads:
+            return None, 0
+        events: list[dict | None] = [None] * (end - start)
+        for id, payload in payloads.items():
+            events[id - start] = json.loads(payload)
+        return events, sum(len(payload) for payload in payloads.values())
+
+    def read(self, id: int) -> tuple[dict, int]:
+        """Read a single event and the length of its record.
+
+        Raise a FileNotFoundError if there is no such event.
+        """
+        start = id - id % self.page_size
+        payload = self._read_payloads(start, start + self.page_size).get(id)
+        if payload is None:
+            raise FileNotFoundError(f'No event {id} in {self._log_dir}')
+        return json.loads(payload), len(payload)
+
+    def _read_payloads(self, start: int, end: int) -> dict[int, bytes]:
+        segment = self.segment_for_id(start)
+        page = start // self.page_size
+        index = self._load_index(segment)
+        offset = index.get(page)
+        if offset is None:
+            # The index entry may have been lost in an interrupted write, so scan from
+            # the closest indexed page before it
+            offset = max((o for p, o in index.items() if p < page), default=0)
+        try:
+            raw = self.file_store.read_range(
+                self._segment_path(segment), offset, index.get(page + 1)
+            )
+        except FileNotFoundError:
+            return {}
+        payloads = {}
+        for id, _, payload in _parse_records(raw):
+            if id >= end:
+                break
+            if id >= start:
+                payloads[id] = payload
+        return payloads
+
+    def segment_for_id(self, id: int) -> int:
+        return id - id % self.segment_size
+
+    def _segment_path(self, segment: int) -> str:
+        return f'{self._log_dir}{segment}.log'
+
+    def _index_path(self, segment: int) -> str:
+        return f'{self._log_dir}{segment}.idx'
+
+    def _load_index(self, segment: int) -> dict[int, int]:
+        # Segments before the last one are sealed, and a writer keeps its own index up
+        # to date, so only the tail of a log being written elsewhere needs rereading
+        index = self._indexes.get(segment)
+        if index is not None:
+            if self._writable or (self._segments and segment < self._segments[-1]):
+                return index
+        index, _ = self._read_index(segment)
+        self._indexes[segment] = index
+        return index
+
+    def _read_index(self, segment: int) -> tuple[dict[int, int], bool]:
+        """Read the index of a segment, and whether all of its lines were complete and valid."""
+        index: dict[int, int] = {}
+        try:
+            contents = self.file_store.read(self._index_path(segment))
+        except FileNotFoundError:
+            return index, True
+        # A line is only complete once its newline is written, so the text after the
+        # last newline is a torn line, which is repaired by recover()
+        lines = contents.split('\n')
+        complete = lines.pop() == ''
+        for line in lines:
+            try:
+                page, offset = line.split(' ')
+                index[int(page)] = int(offset)
+            except ValueError:
+                complete = False
+        return index, complete
+
+    def _find_last_record_offset(self, segment: int, index: dict[int, int]) -> int:
+        """Get the offset of the last indexed page that starts with a record of that page, or 0."""
+        path = self._segment_path(segment)
+        for page, offset in sorted(index.items(), key=lambda e: e[1], reverse=True):
+            start = max(offset - 1, 0)
+            try:
+                raw = self.file_store.read_range(path, start, offset + _MAX_HEADER_SIZE)
+            except FileNotFoundError:
+                return 0
+            # A record starts at the beginning of the segment or after a newline
+            if offset and raw[:1] != b'\n':
+                continue
+            header = raw[offset - start :]
+            header_end = header.find(b'\n')
+            if header_end < 0:
+                continue
+            try:
+                id_str, length_str = header[:header_end].split(b' ')
+                id = int(id_str)
+                int(length_str)
+            except ValueError:
+                continue
+            if id // self.page_size == page:
+                return offset
+        return 0
+
+
+def _is_torn(raw: bytes) -> bool:
+    """Whether raw is the start of a record whose write was interrupted, rather than corrupt data."""
+    header_end = raw.find(b'\n')
+    if header_end < 0:
+        return len(raw) < _MAX_HEADER_SIZE
+    try:
+        id_str, length_str = raw[:header_end].split(b' ')
+        int(id_str)
+        length = int(length_str)
+    except ValueError:
+        return False
+    return header_end + 1 + length + 1 > len(raw)
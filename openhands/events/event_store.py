@@ -1,16 +1,20 @@
 import json
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass, field
 from typing import Iterable
 
 from openhands.core.logger import openhands_logger as logger
+from openhands.events.decoded_event_cache import decoded_event_cache
 from openhands.events.event import Event, EventSource
 from openhands.events.event_filter import EventFilter
+from openhands.events.event_index import EventIndex
+from openhands.events.event_log import SegmentedEventLog
 from openhands.events.event_store_abc import EventStoreABC
-from openhands.events.serialization.event import event_from_dict
+from openhands.events.serialization.event import event_from_dict, event_to_dict
 from openhands.storage.files import FileStore
 from openhands.storage.locations import (
     get_conversation_dir,
     get_conversation_event_filename,
+    get_conversation_event_manifest_filename,
     get_conversation_events_dir,
 )
 from openhands.utils.shutdown_listener import should_continue
@@ -18,9 +22,11 @@ from openhands.utils.shutdown_listener import should_continue
 
 @dataclass(frozen=True)
 class _CachePage:
-    events: list[dict] | None
+    events: list[dict | None] | None
     start: int
     end: int
+    # Length of the serialized page, used to estimate the size of each event
+    size: int = 0
 
     def covers(self, global_index: int) -> bool:
         if global_index < self.start:
@@ -30,16 +36,40 @@ class _CachePage:
         return True
 
     def get_event(self, global_index: int) -> Event | None:
+        data = self.get_event_dict(global_index)
+        if data is None:
+            return None
+        return event_from_dict(data)
+
+    def get_event_dict(self, global_index: int) -> dict | None:
         # If there was not actually a cached page, return None
         if not self.events:
             return None
         local_index = global_index - self.start
-        return event_from_dict(self.events[local_index])
+        # Pages read from a segmented event log may be partial or have gaps
+        if local_index >= len(self.events):
+            return None
+        return self.events[local_index]
+
+    def get_event_size(self) -> int:
+        if not self.events:
+            return 0
+        return self.size // len(self.events)
 
 
 _DUMMY_PAGE = _CachePage(None, 1, -1)
 
 
+@dataclass(frozen=True)
+class _EventManifest:
+    """Summary of the stored events of a conversation, so it can be opened without listing every event."""
+
+    cur_id: int
+    cache_size: int
+    format: str
+    segments: list[int]
+
+
 @dataclass
 class EventStore(EventStoreABC):
     """
@@ -51,10 +81,46 @@ class EventStore(EventStoreABC):
     user_id: str | None
     cur_id: int = -1  # We fix this in post init if it is not specified
     cache_size: int = 25
+    # Set when the conversation is stored in a segmented event log rather than one file per event
+    _event_log: SegmentedEventLog | None = field(default=None, init=False, repr=False)
+    _event_index: EventIndex = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
+        self._event_index = EventIndex(
+            self.file_store, self.sid, self.user_id, page_size=self.cache_size
+        )
+        manifest = self._read_manifest()
+        event_log = SegmentedEventLog(
+            self.file_store, self.sid, self.user_id, page_size=self.cache_size
+        )
+        if manifest is not None:
+            if manifest.format == 'segmented':
+                event_log.set_segments(manifest.segments)
+                self._event_log = event_log
+        elif event_log.exists():
+            # Without a manifest, a log next to events stored one file per event is
+            # either a migration that completed, holding at least the events of the
+            # files, or one that was interrupted, in which case the files are complete
+            if event_log.get_next_id() >= self._get_next_id_from_files():
+                self._event_log = event_log
         if self.cur_id >= 0:
             return
+
+        if manifest is not None:
+            cur_id = self._get_cur_id_from_manifest(manifest)
+            if cur_id is not None:
+                self.cur_id = cur_id
+                return
+            logger.info(f'Event manifest for {self.sid} is stale, scanning events')
+
+        if self._event_log is not None:
+            self._event_log.list_segments()
+            self.cur_id = self._event_log.get_next_id()
+            return
+        self.cur_id = self._get_next_id_from_files()
+
+    def _get_next_id_from_files(self) -> int:
+        """Get the id following the last event stored one file per event, listing them all."""
         events = []
         try:
             events_dir = get_conversation_events_dir(self.sid, self.user_id)
@@ -62,15 +128,13 @@ class EventStore(EventStoreABC):
         except FileNotFoundError:
             logger.debug(f'No events found for session {self.sid} at {events_dir}')
 
-        if not events:
-            self.cur_id = 0
-            return
-
         # if we have events, we need to find the highest id to prepare for new events
+        next_id = 0
         for event_str in events:
             id = self._get_id_from_filename(event_str)
-            if id >= self.cur_id:
-                self.cur_id = id + 1
+            if id >= next_id:
+                next_id = id + 1
+        return next_id
 
     def search_events(
         self,
@@ -112,14 +176,25 @@ class EventStore(EventStoreABC):
         for index in range(start_id, end_id, step):
             if not should_continue():
                 return
-            if not cache_page.covers(index):
-                cache_page = self._load_cache_page_for_index(index)
-            event = cache_page.get_event(index)
+            # Skip events the index rules out without loading them
+            if filter is not None:
+                entry = self._event_index.get_entry(index)
+                if entry is not None and not filter.may_include(entry):
+                    continue
+            event = decoded_event_cache.get(self.sid, index)
             if event is None:
-                try:
-                    event = self.get_event(index)
-                except FileNotFoundError:
-                    event = None
+                if not cache_page.covers(index):
+                    cache_page = self._load_cache_page_for_index(index)
+                event = cache_page.get_event(index)
+                if event is not None:
+                    decoded_event_cache.put(
+                        self.sid, index, event, cache_page.get_event_size()
+                    )
+                else:
+                    try:
+                        event = self._load_event(index)
+                    except FileNotFoundError:
+                        event = None
             if event:
                 if not filter or filter.include(event):
                     yield event
@@ -127,11 +202,67 @@ class EventStore(EventStoreABC):
                     if limit and limit <= num_results:
                         return
 
+    def search_event_dict_pages(
+        self, start_id: int = 0, end_id: int | None = None
+    ) -> Iterable[list[dict]]:
+        """
+        Retrieve the serialized events of the stream a page at a time, without decoding
+        them, for sending them on as they are stored.
+
+        Args:
+            start_id: The ID of the first event to retrieve. Defaults to 0.
+            end_id: The ID of the last event to retrieve. Defaults to the last event in the stream.
+
+        Yields:
+            Lists of the event dicts of each page of the cache, leaving out missing events.
+        """
+        if end_id is None:
+            end_id = self.cur_id
+        else:
+            end_id += 1  # From inclusive to exclusive
+        first_page_start = start_id - start_id % self.cache_size
+        for page_start in range(first_page_start, end_id, self.cache_size):
+            if not should_continue():
+                return
+            cache_page = self._load_cache_page(page_start, page_start + self.cache_size)
+            page = []
+            for index in range(max(page_start, start_id), min(cache_page.end, end_id)):
+                data = cache_page.get_event_dict(index)
+                if data is None:
+                    data = self._get_event_dict(index)
+                if data is not None:
+                    page.append(data)
+            if page:
+                yield page
+
+    def _get_event_dict(self, id: int) -> dict | None:
+        """Get an event that is not in a cache page, re-encoding it if it is already decoded."""
+        event = decoded_event_cache.get(self.sid, id)
+        if event is not None:
+            return event_to_dict(event)
+        try:
+            if self._event_log is not None:
+                data, _ = self._event_log.read(id)
+            else:
+                data, _ = self._read_event_file(id)
+        except FileNotFoundError:
+            return None
+        return data
+
     def get_event(self, id: int) -> Event:
-        filename = self._get_filename_for_id(id, self.user_id)
-        content = self.file_store.read(filename)
-        data = json.loads(content)
-        return event_from_dict(data)
+        event = decoded_event_cache.get(self.sid, id)
+        if event is None:
+            event = self._load_event(id)
+        return event
+
+    def _load_event(self, id: int) -> Event:
+        if self._event_log is not None:
+            data, size = self._event_log.read(id)
+        else:
+            data, size = self._read_event_file(id)
+        event = event_from_dict(data)
+        decoded_event_cache.put(self.sid, id, event, size)
+        return event
 
     def get_latest_event(self) -> Event:
         return self.get_event(self.cur_id - 1)
@@ -147,18 +278,79 @@ class EventStore(EventStoreABC):
     def _get_filename_for_id(self, id: int, user_id: str | None) -> str:
         return get_conversation_event_filename(self.sid, id, user_id)
 
+    def _get_cur_id_from_manifest(self, manifest: _EventManifest) -> int | None:
+        """Get the next event id from the manifest, or None if the manifest is stale."""
+        if manifest.cache_size != self.cache_size:
+            return None
+        cur_id = manifest.cur_id
+        if self._event_log is not None:
+            # The manifest of a segmented log is only rewritten when a segment is
+            # added, and the tail of the last segment holds the latest id
+            cur_id = max(cur_id, self._event_log.get_next_id())
+        # The manifest of events stored one file per event is only rewritten when a
+        # cache page is complete, so the events of at most one page follow it
+        for id in range(cur_id, cur_id + self.cache_size + 1):
+            if not self._event_exists(id):
+                return id
+        return None
+
+    def _event_exists(self, id: int) -> bool:
+        try:
+            if self._event_log is not None:
+                self._event_log.read(id)
+            else:
+                self.file_store.read(self._get_filename_for_id(id, self.user_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _get_filename_for_manifest(self) -> str:
+        return get_conversation_event_manifest_filename(self.sid, self.user_id)
+
+    def _read_manifest(self) -> _EventManifest | None:
+        try:
+            content = self.file_store.read(self._get_filename_for_manifest())
+        except FileNotFoundError:
+            return None
+        try:
+            return _EventManifest(**json.loads(content))
+        except (ValueError, TypeError):
+            # A manifest from an interrupted write is ignored, and events are scanned instead
+            logger.warning(f'Invalid event manifest for {self.sid}')
+            return None
+
+    def _get_manifest_contents(self, cur_id: int) -> str:
+        manifest = _EventManifest(
+            cur_id=cur_id,
+            cache_size=self.cache_size,
+            format='files' if self._event_log is None else 'segmented',
+            segments=[] if self._event_log is None else self._event_log.segments,
+        )
+        return json.dumps(asdict(manifest))
+
+    def _read_event_file(self, id: int) -> tuple[dict, int]:
+        """Read a single event stored in its own file, along with the length of the file."""
+        filename = self._get_filename_for_id(id, self.user_id)
+        content = self.file_store.read(filename)
+        return json.loads(content), len(content)
+
     def _get_filename_for_cache(self, start: int, end: int) -> str:
         return f'{get_conversation_dir(self.sid, self.user_id)}event_cache/{start}-{end}.json'
 
     def _load_cache_page(self, start: int, end: int) -> _CachePage:
         """Read a page from the cache. Reading individual events is slow when there are a lot of them, so we use pages."""
+        if self._event_log is not None:
+            events, size = self._event_log.read_page(start, end)
+            return _CachePage(events, start, end, size)
         cache_filename = self._get_filename_for_cache(start, end)
         try:
             content = self.file_store.read(cache_filename)
             events = json.loads(content)
+            size = len(content)
         except FileNotFoundError:
             events = None
-        page = _CachePage(events, start, end)
+            size = 0
+        page = _CachePage(events, start, end, size)
         return page
 
     def _load_cache_page_for_index(self, index: int) -> _CachePage:
@@ -1,4 +1,5 @@
-from dataclasses import asdict
+import copy
+from dataclasses import fields, is_dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Any
@@ -95,14 +96,52 @@ def _convert_pydantic_to_dict(obj: BaseModel | dict) -> dict:
     return obj
 
 
+_ATOMIC_TYPES = frozenset({str, int, float, bool, type(None)})
+
+
+_FIELD_NAMES: dict[type, tuple[str, ...]] = {}
+
+
+def _field_names(cls: type) -> tuple[str, ...]:
+    names = _FIELD_NAMES.get(cls)
+    if names is None:
+        names = _FIELD_NAMES[cls] = tuple(f.name for f in fields(cls))
+    return names
+
+
+def _to_builtin(value: Any) -> Any:
+    """Convert a field value the way dataclasses.asdict does, with fast paths for atomic values and pydantic models."""
+    if type(value) in _ATOMIC_TYPES:
+        return value
+    if is_dataclass(value) and not isinstance(value, type):
+        return {
+            name: _to_builtin(getattr(value, name))
+            for name in _field_names(type(value))
+        }
+    if isinstance(value, tuple) and hasattr(value, '_fields'):
+        return type(value)(*[_to_builtin(v) for v in value])
+    if isinstance(value, (list, tuple)):
+        return type(value)(_to_builtin(v) for v in value)
+    if isinstance(value, dict):
+        return type(value)((_to_builtin(k), _to_builtin(v)) for k, v in value.items())
+    if isinstance(value, BaseModel):
+        # Serialized to a dict below anyway, which copies it more cheaply than deepcopy
+        return value.model_dump()
+    return copy.deepcopy(value)
+
+
 def event_to_dict(event: 'Event') -> dict:
-    props = asdict(event)
+    # Equivalent to dataclasses.asdict(event), with the field list of each event class computed once
+    props = {
+        name: _to_builtin(getattr(event, name)) for name in _field_names(type(event))
+    }
     d = {}
     for key in TOP_KEYS:
-        if hasattr(event, key) and getattr(event, key) is not None:
-            d[key] = getattr(event, key)
-        elif hasattr(event, f'_{key}') and getattr(event, f'_{key}') is not None:
-            d[key] = getattr(event, f'_{key}')
+        value = getattr(event, key, None)
+        if value is None:
+            value = getattr(event, f'_{key}', None)
+        if value is not None:
+            d[key] = value
         if key == 'id' and d.get('id') == -1:
             d.pop('id', None)
         if key == 'timestamp' and 'timestamp' in d:
@@ -1,20 +1,31 @@
 import asyncio
+import copy
+import itertools
 import queue
 import threading
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from enum import Enum
 from functools import partial
-from typing import Any, Callable
+from typing import Any, Callable, Iterable
 
 from openhands.core.logger import openhands_logger as logger
+from openhands.events.decoded_event_cache import decoded_event_cache
 from openhands.events.event import Event, EventSource
+from openhands.events.event_log import SegmentedEventLog
 from openhands.events.event_store import EventStore
 from openhands.events.serialization.event import event_from_dict, event_to_dict
+from openhands.events.write_behind import (
+    EventWriteBehind,
+    PendingEventWrite,
+    WriteBehindConfig,
+)
 from openhands.io import json
 from openhands.storage import FileStore
 from openhands.storage.locations import (
     get_conversation_dir,
+    get_conversation_event_log_dir,
+    get_conversation_event_manifest_filename,
 )
 from openhands.utils.async_utils import call_sync_from_async
 from openhands.utils.shutdown_listener import should_continue
@@ -34,6 +45,15 @@ class EventStreamSubscriber(str, Enum):
 async def session_exists(
     sid: str, file_store: FileStore, user_id: str | None = None
 ) -> bool:
+    try:
+        # Reading the event manifest is a single small read, whereas listing the
+        # conversation directory lists every event on object stores
+        await call_sync_from_async(
+            file_store.read, get_conversation_event_manifest_filename(sid, user_id)
+        )
+        return True
+    except FileNotFoundError:
+        pass
     try:
         await call_sync_from_async(file_store.list, get_conversation_dir(sid, user_id))
         return True
@@ -41,6 +61,46 @@ async def session_exists(
         return False
 
 
+class _SecretRedactor:
+    """Replaces occurrences of a fixed set of secrets in the strings of event dicts.
+
+    The secret set is prepared once, when the secrets change: empty and duplicate
+    secrets are dropped, and longer secrets are replaced before secrets they contain.
+    Strings shorter than the shortest secret are skipped without searching them.
+    """
+
+    secrets: tuple[str, ...]
+    # Number of strings changed by redact(), to tell whether an event held any secrets
+    redactions: int
+
+    def __init__(self, secrets: Iterable[str]) -> None:
+        self.secrets = tuple(
+            sorted({secret for secret in secrets if secret}, key=len, reverse=True)
+        )
+        self._min_length = min((len(secret) for secret in self.secrets), default=0)
+        self.redactions = 0
+
+    def redact(self, value: Any) -> Any:
+        if isinstance(value, str):
+            if len(value) < self._min_length:
+                return value
+            # str.replace scans at C speed and returns the string itself when there
+            # is nothing to replace, which beats a combined regex on large outputs
+            redacted = value
+            for secret in self.secrets:
+                redacted = redacted.replace(secret, '<secret_hidden>')
+            if redacted is not value:
+                self.redactions += 1
+            return redacted
+        if isinstance(value, dict):
+            for key, item in value.items():
+                value[key] = self.redact(item)
+        elif isinstance(value, list):
+            for i, item in enumerate(value):
+                value[i] = self.redact(item)
+        return value
+
+
 class EventStream(EventStore):
     secrets: dict[str, str]
     # For each subscriber ID, there is a map of callback functions - useful
@@ -53,8 +113,15 @@ class EventStream(EventStore):
     _thread_pools: dict[str, dict[str, ThreadPoolExecutor]]
     _thread_loops: dict[str, dict[str, asyncio.AbstractEventLoop]]
     _write_page_cache: list[dict]
+    _write_behind: EventWriteBehind | None
 
-    def __init__(self, sid: str, file_store: FileStore, user_id: str | None = None):
+    def __init__(
+        self,
+        sid: str,
+        file_store: FileStore,
+        user_id: str | None = None,
+        write_behind: WriteBehindConfig | None = None,
+    ):
         super().__init__(sid, file_store, user_id)
         self._stop_flag = threading.Event()
         self._queue: queue.Queue[Event] = queue.Queue()
@@ -67,7 +134,58 @@ class EventStream(EventStore):
         self._subscribers = {}
         self._lock = threading.Lock()
         self.secrets = {}
+        self._redactor = _SecretRedactor(())
         self._write_page_cache = []
+        self._manifest_lock = threading.Lock()
+        self._manifest_cur_id = -1
+        self._manifest_segments: list[int] | None = None
+        # The log is repaired, or the conversation migrated to one, by the first event
+        # added, so that streams opened only to read never write to the store
+        self._prepared_for_writing = False
+        self._write_behind = None
+        if write_behind is not None:
+            self._write_behind = EventWriteBehind(
+                write_behind,
+                self._write_batch,
+                self._on_batch_written,
+                name=f'event-writer-{sid}',
+            )
+
+    def _prepare_for_writing(self) -> None:
+        self._prepared_for_writing = True
+        if self._event_log is not None:
+            self._event_log.recover()
+        elif self.file_store.event_format == 'segmented':
+            self._migrate_to_event_log()
+
+    def _migrate_to_event_log(self) -> None:
+        """Move the conversation to a segmented event log, copying any events stored one file per event.
+
+        The manifest only records the log once every event is copied, and a log left
+        by an interrupted migration is deleted before copying again.
+        """
+        self.file_store.delete(get_conversation_event_log_dir(self.sid, self.user_id))
+        event_log = SegmentedEventLog(
+            self.file_store, self.sid, self.user_id, page_size=self.cache_size
+        )
+        event_log.recover()
+        for start in range(0, self.cur_id, self.cache_size):
+            page = self._load_cache_page(start, start + self.cache_size)
+            for id in range(start, min(start + self.cache_size, self.cur_id)):
+                if page.events:
+                    data = page.events[id - start]
+                else:
+                    try:
+                        data, _ = self._read_event_file(id)
+                    except FileNotFoundError:
+                        continue
+                event_log.append(id, json.dumps(data))
+        self._event_log = event_log
+        if self.cur_id:
+            self._write_manifest(self.cur_id)
+            logger.info(
+                f'Migrated {self.cur_id} events of {self.sid} to a segmented event log'
+            )
 
     def _init_thread_loop(self, subscriber_id: str, callback_id: str) -> None:
         loop = asyncio.new_event_loop()
@@ -77,6 +195,22 @@ class EventStream(EventStore):
         self._thread_loops[subscriber_id][callback_id] = loop
 
     def close(self) -> None:
+        # Persist buffered events first, so they are not lost and can still be dispatched
+        error = None
+        if self._write_behind is not None:
+            # Events added meanwhile are written directly, so they must wait for the
+            # buffered ones to keep the segmented log in id order
+            with self._lock:
+                unpersisted = self._write_behind.close()
+                if unpersisted:
+                    # Last attempt, on the closing thread
+                    written = self._write_batch(unpersisted)
+                    self._on_batch_written(unpersisted[:written])
+                    if written < len(unpersisted):
+                        error = RuntimeError(
+                            f'Failed to persist events {unpersisted[written].id} to '
+                            f'{unpersisted[-1].id} of {self.sid}'
+                        )
         self._stop_flag.set()
         if self._queue_thread.is_alive():
             self._queue_thread.join()
@@ -90,6 +224,8 @@ class EventStream(EventStore):
         # Clear queue
         while not self._queue.empty():
             self._queue.get()
+        if error is not None:
+            raise error
 
     def _clean_up_subscriber(self, subscriber_id: str, callback_id: str) -> None:
         if subscriber_id not in self._subscribers:
@@ -169,39 +305,182 @@ class EventStream(EventStore):
         event._timestamp = datetime.now().isoformat()
         event._source = source  # type: ignore [attr-defined]
         with self._lock:
+            if not self._prepared_for_writing:
+                self._prepare_for_writing()
             event._id = self.cur_id  # type: ignore [attr-defined]
             self.cur_id += 1
+            # Drop anything cached under this id, e.g. from a deleted conversation with the same id
+            decoded_event_cache.invalidate(self.sid, event.id)
 
             # Take a copy of the current write page
             current_write_page = self._write_page_cache
 
             data = event_to_dict(event)
-            data = self._replace_secrets(data)
-            event = event_from_dict(data)
+            if self._replace_secrets(data):
+                # Subscribers must only see the redacted event
+                event = event_from_dict(data)
+            else:
+                # Nothing to redact, so skip rebuilding the event from its dict
+                event = copy.copy(event)
+                if event.llm_metrics is not None:
+                    event.llm_metrics = event.llm_metrics.copy()
             current_write_page.append(data)
 
             # If the page is full, create a new page for future events / other threads to use
             if len(current_write_page) == self.cache_size:
                 self._write_page_cache = []
 
-        if event.id is not None:
-            # Write the event to the store - this can take some time
-            event_json = json.dumps(data)
-            filename = self._get_filename_for_id(event.id, self.user_id)
-            if len(event_json) > 1_000_000:  # Roughly 1MB in bytes, ignoring encoding
-                logger.warning(
-                    f'Saving event JSON over 1MB: {len(event_json):,} bytes, filename: {filename}',
-                    extra={
-                        'user_id': self.user_id,
-                        'session_id': self.sid,
-                        'size': len(event_json),
-                    },
+            # Buffered writes are queued in id order, and persisted in batches by the writer thread
+            buffered = False
+            dispatch = True
+            if self._write_behind is not None:
+                buffered = self._write_behind.submit(
+                    PendingEventWrite(
+                        id=event.id,
+                        data=data,
+                        contents=self._serialize_event(event.id, data),
+                        event=event,
+                        page=current_write_page
+                        if len(current_write_page) == self.cache_size
+                        else None,
+                    )
                 )
-            self.file_store.write(filename, event_json)
+                if not buffered:
+                    # Events added once the stream is closed are written directly
+                    logger.debug(
+                        f'Writing event {event.id} of closed stream {self.sid} directly'
+                    )
+                dispatch = (
+                    not buffered or not self._write_behind.config.flush_before_dispatch
+                )
+            # Records in the segmented log must be appended in id order, so they are written under the lock
+            if not buffered and self._event_log is not None:
+                self._write_event(event.id, self._serialize_event(event.id, data))
+                self._write_manifest(event.id + 1)
+                self._store_index_page(current_write_page)
+
+        if event.id is not None and self._event_log is None and not buffered:
+            # Write the event to the store - this can take some time
+            self._write_event(event.id, self._serialize_event(event.id, data))
 
             # Store the cache page last - if it is not present during reads then it will simply be bypassed.
             self._store_cache_page(current_write_page)
-        self._queue.put(event)
+            self._store_index_page(current_write_page)
+        if dispatch:
+            self._queue.put(event)
+
+    def flush(self) -> None:
+        """Persist any events buffered by the write-behind writer."""
+        if self._write_behind is not None:
+            self._write_behind.flush()
+
+    def get_write_behind_stats(self) -> dict[str, float] | None:
+        """Get queue depth and flush latency metrics of the write-behind writer, if enabled."""
+        if self._write_behind is None:
+            return None
+        return self._write_behind.get_stats()
+
+    def _load_event(self, id: int) -> Event:
+        # Events buffered by the write-behind writer are not in the file store yet
+        if self._write_behind is not None:
+            pending = self._write_behind.get(id)
+            if pending is not None:
+                return event_from_dict(pending.data)
+        return super()._load_event(id)
+
+    def _serialize_event(self, id: int, data: dict) -> str:
+        event_json = json.dumps(data)
+        if len(event_json) > 1_000_000:  # Roughly 1MB in bytes, ignoring encoding
+            logger.warning(
+                f'Saving event JSON over 1MB: {len(event_json):,} bytes, event id: {id}',
+                extra={
+                    'user_id': self.user_id,
+                    'session_id': self.sid,
+                    'size': len(event_json),
+                },
+            )
+        return event_json
+
+    def _write_event(self, id: int, event_json: str) -> str:
+        """Write a serialized event, returning the path of the file written to."""
+        if self._event_log is not None:
+            return self._event_log.append_many([(id, event_json)])[0]
+        filename = self._get_filename_for_id(id, self.user_id)
+        self.file_store.write(filename, event_json)
+        return filename
+
+    def _write_batch(self, batch: list[PendingEventWrite]) -> int:
+        """Persist a batch of buffered events in order, returning how many were written."""
+        assert self._write_behind is not None
+        written = 0
+        paths = []
+        try:
+            event_log = self._event_log
+            if event_log is not None:
+                # One append per segment for the whole batch
+                for _, group in itertools.groupby(
+                    batch, key=lambda write: event_log.segment_for_id(write.id)
+                ):
+                    writes = list(group)
+                    paths.extend(
+                        event_log.append_many(
+                            [(write.id, write.contents) for write in writes]
+                        )
+                    )
+                    written += len(writes)
+                    for write in writes:
+                        if write.page is not None:
+                            self._store_index_page(write.page)
+            else:
+                for write in batch:
+                    paths.append(self._write_event(write.id, write.contents))
+                    if write.page is not None:
+                        self._store_cache_page(write.page)
+                        self._store_index_page(write.page)
+                    written += 1
+            if self._write_behind.config.fsync:
+                for path in dict.fromkeys(paths):
+                    self.file_store.sync(path)
+        except Exception:
+            logger.exception(
+                f'Error persisting events of {self.sid}, will retry',
+                extra={'session_id': self.sid, 'user_id': self.user_id},
+            )
+        if written and self._event_log is not None:
+            try:
+                self._write_manifest(batch[written - 1].id + 1)
+            except Exception as e:
+                logger.warning(f'Error writing event manifest of {self.sid}: {e}')
+        return written
+
+    def _on_batch_written(self, batch: list[PendingEventWrite]) -> None:
+        if (
+            self._write_behind is not None
+            and self._write_behind.config.flush_before_dispatch
+        ):
+            for write in batch:
+                self._queue.put(write.event)
+
+    def _write_manifest(self, cur_id: int) -> None:
+        """Record the event id high-water mark, so opening the conversation does not need to list every event.
+
+        Events stored one file per event only rewrite the manifest when a cache page is
+        complete, and the events of the next page are found by probing past it.
+        """
+        with self._manifest_lock:
+            # Events written outside the main lock may finish out of order
+            if cur_id <= self._manifest_cur_id:
+                return
+            # The latest id of a segmented log is read from the tail of its last
+            # segment, so its manifest only needs rewriting when a segment is added
+            segments = self._event_log.segments if self._event_log else []
+            if self._event_log is not None and segments == self._manifest_segments:
+                return
+            self.file_store.write(
+                self._get_filename_for_manifest(), self._get_manifest_contents(cur_id)
+            )
+            self._manifest_cur_id = cur_id
+            self._manifest_segments = segments
 
     def _store_cache_page(self, current_write_page: list[dict]):
         """Store a page in the cache. Reading individual events is slow when there are a lot of them, so we use pages."""
@@ -212,21 +491,40 @@ class EventStream(EventStore):
         contents = json.dumps(current_write_page)
         cache_filename = self._get_filename_for_cache(start, end)
         self.file_store.write(cache_filename, contents)
+        try:
+            self._write_manifest(end)
+        except Exception as e:
+            logger.warning(f'Error writing event manifest of {self.sid}: {e}')
+
+    def _store_index_page(self, current_write_page: list[dict]) -> None:
+        """Index a complete page of events, so filtered searches can skip events without loading them."""
+        if len(current_write_page) < self.cache_size:
+            return
+        try:
+            self._event_index.append_page(current_write_page)
+        except Exception as e:
+            # Pages missing from the index are read in full, so this only costs performance
+            logger.warning(f'Error indexing events of {self.sid}: {e}')
 
     def set_secrets(self, secrets: dict[str, str]) -> None:
         self.secrets = secrets.copy()
+        self._compile_secrets()
 
     def update_secrets(self, secrets: dict[str, str]) -> None:
         self.secrets.update(secrets)
+        self._compile_secrets()
 
-    def _replace_secrets(self, data: dict[str, Any]) -> dict[str, Any]:
-        for key in data:
-            if isinstance(data[key], dict):
-                data[key] = self._replace_secrets(data[key])
-            elif isinstance(data[key], str):
-                for secret in self.secrets.values():
-                    data[key] = data[key].replace(secret, '<secret_hidden>')
-        return data
+    def _compile_secrets(self) -> None:
+        self._redactor = _SecretRedactor(self.secrets.values())
+
+    def _replace_secrets(self, data: dict[str, Any]) -> bool:
+        """Replace secrets in an event dict in place, returning whether it held any."""
+        redactor = self._redactor
+        if not redactor.secrets:
+            return False
+        redactions = redactor.redactions
+        redactor.redact(data)
+        return redactor.redactions != redactions
 
     def _run_queue_loop(self) -> None:
         self._queue_loop = asyncio.new_event_loop()
@@ -237,7 +535,11 @@ class EventStream(EventStore):
             self._queue_loop.close()
 
     async def _process_queue(self) -> None:
-        while should_continue() and not self._stop_flag.is_set():
+        # Once stopped, the events already queued are still dispatched, e.g. those
+        # held back until the write-behind writer persisted them on close
+        while should_continue() and not (
+            self._stop_flag.is_set() and self._queue.empty()
+        ):
             event = None
             try:
                 event = self._queue.get(timeout=0.1)
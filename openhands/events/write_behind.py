@@ -0,0 +1,234 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.events.event import Event
+
+if TYPE_CHECKING:
+    from openhands.core.config import OpenHandsConfig
+
+# Failed writes are retried this many times once the writer is closed, backing off
+# exponentially, before close() returns them to the caller
+CLOSE_RETRIES = 3
+CLOSE_RETRY_DELAY = 0.5
+
+
+@dataclass(frozen=True)
+class WriteBehindConfig:
+    """Options for persisting events in batches on a writer thread instead of in add_event.
+
+    Attributes:
+        max_events: Flush once this many events are buffered.
+        max_delay: Flush once the oldest buffered event has waited this many seconds.
+        max_bytes: Flush once the buffered events reach this many bytes.
+        fsync: Whether to sync written files to durable storage on each flush.
+        flush_before_dispatch: Whether to hold events back from subscribers until they are persisted.
+    """
+
+    max_events: int = 50
+    max_delay: float = 0.2
+    max_bytes: int = 1_000_000
+    fsync: bool = False
+    flush_before_dispatch: bool = False
+
+    @classmethod
+    def from_config(cls, config: 'OpenHandsConfig') -> 'WriteBehindConfig | None':
+        if not config.file_store_write_behind:
+            return None
+        return cls(
+            max_events=config.file_store_write_behind_max_events,
+            max_delay=config.file_store_write_behind_max_delay,
+            max_bytes=config.file_store_write_behind_max_bytes,
+            fsync=config.file_store_write_behind_fsync,
+            flush_before_dispatch=config.file_store_write_behind_flush_before_dispatch,
+        )
+
+
+@dataclass
+class PendingEventWrite:
+    id: int
+    data: dict[str, Any]
+    contents: str
+    event: Event
+    # The cache page completed by this event, if any
+    page: list[dict] | None = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+
+
+class EventWriteBehind:
+    """Buffers serialized events and persists them in batches on a dedicated writer thread.
+
+    write_batch persists a batch of writes in order and returns how many of them
+    (from the start of the batch) were persisted. Writes that fail stay buffered and
+    are retried on the next flush. on_flushed is called with the persisted writes.
+    Once closed, failed writes are retried CLOSE_RETRIES times, and the writes that
+    still failed are returned by close().
+    """
+
+    config: WriteBehindConfig
+
+    def __init__(
+        self,
+        config: WriteBehindConfig,
+        write_batch: Callable[[list[PendingEventWrite]], int],
+        on_flushed: Callable[[list[PendingEventWrite]], None],
+        name: str = 'event-writer',
+    ) -> None:
+        self.config = config
+        self._write_batch = write_batch
+        self._on_flushed = on_flushed
+        self._buffer: deque[PendingEventWrite] = deque()
+        self._pending: dict[int, PendingEventWrite] = {}
+        self._buffer_bytes = 0
+        self._condition = threading.Condition()
+        self._closed = False
+        self._flush_requested = False
+        self._failures = 0
+        self._flushes = 0
+        self._events_flushed = 0
+        self._max_queue_depth = 0
+        self._total_flush_latency = 0.0
+        self._max_flush_latency = 0.0
+        self._last_flush_latency = 0.0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, write: PendingEventWrite) -> bool:
+        """Buffer a write, returning False if the writer is closed and the caller must persist it."""
+        with self._condition:
+            if self._closed:
+                return False
+            self._buffer.append(write)
+            self._pending[write.id] = write
+            self._buffer_bytes += len(write.contents)
+            self._max_queue_depth = max(self._max_queue_depth, len(self._buffer))
+            if self._is_full():
+                self._condition.notify_all()
+            return True
+
+    def get(self, id: int) -> PendingEventWrite | None:
+        """Get a buffered write that has not been persisted yet."""
+        with self._condition:
+            return self._pending.get(id)
+
+    def flush(self) -> None:
+        """Persist all buffered events, returning once they are written or a write fails."""
+        with self._condition:
+            failures = self._failures
+            self._flush_requested = True
+            self._condition.notify_all()
+            while self._buffer and self._failures == failures and not self._closed:
+                self._condition.wait()
+
+    def close(self) -> list[PendingEventWrite]:
+        """Persist all buffered events and stop the writer thread.
+
+        Returns the writes that could not be persisted, in order, for the caller to persist.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread.is_alive():
+            self._thread.join()
+        with self._condition:
+            unpersisted = list(self._buffer)
+            self._buffer.clear()
+            self._pending.clear()
+            self._buffer_bytes = 0
+        return unpersisted
+
+    def get_stats(self) -> dict[str, float]:
+        """Get metrics for tuning the batching parameters."""
+        with self._condition:
+            return {
+                'queue_depth': len(self._buffer),
+                'queue_bytes': self._buffer_bytes,
+                'max_queue_depth': self._max_queue_depth,
+                'flushes': self._flushes,
+                'failures': self._failures,
+                'events_flushed': self._events_flushed,
+                'last_flush_latency': self._last_flush_latency,
+                'max_flush_latency': self._max_flush_latency,
+                'avg_flush_latency': (
+                    self._total_flush_latency / self._flushes if self._flushes else 0.0
+                ),
+            }
+
+    def _is_full(self) -> bool:
+        return (
+            len(self._buffer) >= self.config.max_events
+            or self._buffer_bytes >= self.config.max_bytes
+        )
+
+    def _next_batch(self) -> list[PendingEventWrite] | None:
+        """Wait until a flush is due and return the buffered writes, or None once closed and drained."""
+        with self._condition:
+            while True:
+                if self._buffer:
+                    deadline = self._buffer[0].enqueued_at + self.config.max_delay
+                    timeout = deadline - time.monotonic()
+                    if (
+                        self._closed
+                        or self._flush_requested
+                        or self._is_full()
+                        or timeout <= 0
+                    ):
+                        self._flush_requested = False
+                        return list(self._buffer)
+                    self._condition.wait(timeout)
+                elif self._closed:
+                    return None
+                else:
+                    self._flush_requested = False
+                    self._condition.notify_all()
+                    self._condition.wait()
+
+    def _run(self) -> None:
+        close_failures = 0
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            start = time.monotonic()
+            written = self._write_batch(batch)
+            latency = time.monotonic() - start
+            flushed = batch[:written]
+            with self._condition:
+                for write in flushed:
+                    self._buffer.popleft()
+                    self._buffer_bytes -= len(write.contents)
+                    del self._pending[write.id]
+                self._flushes += 1
+                self._events_flushed += written
+                self._last_flush_latency = latency
+                self._total_flush_latency += latency
+                self._max_flush_latency = max(self._max_flush_latency, latency)
+                failed = written < len(batch)
+                if failed:
+                    self._failures += 1
+                if written:
+                    close_failures = 0
+                if failed and self._closed:
+                    close_failures += 1
+                queue_depth = len(self._buffer)
+                self._condition.notify_all()
+            if flushed:
+                self._on_flushed(flushed)
+            logger.debug(
+                f'Flushed {written} events in {latency:.3f}s',
+                extra={'queue_depth': queue_depth, 'flush_latency': latency},
+            )
+            if close_failures > CLOSE_RETRIES:
+                logger.error(
+                    f'Failed to persist {queue_depth} events on close, returning them to the caller'
+                )
+                return
+            if failed:
+                # Back off before retrying the writes that failed
+                if close_failures:
+                    time.sleep(CLOSE_RETRY_DELAY * 2 ** (close_failures - 1))
+                else:
+                    time.sleep(self.config.max_delay)
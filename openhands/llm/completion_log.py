@@ -0,0 +1,103 @@
+"""Completion logs, written for evals and other scripts that need the raw completions.
+
+Each completion is serialized by the caller, as the messages and response may change
+once the call returns, and appended as one JSON line to a log file of its model by a
+writer thread, which writes the lines that accumulated while it was busy at once.
+Log files are rotated once they reach a maximum size.
+"""
+
+import atexit
+import os
+import queue
+import threading
+import time
+
+from openhands.core.logger import openhands_logger as logger
+
+# Log files are rotated once they reach this many bytes
+MAX_COMPLETION_LOG_BYTES = 100 * 1024 * 1024
+
+
+class CompletionLogWriter:
+    """Appends lines to the completion log files of a model, on a writer thread."""
+
+    def __init__(
+        self, folder: str, model_name: str, max_bytes: int = MAX_COMPLETION_LOG_BYTES
+    ) -> None:
+        self.folder = folder
+        self.model_name = model_name
+        self.max_bytes = max_bytes
+        self._queue: queue.SimpleQueue[str | None] = queue.SimpleQueue()
+        self._thread = threading.Thread(
+            target=self._run, name='completion-log-writer', daemon=True
+        )
+        self._thread.start()
+
+    def write(self, line: str) -> None:
+        self._queue.put(line)
+
+    def close(self) -> None:
+        """Write the queued lines and stop the writer thread."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _new_log_path(self) -> str:
+        os.makedirs(self.folder, exist_ok=True)
+        return os.path.join(
+            self.folder,
+            f'{self.model_name.replace("/", "__")}-{time.time()}-{os.getpid()}.jsonl',
+        )
+
+    def _run(self) -> None:
+        f = None
+        size = 0
+        closed = False
+        while not closed:
+            items = [self._queue.get()]
+            while True:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            # None is queued by close
+            closed = None in items
+            lines = [item for item in items if item is not None]
+            if not lines:
+                continue
+            data = ''.join(line + '\n' for line in lines).encode('utf-8')
+            try:
+                if f is None or size >= self.max_bytes:
+                    if f is not None:
+                        f.close()
+                    f = open(self._new_log_path(), 'ab')
+                    size = 0
+                f.write(data)
+                f.flush()
+                size += len(data)
+            except OSError as e:
+                logger.error(f'Failed to write completion log: {e}')
+        if f is not None:
+            f.close()
+
+
+_writers: dict[tuple[str, str], CompletionLogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_completion_log_writer(folder: str, model_name: str) -> CompletionLogWriter:
+    """Get the writer shared by the LLMs logging the completions of a model to a folder."""
+    with _writers_lock:
+        writer = _writers.get((folder, model_name))
+        if writer is None:
+            writer = CompletionLogWriter(folder, model_name)
+            _writers[(folder, model_name)] = writer
+        return writer
+
+
+@atexit.register
+def _close_writers() -> None:
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
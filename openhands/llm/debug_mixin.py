@@ -1,3 +1,4 @@
+import logging
 from typing import Any
 
 from openhands.core.logger import llm_prompt_logger, llm_response_logger
@@ -6,8 +7,15 @@ from openhands.core.logger import openhands_logger as logger
 MESSAGE_SEPARATOR = '\n\n----------\n\n'
 
 
+def is_llm_logging_enabled(llm_logger: logging.Logger) -> bool:
+    """Whether debug messages of an LLM logger are written anywhere, so that they are worth formatting."""
+    return llm_logger.isEnabledFor(logging.DEBUG) and llm_logger.hasHandlers()
+
+
 class DebugMixin:
     def log_prompt(self, messages: list[dict[str, Any]] | dict[str, Any]) -> None:
+        if not is_llm_logging_enabled(llm_prompt_logger):
+            return
         if not messages:
             logger.debug('No completion messages!')
             return
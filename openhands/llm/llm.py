@@ -5,8 +5,6 @@ import warnings
 from functools import partial
 from typing import Any, Callable
 
-import httpx
-
 from openhands.core.config import LLMConfig
 
 with warnings.catch_warnings():
@@ -24,15 +22,18 @@ from litellm.types.utils import CostPerToken, ModelResponse, Usage
 from litellm.utils import create_pretrained_tokenizer
 
 from openhands.core.exceptions import LLMNoResponseError
+from openhands.core.logger import llm_response_logger
 from openhands.core.logger import openhands_logger as logger
 from openhands.core.message import Message
-from openhands.llm.debug_mixin import DebugMixin
+from openhands.llm.completion_log import get_completion_log_writer
+from openhands.llm.debug_mixin import DebugMixin, is_llm_logging_enabled
 from openhands.llm.fn_call_converter import (
     STOP_WORDS,
     convert_fncall_messages_to_non_fncall_messages,
     convert_non_fncall_messages_to_fncall_messages,
 )
 from openhands.llm.metrics import Metrics
+from openhands.llm.model_info_cache import model_info_cache
 from openhands.llm.retry_mixin import RetryMixin
 
 __all__ = ['LLM']
@@ -235,7 +236,12 @@ class LLM(RetryMixin, DebugMixin):
             )
 
             # handle conversion of to non-function calling messages if needed
-            original_fncall_messages = copy.deepcopy(messages)
+            # (the original messages are only kept for the completion logs)
+            original_fncall_messages = (
+                copy.deepcopy(messages)
+                if self.config.log_completions and mock_function_calling
+                else None
+            )
             mock_fncall_tools = None
             # if the agent or caller has defined tools, and we mock via prompting, convert the messages
             if mock_function_calling and 'tools' in kwargs:
@@ -295,7 +301,12 @@ class LLM(RetryMixin, DebugMixin):
             response_id = resp.get('id', 'unknown')
             self.metrics.add_response_latency(latency, response_id)
 
-            non_fncall_response = copy.deepcopy(resp)
+            # converting the response back to function calling below changes it
+            non_fncall_response = (
+                copy.deepcopy(resp)
+                if self.config.log_completions and mock_fncall_tools is not None
+                else resp
+            )
 
             # if we mocked function calling, and we have tools, convert the response back to function calling format
             if mock_function_calling and mock_fncall_tools is not None:
@@ -326,18 +337,18 @@ class LLM(RetryMixin, DebugMixin):
                     + str(resp)
                 )
 
-            message_back: str = resp['choices'][0]['message']['content'] or ''
-            tool_calls: list[ChatCompletionMessageToolCall] = resp['choices'][0][
-                'message'
-            ].get('tool_calls', [])
-            if tool_calls:
-                for tool_call in tool_calls:
-                    fn_name = tool_call.function.name
-                    fn_args = tool_call.function.arguments
-                    message_back += f'\nFunction call: {fn_name}({fn_args})'
-
             # log the LLM response
-            self.log_response(message_back)
+            if is_llm_logging_enabled(llm_response_logger):
+                message_back: str = resp['choices'][0]['message']['content'] or ''
+                tool_calls: list[ChatCompletionMessageToolCall] = resp['choices'][0][
+                    'message'
+                ].get('tool_calls', [])
+                if tool_calls:
+                    for tool_call in tool_calls:
+                        fn_name = tool_call.function.name
+                        fn_args = tool_call.function.arguments
+                        message_back += f'\nFunction call: {fn_name}({fn_args})'
+                self.log_response(message_back)
 
             # post-process the response first to calculate cost
             cost = self._post_completion(resp)
@@ -345,12 +356,6 @@ class LLM(RetryMixin, DebugMixin):
             # log for evals or other scripts that need the raw completion
             if self.config.log_completions:
                 assert self.config.log_completions_folder is not None
-                log_file = os.path.join(
-                    self.config.log_completions_folder,
-                    # use the metric model name (for draft editor)
-                    f'{self.metrics.model_name.replace("/", "__")}-{time.time()}.json',
-                )
-
                 # set up the dict to be logged
                 _d = {
                     'messages': messages,
@@ -373,8 +378,11 @@ class LLM(RetryMixin, DebugMixin):
                     # Save fncall_messages/response separately
                     _d['fncall_messages'] = original_fncall_messages
                     _d['fncall_response'] = resp
-                with open(log_file, 'w') as f:
-                    f.write(json.dumps(_d))
+                get_completion_log_writer(
+                    self.config.log_completions_folder,
+                    # use the metric model name (for draft editor)
+                    self.metrics.model_name,
+                ).write(json.dumps(_d))
 
             return resp
 
@@ -392,62 +400,9 @@ class LLM(RetryMixin, DebugMixin):
         if self._tried_model_info:
             return
         self._tried_model_info = True
-        try:
-            if self.config.model.startswith('openrouter'):
-                self.model_info = litellm.get_model_info(self.config.model)
-        except Exception as e:
-            logger.debug(f'Error getting model info: {e}')
-
-        if self.config.model.startswith('litellm_proxy/'):
-            # IF we are using LiteLLM proxy, get model info from LiteLLM proxy
-            # GET {base_url}/v1/model/info with litellm_model_id as path param
-            base_url = self.config.base_url.strip() if self.config.base_url else ''
-            if not base_url.startswith(('http://', 'https://')):
-                base_url = 'http://' + base_url
-
-            response = httpx.get(
-                f'{base_url}/v1/model/info',
-                headers={
-                    'Authorization': f'Bearer {self.config.api_key.get_secret_value() if self.config.api_key else None}'
-                },
-            )
-
-            resp_json = response.json()
-            if 'data' not in resp_json:
-                logger.error(
-                    f'Error getting model info from LiteLLM proxy: {resp_json}'
-                )
-            all_model_info = resp_json.get('data', [])
-            current_model_info = next(
-                (
-                    info
-                    for info in all_model_info
-                    if info['model_name']
-                    == self.config.model.removeprefix('litellm_proxy/')
-                ),
-                None,
-            )
-            if current_model_info:
-                self.model_info = current_model_info['model_info']
-                logger.debug(f'Got model info from litellm proxy: {self.model_info}')
-
-        # Last two attempts to get model info from NAME
-        if not self.model_info:
-            try:
-                self.model_info = litellm.get_model_info(
-                    self.config.model.split(':')[0]
-                )
-            # noinspection PyBroadException
-            except Exception:
-                pass
-        if not self.model_info:
-            try:
-                self.model_info = litellm.get_model_info(
-                    self.config.model.split('/')[-1]
-                )
-            # noinspection PyBroadException
-            except Exception:
-                pass
+        self.model_info = model_info_cache.get(
+            self.config.model, self.config.base_url, self.config.api_key
+        )
         from openhands.io import json
 
         logger.debug(
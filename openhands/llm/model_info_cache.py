@@ -0,0 +1,211 @@
+"""Process-wide cache of the model info of the LLMs, shared by every LLM instance.
+
+Looking up model info can mean a request to a LiteLLM proxy, and LLMs are created for
+every session, title generation, condenser and critic. The info of each model and base
+URL is looked up once per MODEL_INFO_CACHE_TTL seconds, concurrent lookups of the same
+model wait for a single request, and the cache is saved to disk so that a restarted
+process can start from it.
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any
+
+import httpx
+from litellm import get_model_info
+from pydantic import SecretStr
+
+from openhands.core.config.llm_config import LLMConfig
+from openhands.core.logger import openhands_logger as logger
+from openhands.utils.async_utils import call_sync_from_async
+
+MODEL_INFO_CACHE_TTL = float(os.getenv('MODEL_INFO_CACHE_TTL', '3600'))
+# Failed lookups are retried sooner, as the proxy may only be unavailable for a moment
+MODEL_INFO_CACHE_FAILURE_TTL = 60.0
+MODEL_INFO_CACHE_FILE = os.getenv(
+    'MODEL_INFO_CACHE_FILE',
+    os.path.join(os.path.expanduser('~'), '.openhands', 'cache', 'model_info.json'),
+)
+MODEL_INFO_REQUEST_TIMEOUT = 10.0
+
+# (model, base_url)
+_Key = tuple[str, str]
+
+
+class ModelInfoCache:
+    """Model info by model and base URL, looked up at most once at a time and kept for a TTL."""
+
+    def __init__(
+        self,
+        ttl: float = MODEL_INFO_CACHE_TTL,
+        snapshot_path: str | None = MODEL_INFO_CACHE_FILE,
+    ) -> None:
+        self.ttl = ttl
+        self.snapshot_path = snapshot_path
+        # key -> (time of the lookup, info or None if it failed)
+        self._entries: dict[_Key, tuple[float, dict[str, Any] | None]] = {}
+        # key -> time after which expired info, kept because its lookup failed, is looked up again
+        self._retry_at: dict[_Key, float] = {}
+        self._inflight: dict[_Key, Future] = {}
+        self._lock = threading.Lock()
+        self._snapshot_loaded = False
+
+    def get(
+        self, model: str, base_url: str | None, api_key: SecretStr | None = None
+    ) -> dict[str, Any] | None:
+        """Get the model info, looking it up if it is not cached or has expired."""
+        key = (model, base_url or '')
+        with self._lock:
+            if not self._snapshot_loaded:
+                self._load_snapshot()
+            entry = self._entries.get(key)
+            if entry is not None and self._is_fresh(key, entry):
+                return _copy(entry[1])
+            future = self._inflight.get(key)
+            owner = future is None
+            if future is None:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return _copy(future.result())
+        info = None
+        try:
+            info = fetch_model_info(model, base_url, api_key)
+        except Exception as e:
+            logger.warning(f'Error getting model info for {model}: {e}')
+        finally:
+            with self._lock:
+                if info is None and entry is not None and entry[1] is not None:
+                    # Keep using the previous info, with the time it was looked up,
+                    # until the model can be looked up again
+                    logger.debug(f'Using expired model info for {model}')
+                    info = entry[1]
+                    self._retry_at[key] = time.time() + MODEL_INFO_CACHE_FAILURE_TTL
+                else:
+                    self._entries[key] = (time.time(), info)
+                    self._retry_at.pop(key, None)
+                    if info is not None:
+                        self._save_snapshot()
+                del self._inflight[key]
+            future.set_result(info)
+        return _copy(info)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._retry_at.clear()
+
+    def _is_fresh(self, key: _Key, entry: tuple[float, dict[str, Any] | None]) -> bool:
+        retry_at = self._retry_at.get(key)
+        if retry_at is not None:
+            return time.time() < retry_at
+        ttl = self.ttl if entry[1] is not None else MODEL_INFO_CACHE_FAILURE_TTL
+        return time.time() - entry[0] < ttl
+
+    def _load_snapshot(self) -> None:
+        self._snapshot_loaded = True
+        if not self.snapshot_path:
+            return
+        try:
+            with open(self.snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+            for model, base_url, fetched_at, info in snapshot:
+                self._entries.setdefault((model, base_url), (fetched_at, info))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            logger.debug(f'Ignoring model info cache {self.snapshot_path}: {e}')
+
+    def _save_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        # Failed lookups are not saved, so that a restart looks them up again
+        snapshot = [
+            [model, base_url, fetched_at, info]
+            for (model, base_url), (fetched_at, info) in self._entries.items()
+            if info is not None
+        ]
+        tmp_path = f'{self.snapshot_path}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path), exist_ok=True)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, default=str)
+            os.replace(tmp_path, self.snapshot_path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f'Could not save model info cache {self.snapshot_path}: {e}')
+
+
+def _copy(info: dict[str, Any] | None) -> dict[str, Any] | None:
+    # Callers get their own dict, so that changing it does not change the cache
+    return None if info is None else dict(info)
+
+
+def fetch_model_info(
+    model: str, base_url: str | None, api_key: SecretStr | None = None
+) -> dict[str, Any] | None:
+    """Look up the info of a model, from the LiteLLM proxy serving it or from litellm."""
+    model_info: dict[str, Any] | None = None
+    try:
+        if model.startswith('openrouter'):
+            model_info = dict(get_model_info(model))
+    except Exception as e:
+        logger.debug(f'Error getting model info: {e}')
+
+    if model.startswith('litellm_proxy/'):
+        # IF we are using LiteLLM proxy, get model info from LiteLLM proxy
+        # GET {base_url}/v1/model/info with litellm_model_id as path param
+        base_url = base_url.strip() if base_url else ''
+        if not base_url.startswith(('http://', 'https://')):
+            base_url = 'http://' + base_url
+
+        response = httpx.get(
+            f'{base_url}/v1/model/info',
+            headers={
+                'Authorization': f'Bearer {api_key.get_secret_value() if api_key else None}'
+            },
+            timeout=MODEL_INFO_REQUEST_TIMEOUT,
+        )
+
+        resp_json = response.json()
+        if 'data' not in resp_json:
+            logger.error(f'Error getting model info from LiteLLM proxy: {resp_json}')
+        all_model_info = resp_json.get('data', [])
+        current_model_info = next(
+            (
+                info
+                for info in all_model_info
+                if info['model_name'] == model.removeprefix('litellm_proxy/')
+            ),
+            None,
+        )
+        if current_model_info:
+            model_info = current_model_info['model_info']
+            logger.debug(f'Got model info from litellm proxy: {model_info}')
+
+    # Last two attempts to get model info from NAME
+    if not model_info:
+        try:
+            model_info = dict(get_model_info(model.split(':')[0]))
+        # noinspection PyBroadException
+        except Exception:
+            pass
+    if not model_info:
+        try:
+            model_info = dict(get_model_info(model.split('/')[-1]))
+        # noinspection PyBroadException
+        except Exception:
+            pass
+    return model_info
+
+
+model_info_cache = ModelInfoCache()
+
+
+async def prefetch_model_info(config: LLMConfig) -> None:
+    """Look up the model info of an LLM config in a thread, so that the first LLM created with it does not wait."""
+    await call_sync_from_async(
+        model_info_cache.get, config.model, config.base_url, config.api_key
+    )
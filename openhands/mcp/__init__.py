@@ -6,6 +6,7 @@ from openhands.mcp.utils import (
     convert_mcp_clients_to_tools,
     create_mcp_clients,
     fetch_mcp_tools_from_config,
+    get_mcp_tool_clients,
 )
 
 __all__ = [
@@ -15,5 +16,6 @@ __all__ = [
     'MCPClientTool',
     'fetch_mcp_tools_from_config',
     'call_tool_mcp',
+    'get_mcp_tool_clients',
     'add_mcp_tools_to_agent',
 ]
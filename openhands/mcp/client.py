@@ -1,53 +1,74 @@
-from typing import Optional
+from typing import Awaitable, Callable, Optional, TypeVar
 
 from fastmcp import Client
 from fastmcp.client.transports import SSETransport, StreamableHttpTransport
 from mcp import McpError
 from mcp.types import CallToolResult
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 
 from openhands.core.config.mcp_config import MCPSHTTPServerConfig, MCPSSEServerConfig
 from openhands.core.logger import openhands_logger as logger
+from openhands.mcp.session_pool import MCPSessionPool
 from openhands.mcp.tool import MCPClientTool
 
+T = TypeVar('T')
+
 
 class MCPClient(BaseModel):
     """
     A collection of tools that connects to an MCP server and manages available tools through the Model Context Protocol.
+
+    Connected clients keep a pool of up to max_sessions sessions open to the server,
+    which are reused across tool calls until disconnect() or close() is called.
     """
 
     client: Optional[Client] = None
     description: str = 'MCP client tools for server interaction'
     tools: list[MCPClientTool] = Field(default_factory=list)
     tool_map: dict[str, MCPClientTool] = Field(default_factory=dict)
+    max_sessions: int = 4
+    keepalive_interval: float = 30.0
+
+    _pool: MCPSessionPool | None = PrivateAttr(default=None)
 
     class Config:
         arbitrary_types_allowed = True
 
+    async def _call(self, fn: Callable[[Client], Awaitable[T]]) -> T:
+        if self._pool is not None:
+            return await self._pool.call(fn)
+        if not self.client:
+            raise RuntimeError('Client session is not available.')
+        async with self.client:
+            return await fn(self.client)
+
     async def _initialize_and_list_tools(self) -> None:
         """Initialize session and populate tool map."""
         if not self.client:
             raise RuntimeError('Session not initialized.')
 
-        async with self.client:
-            tools = await self.client.list_tools()
-
-        # Clear existing tools
-        self.tools = []
+        tools = await self._call(lambda client: client.list_tools())
 
-        # Create proper tool objects for each server tool
-        for tool in tools:
-            server_tool = MCPClientTool(
+        # Create proper tool objects for each server tool, replacing the existing ones
+        # at once so that concurrent calls see either the old or the new tools
+        server_tools = [
+            MCPClientTool(
                 name=tool.name,
                 description=tool.description,
                 inputSchema=tool.inputSchema,
                 session=self.client,
             )
-            self.tool_map[tool.name] = server_tool
-            self.tools.append(server_tool)
+            for tool in tools
+        ]
+        self.tool_map = {tool.name: tool for tool in server_tools}
+        self.tools = server_tools
 
         logger.info(f'Connected to server with tools: {[tool.name for tool in tools]}')
 
+    async def refresh_tools(self) -> None:
+        """List the tools of the server again on a pooled session, without reconnecting."""
+        await self._initialize_and_list_tools()
+
     async def connect_http(
         self,
         server: MCPSSEServerConfig | MCPSHTTPServerConfig,
@@ -75,36 +96,61 @@ class MCPClient(BaseModel):
             if conversation_id:
                 headers['X-OpenHands-ServerConversation-ID'] = conversation_id
 
-            # Instantiate custom transports due to custom headers
-            if isinstance(server, MCPSHTTPServerConfig):
-                transport = StreamableHttpTransport(
-                    url=server_url,
-                    headers=headers if headers else None,
-                )
-            else:
-                transport = SSETransport(
-                    url=server_url,
-                    headers=headers if headers else None,
-                )
-
-            self.client = Client(transport, timeout=timeout)
+            def make_client() -> Client:
+                # Instantiate custom transports due to custom headers
+                transport: StreamableHttpTransport | SSETransport
+                if isinstance(server, MCPSHTTPServerConfig):
+                    transport = StreamableHttpTransport(
+                        url=server_url,
+                        headers=headers if headers else None,
+                    )
+                else:
+                    transport = SSETransport(
+                        url=server_url,
+                        headers=headers if headers else None,
+                    )
+                return Client(transport, timeout=timeout)
+
+            self.client = make_client()
+            self._pool = MCPSessionPool(
+                make_client,
+                max_size=self.max_sessions,
+                keepalive_interval=self.keepalive_interval,
+                name=server_url,
+            )
 
+            # The session used to list the tools stays open for the first tool call
             await self._initialize_and_list_tools()
         except McpError as e:
             logger.error(f'McpError connecting to {server_url}: {e}')
+            self.close()
             raise  # Re-raise the error
 
         except Exception as e:
             logger.error(f'Error connecting to {server_url}: {e}')
+            self.close()
             raise
 
     async def call_tool(self, tool_name: str, args: dict) -> CallToolResult:
         """Call a tool on the MCP server."""
         if tool_name not in self.tool_map:
             raise ValueError(f'Tool {tool_name} not found.')
-        # The MCPClientTool is primarily for metadata; use the session to call the actual tool.
-        if not self.client:
-            raise RuntimeError('Client session is not available.')
-
-        async with self.client:
-            return await self.client.call_tool_mcp(name=tool_name, arguments=args)
+        # The MCPClientTool is primarily for metadata; use a pooled session to call the actual tool.
+        return await self._call(
+            lambda client: client.call_tool_mcp(name=tool_name, arguments=args)
+        )
+
+    async def disconnect(self) -> None:
+        """Close the sessions to the server, waiting for those opened on the running event loop."""
+        if self._pool is not None:
+            await self._pool.aclose()
+            self._pool = None
+
+    def close(self) -> None:
+        """Close the sessions to the server without waiting, from any thread."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
+
+    def get_session_stats(self) -> dict[str, int]:
+        return self._pool.get_stats() if self._pool is not None else {}
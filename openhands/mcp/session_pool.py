@@ -0,0 +1,206 @@
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, TypeVar
+from weakref import WeakKeyDictionary
+
+from fastmcp import Client
+from mcp import McpError
+
+from openhands.core.logger import openhands_logger as logger
+
+T = TypeVar('T')
+
+
+@dataclass(eq=False)
+class _PooledSession:
+    client: Client
+    stop: asyncio.Event
+    task: 'asyncio.Task[None]'
+    last_used: float = field(default_factory=time.monotonic)
+
+    def is_alive(self) -> bool:
+        return not self.task.done() and self.client.is_connected()
+
+
+@dataclass(eq=False)
+class _LoopSessions:
+    semaphore: asyncio.Semaphore
+    idle: list[_PooledSession] = field(default_factory=list)
+    sessions: set[_PooledSession] = field(default_factory=set)
+
+
+class MCPSessionPool:
+    """A bounded pool of connected sessions to one MCP server.
+
+    Each session is held open by a task that stays inside the `async with client:`
+    block of its fastmcp Client until the session is discarded, because the transports
+    must be entered and exited by the same task. Sessions are bound to the event loop
+    that opened them, so the pool keeps separate sessions for each event loop it is
+    used from.
+
+    A session that was idle for longer than keepalive_interval is pinged before it is
+    reused, and replaced if the ping fails. If a call fails on a reused session for
+    any reason other than an error returned by the server, the call is retried once
+    on a new session.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], Client],
+        max_size: int = 4,
+        keepalive_interval: float = 30.0,
+        ping_timeout: float = 5.0,
+        name: str = 'MCP server',
+    ) -> None:
+        if max_size < 1:
+            raise ValueError(f'max_size ({max_size}) must be positive')
+        self.client_factory = client_factory
+        self.max_size = max_size
+        self.keepalive_interval = keepalive_interval
+        self.ping_timeout = ping_timeout
+        self.name = name
+        self._loops: WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopSessions] = (
+            WeakKeyDictionary()
+        )
+        self._closed = False
+        self._connects = 0
+        self._reuses = 0
+        self._reconnects = 0
+        self._pings = 0
+        self._calls = 0
+
+    async def call(self, fn: Callable[[Client], Awaitable[T]]) -> T:
+        """Call fn with a connected client from the pool."""
+        if self._closed:
+            raise RuntimeError(f'Session pool for {self.name} is closed')
+        sessions = self._get_loop_sessions()
+        async with sessions.semaphore:
+            self._calls += 1
+            session, reused = await self._acquire(sessions)
+            try:
+                return await self._call_once(sessions, session, fn)
+            except McpError:
+                raise
+            except Exception as e:
+                if not reused:
+                    raise
+                logger.debug(f'MCP session to {self.name} failed, reconnecting: {e}')
+            self._reconnects += 1
+            session = await self._connect(sessions)
+            return await self._call_once(sessions, session, fn)
+
+    async def aclose(self) -> None:
+        """Close all sessions, waiting for those opened on the running event loop to disconnect."""
+        loop = asyncio.get_running_loop()
+        sessions = self._loops.get(loop)
+        tasks = [session.task for session in sessions.sessions] if sessions else []
+        self.close()
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def close(self) -> None:
+        """Close all sessions. Safe to call from any thread, the sessions disconnect on their own event loops."""
+        self._closed = True
+        for loop, sessions in list(self._loops.items()):
+            for session in sessions.sessions:
+                if not loop.is_closed():
+                    loop.call_soon_threadsafe(session.stop.set)
+            sessions.sessions.clear()
+            sessions.idle.clear()
+        self._loops.clear()
+
+    def get_stats(self) -> dict[str, int]:
+        """Get counters for monitoring how often sessions are reused."""
+        return {
+            'sessions': sum(len(s.sessions) for s in self._loops.values()),
+            'idle_sessions': sum(len(s.idle) for s in self._loops.values()),
+            'calls': self._calls,
+            'connects': self._connects,
+            'reuses': self._reuses,
+            'reconnects': self._reconnects,
+            'pings': self._pings,
+        }
+
+    def _get_loop_sessions(self) -> _LoopSessions:
+        loop = asyncio.get_running_loop()
+        sessions = self._loops.get(loop)
+        if sessions is None:
+            sessions = self._loops[loop] = _LoopSessions(
+                semaphore=asyncio.Semaphore(self.max_size)
+            )
+        return sessions
+
+    async def _call_once(
+        self,
+        sessions: _LoopSessions,
+        session: _PooledSession,
+        fn: Callable[[Client], Awaitable[T]],
+    ) -> T:
+        try:
+            result = await fn(session.client)
+        except McpError:
+            # The server answered, so the session is still usable
+            self._release(sessions, session)
+            raise
+        except BaseException:
+            self._discard(sessions, session)
+            raise
+        self._release(sessions, session)
+        return result
+
+    async def _acquire(self, sessions: _LoopSessions) -> tuple[_PooledSession, bool]:
+        """Get an idle session, or connect a new one. Returns the session and whether it was reused."""
+        while sessions.idle:
+            session = sessions.idle.pop()
+            if not session.is_alive():
+                self._discard(sessions, session)
+                continue
+            if time.monotonic() - session.last_used > self.keepalive_interval:
+                self._pings += 1
+                try:
+                    await asyncio.wait_for(session.client.ping(), self.ping_timeout)
+                except Exception as e:
+                    logger.debug(f'Idle MCP session to {self.name} is stale: {e}')
+                    self._discard(sessions, session)
+                    continue
+            self._reuses += 1
+            return session, True
+        return await self._connect(sessions), False
+
+    async def _connect(self, sessions: _LoopSessions) -> _PooledSession:
+        client = self.client_factory()
+        ready: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        stop = asyncio.Event()
+        task = asyncio.create_task(self._hold(client, ready, stop))
+        try:
+            await ready
+        except BaseException:
+            task.cancel()
+            raise
+        self._connects += 1
+        session = _PooledSession(client=client, stop=stop, task=task)
+        sessions.sessions.add(session)
+        return session
+
+    async def _hold(
+        self, client: Client, ready: 'asyncio.Future[None]', stop: asyncio.Event
+    ) -> None:
+        try:
+            async with client:
+                ready.set_result(None)
+                await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.debug(f'MCP session to {self.name} closed with an error: {e}')
+
+    def _release(self, sessions: _LoopSessions, session: _PooledSession) -> None:
+        session.last_used = time.monotonic()
+        if session in sessions.sessions:
+            sessions.idle.append(session)
+
+    def _discard(self, sessions: _LoopSessions, session: _PooledSession) -> None:
+        sessions.sessions.discard(session)
+        session.stop.set()
@@ -129,18 +129,38 @@ async def fetch_mcp_tools_from_config(
     except Exception as e:
         logger.error(f'Error fetching MCP tools: {str(e)}')
         return []
+    finally:
+        # The clients are only used to list the tools, so don't keep their sessions open
+        for client in mcp_clients:
+            await client.disconnect()
 
     logger.debug(f'MCP tools: {mcp_tools}')
     return mcp_tools
 
 
-async def call_tool_mcp(mcp_clients: list[MCPClient], action: MCPAction) -> Observation:
+def get_mcp_tool_clients(mcp_clients: list[MCPClient]) -> dict[str, MCPClient]:
+    """
+    Map the name of each tool to the first MCP client that provides it.
+    """
+    tool_clients: dict[str, MCPClient] = {}
+    for client in mcp_clients:
+        for tool in client.tools:
+            tool_clients.setdefault(tool.name, client)
+    return tool_clients
+
+
+async def call_tool_mcp(
+    mcp_clients: list[MCPClient],
+    action: MCPAction,
+    tool_clients: dict[str, MCPClient] | None = None,
+) -> Observation:
     """
     Call a tool on an MCP server and return the observation.
 
     Args:
         mcp_clients: The list of MCP clients to execute the action on
         action: The MCP action to execute
+        tool_clients: The clients by tool name, as built by get_mcp_tool_clients. Built from mcp_clients if not provided.
 
     Returns:
         The observation from the MCP server
@@ -160,22 +180,16 @@ async def call_tool_mcp(mcp_clients: list[MCPClient], action: MCPAction) -> Obse
     logger.debug(f'MCP action received: {action}')
 
     # Find the MCP client that has the matching tool name
-    matching_client = None
-    logger.debug(f'MCP clients: {mcp_clients}')
-    logger.debug(f'MCP action name: {action.name}')
-
-    for client in mcp_clients:
-        logger.debug(f'MCP client tools: {client.tools}')
-        if action.name in [tool.name for tool in client.tools]:
-            matching_client = client
-            break
+    if tool_clients is None:
+        tool_clients = get_mcp_tool_clients(mcp_clients)
+    matching_client = tool_clients.get(action.name)
 
     if matching_client is None:
         raise ValueError(f'No matching MCP agent found for tool name: {action.name}')
 
-    logger.debug(f'Matching client: {matching_client}')
+    logger.debug(f'Matching client for MCP action {action.name}: {matching_client}')
 
-    # Call the tool - this will create a new connection internally
+    # Call the tool on a pooled session of the client
     response = await matching_client.call_tool(action.name, action.arguments)
     logger.debug(f'MCP response: {response}')
 
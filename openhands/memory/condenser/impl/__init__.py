@@ -22,6 +22,9 @@ from openhands.memory.condenser.impl.recent_events_condenser import (
 from openhands.memory.condenser.impl.structured_summary_condenser import (
     StructuredSummaryCondenser,
 )
+from openhands.memory.condenser.impl.token_budget_condenser import (
+    TokenBudgetCondenser,
+)
 
 __all__ = [
     'AmortizedForgettingCondenser',
@@ -33,5 +36,6 @@ __all__ = [
     'BrowserOutputCondenser',
     'RecentEventsCondenser',
     'StructuredSummaryCondenser',
+    'TokenBudgetCondenser',
     'CondenserPipeline',
 ]
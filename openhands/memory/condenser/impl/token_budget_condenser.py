@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from openhands.core.config.condenser_config import TokenBudgetCondenserConfig
+from openhands.events.action.agent import CondensationAction
+from openhands.events.event import Event
+from openhands.llm import LLM
+from openhands.memory.condenser.condenser import (
+    Condensation,
+    RollingCondenser,
+    View,
+)
+
+# Rough number of characters per token, for when the tokenizer cannot count
+CHARS_PER_TOKEN = 4
+
+
+class TokenBudgetCondenser(RollingCondenser):
+    """A condenser that forgets old events when the history grows past a token budget.
+
+    The token count of each event is computed once, with the tokenizer of the LLM, and
+    cached by event id. The condenser keeps a running total for the current view, so
+    checking the budget on every step only counts the events added since the last
+    step.
+    """
+
+    def __init__(
+        self,
+        llm: LLM,
+        max_input_tokens: int | None = None,
+        trigger_fraction: float = 0.8,
+        target_fraction: float = 0.5,
+        keep_first: int = 1,
+    ):
+        """Initialize the condenser.
+
+        Args:
+            llm: The LLM whose tokenizer is used to count tokens. No completions are requested.
+            max_input_tokens: The token budget of the history. Defaults to the max_input_tokens of the LLM.
+            trigger_fraction: Fraction of the budget above which the history is condensed.
+            target_fraction: Fraction of the budget the history is condensed down to.
+            keep_first: Number of initial events to always keep.
+
+        Raises:
+            ValueError: If the fractions are not in (0, 1], target_fraction is greater than trigger_fraction, or keep_first is negative.
+        """
+        if not 0 < trigger_fraction <= 1 or not 0 < target_fraction <= 1:
+            raise ValueError(
+                f'trigger_fraction ({trigger_fraction}) and target_fraction ({target_fraction}) must be in (0, 1]'
+            )
+        if target_fraction > trigger_fraction:
+            raise ValueError(
+                f'target_fraction ({target_fraction}) cannot be greater than trigger_fraction ({trigger_fraction})'
+            )
+        if keep_first < 0:
+            raise ValueError(f'keep_first ({keep_first}) cannot be negative')
+
+        self.llm = llm
+        self.max_input_tokens = max_input_tokens or llm.config.max_input_tokens or 4096
+        self.trigger_fraction = trigger_fraction
+        self.target_fraction = target_fraction
+        self.keep_first = keep_first
+
+        # Token counts of the events seen so far, by event id
+        self._token_counts: dict[int, int] = {}
+        # Events without an id (the summary of a condensation) are only cached by content
+        self._unidentified_token_count: tuple[str, int] | None = None
+
+        # Running total of the last view, and what is needed to tell that a new view
+        # only appends to it
+        self._total_tokens = 0
+        self._total_length = 0
+        self._total_last_event: Event | None = None
+        self._total_forgotten_event_ids: frozenset[int] = frozenset()
+
+        super().__init__()
+
+    @property
+    def trigger_tokens(self) -> int:
+        return int(self.max_input_tokens * self.trigger_fraction)
+
+    @property
+    def target_tokens(self) -> int:
+        return int(self.max_input_tokens * self.target_fraction)
+
+    def _count_tokens(self, text: str) -> int:
+        count = self.llm.get_token_count([{'role': 'user', 'content': text}])
+        # get_token_count returns 0 when the model has no tokenizer
+        return count or len(text) // CHARS_PER_TOKEN + 1
+
+    def get_token_count(self, event: Event) -> int:
+        """Get the (approximate) number of tokens the event contributes to the prompt."""
+        if event.id != Event.INVALID_ID:
+            count = self._token_counts.get(event.id)
+            if count is None:
+                count = self._token_counts[event.id] = self._count_tokens(str(event))
+            return count
+
+        text = str(event)
+        if (
+            self._unidentified_token_count is None
+            or self._unidentified_token_count[0] != text
+        ):
+            self._unidentified_token_count = (text, self._count_tokens(text))
+        return self._unidentified_token_count[1]
+
+    def get_total_tokens(self, view: View) -> int:
+        """Get the number of tokens in the view, only counting the events appended since the last call."""
+        length = self._total_length
+        if not (
+            view.forgotten_event_ids == self._total_forgotten_event_ids
+            and len(view) >= length
+            and (length == 0 or view.events[length - 1] is self._total_last_event)
+        ):
+            length = 0
+            self._total_tokens = 0
+        for event in view.events[length:]:
+            self._total_tokens += self.get_token_count(event)
+
+        self._total_length = len(view)
+        self._total_last_event = view.events[-1] if view.events else None
+        self._total_forgotten_event_ids = view.forgotten_event_ids
+        return self._total_tokens
+
+    def should_condense(self, view: View) -> bool:
+        if self.get_total_tokens(view) <= self.trigger_tokens:
+            return False
+        # The head and the last event are always kept, so there must be something in between
+        return any(event.id != Event.INVALID_ID for event in view[self.keep_first : -1])
+
+    def get_condensation(self, view: View) -> Condensation:
+        head = view[: self.keep_first]
+        budget = self.target_tokens - sum(self.get_token_count(e) for e in head)
+
+        # Keep the longest tail that fits the budget, but always at least the last event
+        tail_start = len(view) - 1
+        budget -= self.get_token_count(view[tail_start])
+        while tail_start > len(head):
+            count = self.get_token_count(view[tail_start - 1])
+            if count > budget:
+                break
+            budget -= count
+            tail_start -= 1
+
+        # Forget everything before the tail, or at least one event if that only leaves
+        # events without ids (i.e. the summary of a previous condensation)
+        forgotten_events = [
+            event
+            for event in view[len(head) : tail_start]
+            if event.id != Event.INVALID_ID
+        ] or [event for event in view[len(head) : -1] if event.id != Event.INVALID_ID][
+            :1
+        ]
+
+        self.add_metadata('total_tokens', self._total_tokens)
+        self.add_metadata(
+            'forgotten_tokens',
+            sum(self.get_token_count(event) for event in forgotten_events),
+        )
+
+        return Condensation(
+            action=CondensationAction(
+                forgotten_events_start_id=min(event.id for event in forgotten_events),
+                forgotten_events_end_id=max(event.id for event in forgotten_events),
+            )
+        )
+
+    @classmethod
+    def from_config(cls, config: TokenBudgetCondenserConfig) -> TokenBudgetCondenser:
+        return TokenBudgetCondenser(
+            llm=LLM(config=config.llm_config),
+            max_input_tokens=config.max_input_tokens,
+            trigger_fraction=config.trigger_fraction,
+            target_fraction=config.target_fraction,
+            keep_first=config.keep_first,
+        )
+
+
+TokenBudgetCondenser.register_config(TokenBudgetCondenserConfig)
@@ -1,3 +1,5 @@
+import operator
+from dataclasses import dataclass, field
 from typing import Generator
 
 from litellm import ModelResponse
@@ -49,12 +51,31 @@ from openhands.utils.prompt import (
 )
 
 
+@dataclass
+class _ProcessedEvents:
+    """The messages built from a list of events, kept to process only the events appended to it later."""
+
+    # Settings the messages were built with, the cache is dropped when they change
+    settings: tuple
+    events: list[Event] = field(default_factory=list)
+    messages: list[Message] = field(default_factory=list)
+    pending_tool_call_action_messages: dict[str, Message] = field(default_factory=dict)
+    tool_call_id_to_message: dict[str, Message] = field(default_factory=dict)
+    # Ids of the tool calls and tool responses in messages
+    tool_call_ids: set[str] = field(default_factory=set)
+    tool_response_ids: set[str] = field(default_factory=set)
+    # Number of leading messages that are known to pass the tool call filter unchanged
+    settled: int = 0
+
+
 class ConversationMemory:
     """Processes event history into a coherent conversation for the agent."""
 
     def __init__(self, config: AgentConfig, prompt_manager: PromptManager):
         self.agent_config = config
         self.prompt_manager = prompt_manager
+        self._processed: _ProcessedEvents | None = None
+        self._legacy_system_message: SystemMessageAction | None = None
 
     def process_events(
         self,
@@ -67,6 +88,11 @@ class ConversationMemory:
 
         Ensures that tool call actions are processed correctly in function calling mode.
 
+        The messages built for the events of the previous call are reused when the events
+        start with the same events (e.g. the history grew by a step), so only the appended
+        events are processed. Condensation, a reloaded history or different settings make
+        the whole history be processed again.
+
         Args:
             condensed_history: The condensed history of events to convert
             max_message_chars: The maximum number of characters in the content of an event included
@@ -84,14 +110,30 @@ class ConversationMemory:
         # log visual browsing status
         logger.debug(f'Visual browsing: {self.agent_config.enable_som_visual_browsing}')
 
-        # Initialize empty messages list
-        messages = []
+        settings = (
+            max_message_chars,
+            vision_is_active,
+            self.agent_config.enable_som_visual_browsing,
+            self.agent_config.enable_prompt_extensions,
+            tuple(self.agent_config.disabled_microagents or ()),
+        )
+        processed = self._processed
+        if (
+            processed is None
+            or processed.settings != settings
+            or len(processed.events) > len(events)
+            or not all(map(operator.is_, processed.events, events))
+        ):
+            processed = _ProcessedEvents(settings=settings)
+        self._processed = processed
 
-        # Process regular events
-        pending_tool_call_action_messages: dict[str, Message] = {}
-        tool_call_id_to_message: dict[str, Message] = {}
+        # Process the new events
+        messages = processed.messages
+        pending_tool_call_action_messages = processed.pending_tool_call_action_messages
+        tool_call_id_to_message = processed.tool_call_id_to_message
 
-        for i, event in enumerate(events):
+        for i in range(len(processed.events), len(events)):
+            event = events[i]
             # create a regular message from an event
             if isinstance(event, Action):
                 messages_to_add = self._process_action(
@@ -139,28 +181,54 @@ class ConversationMemory:
                 pending_tool_call_action_messages.pop(response_id)
 
             messages += messages_to_add
+            processed.events.append(event)
+            for message in messages_to_add:
+                if message.role == 'assistant' and message.tool_calls:
+                    processed.tool_call_ids.update(
+                        tool_call.id for tool_call in message.tool_calls if tool_call.id
+                    )
+                elif message.role == 'tool' and message.tool_call_id:
+                    processed.tool_response_ids.add(message.tool_call_id)
 
         # Apply final filtering so that the messages in context don't have unmatched tool calls
-        # and tool responses, for example
-        messages = list(ConversationMemory._filter_unmatched_tool_calls(messages))
+        # and tool responses, for example. Once a message passes unchanged it always will,
+        # since later messages can only add matches, so only the rest are filtered again.
+        unsettled = messages[processed.settled :]
+        filtered = list(
+            ConversationMemory._filter_tool_calls_by_ids(
+                unsettled, processed.tool_call_ids, processed.tool_response_ids
+            )
+        )
+        result = messages[: processed.settled] + filtered
+        for message, filtered_message in zip(unsettled, filtered):
+            if message is not filtered_message:
+                break
+            processed.settled += 1
 
         # Apply final formatting
-        messages = self._apply_user_message_formatting(messages)
+        result = self._apply_user_message_formatting(result)
 
-        return messages
+        return result
 
     def _apply_user_message_formatting(self, messages: list[Message]) -> list[Message]:
-        """Applies formatting rules, such as adding newlines between consecutive user messages."""
+        """Applies formatting rules, such as adding newlines between consecutive user messages.
+
+        Messages are reused across calls, so formatted messages are copies.
+        """
         formatted_messages = []
         prev_role = None
         for msg in messages:
             # Add double newline between consecutive user messages
             if msg.role == 'user' and prev_role == 'user' and len(msg.content) > 0:
                 # Find the first TextContent in the message to add newlines
-                for content_item in msg.content:
+                for i, content_item in enumerate(msg.content):
                     if isinstance(content_item, TextContent):
                         # Prepend two newlines to ensure visual separation
-                        content_item.text = '\n\n' + content_item.text
+                        content = list(msg.content)
+                        content[i] = content_item.model_copy(
+                            update={'text': '\n\n' + content_item.text}
+                        )
+                        msg = msg.model_copy(update={'content': content})
                         break
             formatted_messages.append(msg)
             prev_role = msg.role  # Update prev_role after processing each message
@@ -600,17 +668,23 @@ class ConversationMemory:
         """Applies caching breakpoints to the messages.
 
         For new Anthropic API, we only need to mark the last user or tool message as cacheable.
+        Marked messages are replaced by copies, since messages are reused across calls.
         """
         if len(messages) > 0 and messages[0].role == 'system':
-            messages[0].content[-1].cache_prompt = True
+            messages[0] = self._with_cache_prompt(messages[0])
         # NOTE: this is only needed for anthropic
-        for message in reversed(messages):
-            if message.role in ('user', 'tool'):
-                message.content[
-                    -1
-                ].cache_prompt = True  # Last item inside the message content
+        for i in range(len(messages) - 1, -1, -1):
+            if messages[i].role in ('user', 'tool'):
+                messages[i] = self._with_cache_prompt(messages[i])
                 break
 
+    @staticmethod
+    def _with_cache_prompt(message: Message) -> Message:
+        # Mark the last item inside the message content
+        content = list(message.content)
+        content[-1] = content[-1].model_copy(update={'cache_prompt': True})
+        return message.model_copy(update={'content': content})
+
     def _filter_agents_in_microagent_obs(
         self, obs: RecallObservation, current_index: int, events: list[Event]
     ) -> list[MicroagentKnowledge]:
@@ -683,7 +757,15 @@ class ConversationMemory:
             for message in messages
             if message.role == 'tool' and message.tool_call_id
         }
+        return ConversationMemory._filter_tool_calls_by_ids(
+            messages, tool_call_ids, tool_response_ids
+        )
 
+    @staticmethod
+    def _filter_tool_calls_by_ids(
+        messages: list[Message], tool_call_ids: set[str], tool_response_ids: set[str]
+    ) -> Generator[Message, None, None]:
+        """Filter out tool calls and tool responses whose ids are not among the given ones."""
         for message in messages:
             # Remove tool messages with no matching assistant tool call
             if message.role == 'tool' and message.tool_call_id:
@@ -729,7 +811,11 @@ class ConversationMemory:
             )
             system_prompt = self.prompt_manager.get_system_message()
             if system_prompt:
-                system_message = SystemMessageAction(content=system_prompt)
+                # Reuse the same action on every call, so the messages built after it can be reused
+                system_message = self._legacy_system_message
+                if system_message is None or system_message.content != system_prompt:
+                    system_message = SystemMessageAction(content=system_prompt)
+                    self._legacy_system_message = system_message
                 # Insert the system message directly at the beginning of the events list
                 events.insert(0, system_message)
                 logger.info(
@@ -18,6 +18,9 @@ class View(BaseModel):
 
     events: list[Event]
 
+    forgotten_event_ids: frozenset[int] = frozenset()
+    """The IDs of the events removed from the view by condensation actions, including the actions themselves."""
+
     def __len__(self) -> int:
         return len(self.events)
 
@@ -74,4 +77,91 @@ class View(BaseModel):
                 summary_offset, AgentCondensationObservation(content=summary)
             )
 
-        return View(events=kept_events)
+        return View(
+            events=kept_events, forgotten_event_ids=frozenset(forgotten_event_ids)
+        )
+
+
+class ViewBuilder:
+    """Maintains the view of a growing list of events incrementally.
+
+    Applying the events appended since the last call costs O(new events), plus one pass
+    over the kept events for each new condensation action. The history is rescanned in
+    full only if it was replaced by another list, shrunk, or had its last seen event
+    replaced. `generation` increases whenever the view changes.
+    """
+
+    def __init__(self) -> None:
+        self.generation = 0
+        self._history: list[Event] | None = None
+        self._applied = 0
+        self._last_applied: Event | None = None
+        self._kept_events: list[Event] = []
+        self._forgotten_event_ids: set[int] = set()
+        self._summary: AgentCondensationObservation | None = None
+        self._summary_offset: int | None = None
+        self._view: View = View(events=[])
+
+    @property
+    def forgotten_event_ids(self) -> frozenset[int]:
+        return self._view.forgotten_event_ids
+
+    def get_view(self, history: list[Event]) -> View:
+        """Get the view of the history, applying only the events appended since the last call."""
+        if self._is_prefix_of(history):
+            if len(history) == self._applied:
+                return self._view
+        else:
+            self._reset(history)
+
+        for event in history[self._applied :]:
+            self._apply(event)
+        self._applied = len(history)
+        self._last_applied = history[-1] if history else None
+
+        kept_events = list(self._kept_events)
+        if self._summary is not None and self._summary_offset is not None:
+            logger.info(f'Inserting summary at offset {self._summary_offset}')
+            # The same summary observation is reused, so consumers can tell unchanged events apart by identity
+            kept_events.insert(self._summary_offset, self._summary)
+        # The events are already validated, so skip validating them again
+        self._view = View.model_construct(
+            events=kept_events,
+            forgotten_event_ids=frozenset(self._forgotten_event_ids),
+        )
+        self.generation += 1
+        return self._view
+
+    def _is_prefix_of(self, history: list[Event]) -> bool:
+        return (
+            self.generation > 0
+            and history is self._history
+            and len(history) >= self._applied
+            and (self._applied == 0 or history[self._applied - 1] is self._last_applied)
+        )
+
+    def _reset(self, history: list[Event]) -> None:
+        self._history = history
+        self._applied = 0
+        self._last_applied = None
+        self._kept_events = []
+        self._forgotten_event_ids = set()
+        self._summary = None
+        self._summary_offset = None
+
+    def _apply(self, event: Event) -> None:
+        if isinstance(event, CondensationAction):
+            newly_forgotten = set(event.forgotten) - self._forgotten_event_ids
+            self._forgotten_event_ids.update(newly_forgotten)
+            # Make sure we also forget the condensation action itself
+            self._forgotten_event_ids.add(event.id)
+            if newly_forgotten:
+                self._kept_events = [
+                    kept for kept in self._kept_events if kept.id not in newly_forgotten
+                ]
+            # The relevant summary is always in the most recent condensation event that has one
+            if event.summary is not None and event.summary_offset is not None:
+                self._summary = AgentCondensationObservation(content=event.summary)
+                self._summary_offset = event.summary_offset
+        if event.id not in self._forgotten_event_ids:
+            self._kept_events.append(event)
@@ -13,24 +13,23 @@ import mimetypes
 import os
 import shutil
 import sys
-import tempfile
 import time
 import traceback
 from contextlib import asynccontextmanager
 from pathlib import Path
-from zipfile import ZipFile
+from typing import AsyncIterator, Callable
 
 from binaryornot.check import is_binary
 from fastapi import Depends, FastAPI, HTTPException, Request, UploadFile
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from fastapi.security import APIKeyHeader
 from openhands_aci.editor.editor import OHEditor
 from openhands_aci.editor.exceptions import ToolError
 from openhands_aci.editor.results import ToolResult
 from openhands_aci.utils.diff import get_diff
 from pydantic import BaseModel
-from starlette.background import BackgroundTask
 from starlette.exceptions import HTTPException as StarletteHTTPException
 from uvicorn import run
 
@@ -66,11 +65,30 @@ from openhands.runtime.file_viewer_server import start_file_viewer_server
 from openhands.runtime.mcp.proxy import MCPProxyManager
 from openhands.runtime.plugins import ALL_PLUGINS, JupyterPlugin, Plugin, VSCodePlugin
 from openhands.runtime.utils import find_available_tcp_port
+from openhands.runtime.utils.action_scheduler import (
+    ActionScheduler,
+    is_read_only_action,
+)
 from openhands.runtime.utils.bash import BashSession
+from openhands.runtime.utils.direct_command import DirectCommandRunner
+from openhands.runtime.utils.directory_index import (
+    DirectoryIndex,
+    FileListing,
+    get_listing_etag,
+)
 from openhands.runtime.utils.files import insert_lines, read_lines
 from openhands.runtime.utils.memory_monitor import MemoryMonitor
 from openhands.runtime.utils.runtime_init import init_user_and_working_directory
+from openhands.runtime.utils.shell_stream import OutputStreamBuffer
 from openhands.runtime.utils.system_stats import get_system_stats
+from openhands.runtime.utils.workspace_sync import (
+    ChunkReader,
+    ManifestBuilder,
+    extract_tar,
+    is_in_tree,
+    iter_tar,
+    iter_zip,
+)
 from openhands.utils.async_utils import call_sync_from_async, wait_all
 
 if sys.platform == 'win32':
@@ -81,6 +99,29 @@ class ActionRequest(BaseModel):
     action: dict
 
 
+class BatchActionRequest(BaseModel):
+    actions: list[dict]
+
+
+class ListDirectoryRequest(BaseModel):
+    path: str | None = None
+    recursive: bool = False
+    details: bool = False
+    exclude_gitignored: bool = True
+    exclude: list[str] = []
+
+
+class SyncManifestRequest(BaseModel):
+    path: str
+    # The sizes of the files on the other side, only the files of the same size are hashed
+    sizes: dict[str, int] | None = None
+
+
+class SyncDownloadRequest(BaseModel):
+    path: str
+    files: list[str]
+
+
 ROOT_GID = 0
 
 SESSION_API_KEY = os.environ.get('SESSION_API_KEY')
@@ -183,7 +224,12 @@ class ActionExecutor:
             self.user_id = _updated_user_id
 
         self.bash_session: BashSession | 'WindowsPowershellSession' | None = None  # type: ignore[name-defined]
-        self.lock = asyncio.Lock()
+        # Mutating actions run one at a time, read-only ones alongside them
+        self.scheduler = ActionScheduler(
+            max_concurrent_read_only=int(
+                os.environ.get('RUNTIME_MAX_CONCURRENT_READ_ONLY_ACTIONS', 4)
+            )
+        )
         self.plugins: dict[str, Plugin] = {}
         self.file_editor = OHEditor(workspace_root=self._initial_cwd)
         self.browser: BrowserEnv | None = None
@@ -209,6 +255,16 @@ class ActionExecutor:
         )
         self.memory_monitor.start_monitoring()
 
+        # Read-only commands run as subprocesses instead of in the tmux session
+        self.direct_command_runner: DirectCommandRunner | None = None
+        if sys.platform != 'win32' and os.environ.get(
+            'RUNTIME_DIRECT_COMMANDS', 'True'
+        ).lower() in ['true', '1', 'yes']:
+            self.direct_command_runner = DirectCommandRunner(
+                username=self.username,
+                timeout=float(os.environ.get('DIRECT_COMMAND_TIMEOUT_SECONDS', 5)),
+            )
+
     @property
     def initial_cwd(self):
         return self._initial_cwd
@@ -377,21 +433,66 @@ class ActionExecutor:
             assert obs.exit_code == 0
         logger.debug('Bash init commands completed')
 
-    async def run_action(self, action) -> Observation:
-        async with self.lock:
-            action_type = action.action
+    async def run_action(
+        self, action, on_output: Callable[[str], None] | None = None
+    ) -> Observation:
+        """Run an action, passing on_output what commands print while they run in the bash session."""
+        action_type = action.action
+        if is_read_only_action(action):
+            async with self.scheduler.slot(action_type, read_only=True):
+                if isinstance(action, CmdRunAction):
+                    # Commands that cannot run as subprocesses need the session
+                    observation = await self._run_direct(action, on_output=on_output)
+                else:
+                    observation = await getattr(self, action_type)(action)
+            if observation is not None:
+                return observation
+        async with self.scheduler.slot(action_type, read_only=False):
+            if on_output is not None and isinstance(action, CmdRunAction):
+                return await self.run(action, on_output=on_output)
             observation = await getattr(self, action_type)(action)
             return observation
 
+    async def _run_direct(
+        self,
+        action: CmdRunAction,
+        on_output: Callable[[str], None] | None = None,
+    ) -> CmdOutputObservation | None:
+        """Run a read-only command as a subprocess, returning None if it must run in the bash session."""
+        bash_session = self.bash_session
+        runner = self.direct_command_runner
+        if (
+            runner is None
+            or not isinstance(bash_session, BashSession)
+            or not runner.can_run(action, bash_session)
+        ):
+            return None
+        cwd = action.cwd or self._initial_cwd if action.is_static else bash_session.cwd
+        obs = await runner.run(action, bash_session, cwd)
+        # These commands are short, their output is passed on once they complete
+        if obs is not None and obs.content and on_output is not None:
+            on_output(obs.content + '\n')
+        return obs
+
     async def run(
-        self, action: CmdRunAction
+        self,
+        action: CmdRunAction,
+        on_output: Callable[[str], None] | None = None,
     ) -> CmdOutputObservation | ErrorObservation:
         try:
+            direct_obs = await self._run_direct(action, on_output=on_output)
+            if direct_obs is not None:
+                return direct_obs
             bash_session = self.bash_session
             if action.is_static:
                 bash_session = self._create_bash_session(action.cwd)
             assert bash_session is not None
-            obs = await call_sync_from_async(bash_session.execute, action)
+            if on_output is not None and isinstance(bash_session, BashSession):
+                obs = await call_sync_from_async(
+                    bash_session.execute, action, on_output
+                )
+            else:
+                obs = await call_sync_from_async(bash_session.execute, action)
             return obs
         except Exception as e:
             logger.error(f'Error running command: {e}')
@@ -712,6 +813,15 @@ if __name__ == '__main__':
         logger.info('Shutdown complete.')
 
     app = FastAPI(lifespan=lifespan)
+    # Only applied when the client accepts compressed responses
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=int(os.environ.get('RUNTIME_COMPRESSION_MIN_SIZE', 16 * 1024)),
+    )
+    # Hashes of the files synced with the host, kept until the files change
+    manifest_builder = ManifestBuilder()
+    # Scans of the directories listed for the file browser, kept until they change
+    directory_index = DirectoryIndex()
 
     # TODO below 3 exception handlers were recommended by Sonnet.
     # Are these something we should keep?
@@ -764,6 +874,7 @@ if __name__ == '__main__':
             'uptime': uptime,
             'idle_time': idle_time,
             'resources': get_system_stats(),
+            'actions': client.scheduler.get_metrics(),
         }
         logger.info('Server info endpoint response: %s', response)
         return response
@@ -785,6 +896,66 @@ if __name__ == '__main__':
                 detail=traceback.format_exc(),
             )
 
+    @app.post('/execute_action_stream')
+    async def execute_action_stream(action_request: ActionRequest):
+        """Run an action, streaming what its command prints before its observation.
+
+        The response is a JSON object per line: {"output": ...} for each chunk of
+        output, then {"observation": ...} once the action completes.
+        """
+        assert client is not None
+        action = event_from_dict(action_request.action)
+        if not isinstance(action, Action):
+            raise HTTPException(status_code=400, detail='Invalid action type')
+        client.last_execution_time = time.time()
+        output_buffer = OutputStreamBuffer(asyncio.get_running_loop())
+
+        async def run() -> Observation:
+            try:
+                return await client.run_action(action, on_output=output_buffer.write)
+            finally:
+                output_buffer.close()
+
+        # The action completes even if the client goes away
+        task = asyncio.create_task(run())
+
+        async def stream() -> AsyncIterator[str]:
+            while (output := await output_buffer.read()) is not None:
+                yield json.dumps({'output': output}) + '\n'
+            try:
+                observation = await task
+            except Exception as e:
+                logger.error(f'Error while running /execute_action_stream: {str(e)}')
+                observation = ErrorObservation(traceback.format_exc())
+            yield json.dumps({'observation': event_to_dict(observation)}) + '\n'
+
+        return StreamingResponse(stream(), media_type='application/x-ndjson')
+
+    @app.post('/execute_actions')
+    async def execute_actions(batch_request: BatchActionRequest):
+        """Run several read-only actions concurrently, returning their observations in order."""
+        assert client is not None
+        actions = []
+        for action_dict in batch_request.actions:
+            action = event_from_dict(action_dict)
+            if not isinstance(action, Action) or not is_read_only_action(action):
+                raise HTTPException(
+                    status_code=400, detail='Only read-only actions can be batched'
+                )
+            actions.append(action)
+        try:
+            client.last_execution_time = time.time()
+            observations = await asyncio.gather(
+                *(client.run_action(action) for action in actions)
+            )
+            return [event_to_dict(observation) for observation in observations]
+        except Exception as e:
+            logger.error(f'Error while running /execute_actions: {str(e)}')
+            raise HTTPException(
+                status_code=500,
+                detail=traceback.format_exc(),
+            )
+
     @app.post('/update_mcp_server')
     async def update_mcp_server(request: Request):
         # Check if we're on Windows
@@ -904,23 +1075,67 @@ if __name__ == '__main__':
             if not os.path.exists(path):
                 raise HTTPException(status_code=404, detail='File not found')
 
-            with tempfile.NamedTemporaryFile(suffix='.zip', delete=False) as temp_zip:
-                with ZipFile(temp_zip, 'w') as zipf:
-                    for root, _, files in os.walk(path):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            zipf.write(
-                                file_path, arcname=os.path.relpath(file_path, path)
-                            )
-                return FileResponse(
-                    path=temp_zip.name,
-                    media_type='application/zip',
-                    filename=f'{os.path.basename(path)}.zip',
-                    background=BackgroundTask(lambda: os.unlink(temp_zip.name)),
-                )
+            # The archive is built while it is sent, without a temporary file
+            filename = f'{os.path.basename(path)}.zip'
+            return StreamingResponse(
+                iter_zip(path),
+                media_type='application/zip',
+                headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+            )
+
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    # ================================
+    # Incremental sync of directories with the host
+    # ================================
+
+    @app.post('/sync/manifest')
+    def get_sync_manifest(request: SyncManifestRequest):
+        """Get the manifest of the files under a directory, as {path: [size, mtime_ns, sha256]}."""
+        if not os.path.isabs(request.path):
+            raise HTTPException(status_code=400, detail='Path must be an absolute path')
+        return {'files': manifest_builder.build(request.path, request.sizes)}
+
+    @app.post('/sync/download')
+    def download_sync_files(request: SyncDownloadRequest):
+        """Stream a tar archive of the given files under a directory."""
+        if not os.path.isabs(request.path):
+            raise HTTPException(status_code=400, detail='Path must be an absolute path')
+        outside = [f for f in request.files if not is_in_tree(request.path, f)]
+        if outside:
+            raise HTTPException(
+                status_code=400, detail=f'Files must be under {request.path}: {outside}'
+            )
+        return StreamingResponse(
+            iter_tar(request.path, request.files), media_type='application/x-tar'
+        )
 
+    @app.post('/sync/upload')
+    async def upload_sync_files(request: Request, destination: str):
+        """Extract a tar archive streamed in the body of the request into destination."""
+        if not os.path.isabs(destination):
+            raise HTTPException(
+                status_code=400, detail='Destination must be an absolute path'
+            )
+        loop = asyncio.get_running_loop()
+        body = request.stream().__aiter__()
+
+        def next_chunk() -> bytes:
+            try:
+                return asyncio.run_coroutine_threadsafe(body.__anext__(), loop).result()
+            except StopAsyncIteration:
+                return b''
+
+        try:
+            files = await call_sync_from_async(
+                extract_tar, ChunkReader(next_chunk), destination
+            )
         except Exception as e:
+            logger.error(f'Error while extracting synced files: {e}')
             raise HTTPException(status_code=500, detail=str(e))
+        logger.debug(f'Synced {len(files)} files to {destination}')
+        return {'files': files}
 
     @app.get('/alive')
     async def alive():
@@ -990,38 +1205,47 @@ if __name__ == '__main__':
             if not os.path.exists(full_path) or not os.path.isdir(full_path):
                 return JSONResponse(content=[])
 
-            entries = os.listdir(full_path)
-
-            # Separate directories and files
-            directories = []
-            files = []
-            for entry in entries:
-                # Remove leading slash and any parent directory components
-                entry_relative = entry.lstrip('/').split('/')[-1]
-
-                # Construct the full path by joining the base path with the relative entry path
-                full_entry_path = os.path.join(full_path, entry_relative)
-                if os.path.exists(full_entry_path):
-                    is_dir = os.path.isdir(full_entry_path)
-                    if is_dir:
-                        # add trailing slash to directories
-                        # required by FE to differentiate directories and files
-                        entry = entry.rstrip('/') + '/'
-                        directories.append(entry)
-                    else:
-                        files.append(entry)
-
-            # Sort directories and files separately
-            directories.sort(key=lambda s: s.lower())
-            files.sort(key=lambda s: s.lower())
-
-            # Combine sorted directories and files
-            sorted_entries = directories + files
-            return JSONResponse(content=sorted_entries)
+            # Directories have a trailing slash, required by FE to differentiate
+            # directories and files, and are sorted before files
+            listing = await call_sync_from_async(directory_index.get_listing, full_path)
+            return JSONResponse(content=listing.entries)
 
         except Exception as e:
             logger.error(f'Error listing files: {e}')
             return JSONResponse(content=[])
 
+    @app.post('/list_directory')
+    async def list_directory(list_request: ListDirectoryRequest, request: Request):
+        """List a directory for the file browser, leaving out gitignored entries by default.
+
+        The listing can include the content of subdirectories, and the size and
+        modification time of each entry. It comes with an ETag: when the listing did not
+        change since the ETag in the If-None-Match header, a 304 is returned instead.
+        """
+        assert client is not None
+        path = list_request.path
+        if path is None:
+            full_path = client.initial_cwd
+        else:
+            full_path = os.path.join(client.initial_cwd, path)
+
+        if os.path.isdir(full_path):
+            listing = await call_sync_from_async(
+                directory_index.get_listing,
+                full_path,
+                root=client.initial_cwd,
+                recursive=list_request.recursive,
+                details=list_request.details,
+                exclude_gitignored=list_request.exclude_gitignored,
+                exclude=list_request.exclude,
+            )
+        else:
+            # if user just removed a folder, prevent server error 500 in UI
+            listing = FileListing(entries=[], etag=get_listing_etag([]))
+        headers = {'ETag': listing.etag}
+        if request.headers.get('If-None-Match') == listing.etag:
+            return Response(status_code=304, headers=headers)
+        return JSONResponse(content=listing.entries, headers=headers)
+
     logger.debug(f'Starting action execution API on port {args.port}')
     run(app, host='0.0.0.0', port=args.port)
@@ -14,6 +14,8 @@ from typing import Callable, cast
 from zipfile import ZipFile
 
 import httpx
+from pathspec import PathSpec
+from pathspec.patterns import GitWildMatchPattern
 
 from openhands.core.config import OpenHandsConfig, SandboxConfig
 from openhands.core.config.mcp_config import MCPConfig, MCPStdioServerConfig
@@ -60,6 +62,7 @@ from openhands.runtime.plugins import (
     VSCodeRequirement,
 )
 from openhands.runtime.runtime_status import RuntimeStatus
+from openhands.runtime.utils.directory_index import FileListing, get_listing_etag
 from openhands.runtime.utils.edit import FileEditRuntimeMixin
 from openhands.runtime.utils.git_handler import CommandResult, GitHandler
 from openhands.utils.async_utils import (
@@ -884,6 +887,46 @@ fi
         """
         raise NotImplementedError('This method is not implemented in the base class.')
 
+    def get_file_listing(
+        self,
+        path: str | None = None,
+        recursive: bool = False,
+        details: bool = False,
+        exclude: list[str] | None = None,
+    ) -> FileListing:
+        """List files in the sandbox for the file browser, relative to path.
+
+        Entries ignored by .gitignore files and entries whose name is in exclude are left
+        out. Runtimes that support it can list subdirectories (recursive) and the size
+        and modification time of each entry (details). By default, the entries of the
+        directory are listed with list_files and filtered with the .gitignore file at
+        the root of the workspace, and a NotImplementedError is raised for recursive and
+        detailed listings.
+        """
+        if recursive or details:
+            raise NotImplementedError(
+                'Recursive and detailed listings are not supported by this runtime.'
+            )
+        excluded = set(exclude or [])
+        entries = [
+            entry
+            for entry in self.list_files(path)
+            if os.path.basename(entry.rstrip('/'))
+            + ('/' if entry.endswith('/') else '')
+            not in excluded
+        ]
+        observation = self.run_action(FileReadAction('.gitignore'))
+        if isinstance(observation, FileReadObservation):
+            spec = PathSpec.from_lines(
+                GitWildMatchPattern, observation.content.splitlines()
+            )
+            entries = [
+                entry
+                for entry in entries
+                if not spec.match_file(os.path.join(path or '', entry))
+            ]
+        return FileListing(entries=entries, etag=get_listing_etag(entries))
+
     @abstractmethod
     def copy_from(self, path: str) -> Path:
         """Zip all files in the sandbox and return a path in the local filesystem."""
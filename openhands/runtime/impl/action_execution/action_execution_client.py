@@ -1,9 +1,12 @@
+import json
 import os
 import tempfile
 import threading
+import time
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
-from zipfile import ZipFile
+from typing import TYPE_CHECKING, Any, Callable
+from urllib.parse import urlparse
 
 import httpcore
 import httpx
@@ -12,10 +15,12 @@ from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponen
 from openhands.core.config import OpenHandsConfig
 from openhands.core.config.mcp_config import (
     MCPConfig,
+    MCPSHTTPServerConfig,
     MCPSSEServerConfig,
     MCPStdioServerConfig,
 )
 from openhands.core.exceptions import (
+    AgentRuntimeDisconnectedError,
     AgentRuntimeTimeoutError,
 )
 from openhands.events import EventStream
@@ -45,10 +50,26 @@ from openhands.events.serialization.action import ACTION_TYPE_TO_CLASS
 from openhands.integrations.provider import PROVIDER_TOKEN_TYPE
 from openhands.runtime.base import Runtime
 from openhands.runtime.plugins import PluginRequirement
+from openhands.runtime.utils.action_scheduler import is_read_only_action
+from openhands.runtime.utils.directory_index import FileListing
+from openhands.runtime.utils.latency_histogram import LatencyHistogram
 from openhands.runtime.utils.request import send_request
+from openhands.runtime.utils.workspace_sync import (
+    CHUNK_SIZE,
+    ChunkReader,
+    Manifest,
+    ManifestBuilder,
+    extract_tar,
+    get_changed_files,
+    get_sizes,
+    iter_tar,
+)
 from openhands.utils.http_session import HttpSession
 from openhands.utils.tenacity_stop import stop_if_should_exit
 
+if TYPE_CHECKING:
+    from openhands.mcp.client import MCPClient
+
 
 def _is_retryable_error(exception):
     return isinstance(
@@ -56,6 +77,22 @@ def _is_retryable_error(exception):
     )
 
 
+@dataclass(eq=False)
+class _MCPConnections:
+    """The MCP clients connected to a list of servers, and the tool calls using them."""
+
+    servers: list[MCPSSEServerConfig | MCPSHTTPServerConfig]
+    clients: list['MCPClient']
+    tool_clients: dict[str, 'MCPClient'] = field(default_factory=dict)
+    calls: int = 0
+    # Replaced by clients connected to other servers, closed after the last call
+    retired: bool = False
+
+    def close(self) -> None:
+        for client in self.clients:
+            client.close()
+
+
 class ActionExecutionClient(Runtime):
     """Base class for runtimes that interact with the action execution server.
 
@@ -77,10 +114,31 @@ class ActionExecutionClient(Runtime):
         git_provider_tokens: PROVIDER_TOKEN_TYPE | None = None,
     ):
         self.session = HttpSession()
+        # httpx accepts compressed responses by default, the server only compresses them on demand
+        if not config.sandbox.compress_responses:
+            self.session.headers['Accept-Encoding'] = 'identity'
+        # Latencies of the requests to the action execution server, by path
+        self._latencies: dict[str, LatencyHistogram] = {}
+        self._shell_stream_callback: Callable[[str], None] | None = None
+        # Last listing returned by the server for each listing request, by its JSON body
+        self._file_listings: dict[str, FileListing] = {}
+        # Whether the action execution server can list directories, older ones cannot
+        self._list_directory_supported = True
         self.action_semaphore = threading.Semaphore(1)  # Ensure one action at a time
+        # Read-only actions are not queued behind the actions that mutate the sandbox
+        self.read_only_action_semaphore = threading.Semaphore(
+            config.sandbox.max_concurrent_read_only_actions
+        )
+        # Hashes of the host files synced with the sandbox, kept until the files change
+        self._manifest_builder = ManifestBuilder()
         self._runtime_closed: bool = False
         self._vscode_token: str | None = None  # initial dummy value
         self._last_updated_mcp_stdio_servers: list[MCPStdioServerConfig] = []
+        # MCP clients are kept connected across tool calls, until the servers change
+        self._mcp_connections: _MCPConnections | None = None
+        # Tool calls may run on different event loops, so a thread lock guards the
+        # connections and counts their calls
+        self._mcp_lock = threading.Lock()
         super().__init__(
             config,
             event_stream,
@@ -122,7 +180,24 @@ class ActionExecutionClient(Runtime):
         Raises:
             AgentRuntimeError: If the request fails
         """
-        return send_request(self.session, method, url, **kwargs)
+        start = time.monotonic()
+        try:
+            return send_request(self.session, method, url, **kwargs)
+        finally:
+            self._record_latency(url, time.monotonic() - start)
+
+    def _record_latency(self, url: str, latency: float) -> None:
+        path = urlparse(url).path
+        histogram = self._latencies.get(path)
+        if histogram is None:
+            histogram = self._latencies.setdefault(path, LatencyHistogram())
+        histogram.record(latency)
+
+    def get_latency_metrics(self) -> dict[str, dict]:
+        """Get the latency histograms of the requests to the action execution server, by path."""
+        return {
+            path: histogram.to_dict() for path, histogram in self._latencies.items()
+        }
 
     def check_if_alive(self) -> None:
         response = self._send_action_server_request(
@@ -156,6 +231,62 @@ class ActionExecutionClient(Runtime):
         except httpx.TimeoutException:
             raise TimeoutError('List files operation timed out')
 
+    def get_file_listing(
+        self,
+        path: str | None = None,
+        recursive: bool = False,
+        details: bool = False,
+        exclude: list[str] | None = None,
+    ) -> FileListing:
+        if not self._list_directory_supported:
+            return super().get_file_listing(path, recursive, details, exclude)
+        data: dict[str, Any] = {
+            'path': path,
+            'recursive': recursive,
+            'details': details,
+            'exclude': exclude or [],
+        }
+        key = json.dumps(data, sort_keys=True)
+        cached = self._file_listings.get(key)
+        headers = {'If-None-Match': cached.etag} if cached is not None else {}
+        try:
+            response = self._send_action_server_request(
+                'POST',
+                f'{self.action_execution_server_url}/list_directory',
+                json=data,
+                headers=headers,
+                timeout=10,
+            )
+        except (httpx.HTTPStatusError, AgentRuntimeDisconnectedError) as e:
+            if (
+                isinstance(e, httpx.HTTPStatusError)
+                and cached is not None
+                and e.response.status_code == 304
+            ):
+                return cached
+            # RemoteRuntime raises a 404 as an AgentRuntimeDisconnectedError
+            error = e if isinstance(e, httpx.HTTPStatusError) else e.__cause__
+            if (
+                not isinstance(error, httpx.HTTPStatusError)
+                or error.response.status_code != 404
+            ):
+                raise
+            listing = super().get_file_listing(path, recursive, details, exclude)
+            self.log(
+                'info',
+                'The action execution server cannot list directories, using list_files',
+            )
+            self._list_directory_supported = False
+            return listing
+        except httpx.TimeoutException:
+            raise TimeoutError('List files operation timed out')
+        listing = FileListing(
+            entries=response.json(), etag=response.headers.get('ETag', '')
+        )
+        if listing.etag:
+            self._file_listings[key] = listing
+        return listing
+
     def copy_from(self, path: str) -> Path:
         """Zip all files in the sandbox and return as a stream of bytes."""
         try:
@@ -182,71 +313,115 @@ class ActionExecutionClient(Runtime):
         if not os.path.exists(host_src):
             raise FileNotFoundError(f'Source file {host_src} does not exist')
 
-        temp_zip_path: str | None = None  # Define temp_zip_path outside the try block
-
-        try:
-            params = {'destination': sandbox_dest, 'recursive': str(recursive).lower()}
-            file_to_upload = None
-            upload_data = {}
-
-            if recursive:
-                # Create and write the zip file inside the try block
-                with tempfile.NamedTemporaryFile(
-                    suffix='.zip', delete=False
-                ) as temp_zip:
-                    temp_zip_path = temp_zip.name
-
-                try:
-                    with ZipFile(temp_zip_path, 'w') as zipf:
-                        for root, _, files in os.walk(host_src):
-                            for file in files:
-                                file_path = os.path.join(root, file)
-                                arcname = os.path.relpath(
-                                    file_path, os.path.dirname(host_src)
-                                )
-                                zipf.write(file_path, arcname)
-
-                    self.log(
-                        'debug',
-                        f'Opening temporary zip file for upload: {temp_zip_path}',
-                    )
-                    file_to_upload = open(temp_zip_path, 'rb')
-                    upload_data = {'file': file_to_upload}
-                except Exception as e:
-                    # Ensure temp file is cleaned up if zipping fails
-                    if temp_zip_path and os.path.exists(temp_zip_path):
-                        os.unlink(temp_zip_path)
-                    raise e  # Re-raise the exception after cleanup attempt
-            else:
-                file_to_upload = open(host_src, 'rb')
-                upload_data = {'file': file_to_upload}
-
-            params = {'destination': sandbox_dest, 'recursive': str(recursive).lower()}
+        if recursive:
+            # The directory itself is copied into sandbox_dest, unless host_src ends with a slash
+            dest = os.path.normpath(
+                os.path.join(
+                    sandbox_dest, os.path.relpath(host_src, os.path.dirname(host_src))
+                )
+            )
+            synced = self.sync_to(host_src, dest)
+            self.log(
+                'debug',
+                f'Copy completed: host:{host_src} -> runtime:{dest}. {len(synced)} files changed.',
+            )
+            return
 
+        params = {'destination': sandbox_dest, 'recursive': 'false'}
+        with open(host_src, 'rb') as file_to_upload:
             response = self._send_action_server_request(
                 'POST',
                 f'{self.action_execution_server_url}/upload_file',
-                files=upload_data,
+                files={'file': file_to_upload},
                 params=params,
                 timeout=300,
             )
-            self.log(
-                'debug',
-                f'Copy completed: host:{host_src} -> runtime:{sandbox_dest}. Response: {response.text}',
+        self.log(
+            'debug',
+            f'Copy completed: host:{host_src} -> runtime:{sandbox_dest}. Response: {response.text}',
+        )
+
+    def sync_to(self, host_src: str, sandbox_dest: str) -> list[str]:
+        """Copy the files under host_src that are missing or different under sandbox_dest.
+
+        Only the changed files are sent, in a tar archive streamed from disk. If the
+        transfer is interrupted, syncing again only sends the files that were not
+        copied yet.
+
+        Returns:
+            The paths of the copied files, relative to host_src.
+        """
+        if not os.path.isdir(host_src):
+            raise FileNotFoundError(f'Source directory {host_src} does not exist')
+        host_manifest, sandbox_manifest = self._get_sync_manifests(
+            host_src, sandbox_dest
+        )
+        changed = get_changed_files(host_manifest, sandbox_manifest)
+        if not changed:
+            return []
+        try:
+            # Not retried, as the body is a stream that cannot be replayed
+            send_request(
+                self.session,
+                'POST',
+                f'{self.action_execution_server_url}/sync/upload',
+                params={'destination': sandbox_dest},
+                content=iter_tar(host_src, changed),
+                headers={'Content-Type': 'application/x-tar'},
+                timeout=300,
             )
-        finally:
-            if file_to_upload:
-                file_to_upload.close()
+        except httpx.TimeoutException:
+            raise TimeoutError('Sync operation timed out')
+        return changed
 
-            # Cleanup the temporary zip file if it was created
-            if temp_zip_path and os.path.exists(temp_zip_path):
-                try:
-                    os.unlink(temp_zip_path)
-                except Exception as e:
-                    self.log(
-                        'error',
-                        f'Failed to delete temporary zip file {temp_zip_path}: {e}',
-                    )
+    def sync_from(self, sandbox_src: str, host_dest: str) -> list[str]:
+        """Copy the files under sandbox_src that are missing or different under host_dest.
+
+        Returns:
+            The paths of the copied files, relative to sandbox_src.
+        """
+        host_manifest, sandbox_manifest = self._get_sync_manifests(
+            host_dest, sandbox_src
+        )
+        changed = get_changed_files(sandbox_manifest, host_manifest)
+        if not changed:
+            return []
+        try:
+            with self.session.stream(
+                'POST',
+                f'{self.action_execution_server_url}/sync/download',
+                json={'path': sandbox_src, 'files': changed},
+                timeout=300,
+            ) as response:
+                response.raise_for_status()
+                chunks = response.iter_bytes(CHUNK_SIZE)
+                extract_tar(ChunkReader(lambda: next(chunks, b'')), host_dest)
+        except httpx.TimeoutException:
+            raise TimeoutError('Sync operation timed out')
+        return changed
+
+    def _get_sync_manifests(
+        self, host_path: str, sandbox_path: str
+    ) -> tuple[Manifest, Manifest]:
+        """Get the manifests of the trees at host_path and sandbox_path.
+
+        Each side only hashes the files that have the same size on the other side.
+        """
+        host_sizes = get_sizes(self._manifest_builder.build(host_path, sizes={}))
+        response = self._send_action_server_request(
+            'POST',
+            f'{self.action_execution_server_url}/sync/manifest',
+            json={'path': sandbox_path, 'sizes': host_sizes},
+            timeout=300,
+        )
+        sandbox_manifest: Manifest = {
+            path: (size, mtime_ns, sha256)
+            for path, (size, mtime_ns, sha256) in response.json()['files'].items()
+        }
+        host_manifest = self._manifest_builder.build(
+            host_path, sizes=get_sizes(sandbox_manifest)
+        )
+        return host_manifest, sandbox_manifest
 
     def get_vscode_token(self) -> str:
         if self.vscode_enabled and self.runtime_initialized:
@@ -273,39 +448,16 @@ class ActionExecutionClient(Runtime):
         ):
             return self.llm_based_edit(action)
 
-        # set timeout to default if not set
-        if action.timeout is None:
-            if isinstance(action, CmdRunAction) and action.blocking:
-                raise RuntimeError('Blocking command with no timeout set')
-            # We don't block the command if this is a default timeout action
-            action.set_hard_timeout(self.config.sandbox.timeout, blocking=False)
-
-        with self.action_semaphore:
-            if not action.runnable:
-                if isinstance(action, AgentThinkAction):
-                    return AgentThinkObservation('Your thought has been logged.')
-                return NullObservation('')
-            if (
-                hasattr(action, 'confirmation_state')
-                and action.confirmation_state
-                == ActionConfirmationStatus.AWAITING_CONFIRMATION
-            ):
-                return NullObservation('')
-            action_type = action.action  # type: ignore[attr-defined]
-            if action_type not in ACTION_TYPE_TO_CLASS:
-                raise ValueError(f'Action {action_type} does not exist.')
-            if not hasattr(self, action_type):
-                return ErrorObservation(
-                    f'Action {action_type} is not supported in the current runtime.',
-                    error_id='AGENT_ERROR$BAD_ACTION',
-                )
-            if (
-                getattr(action, 'confirmation_state', None)
-                == ActionConfirmationStatus.REJECTED
-            ):
-                return UserRejectObservation(
-                    'Action has been rejected by the user! Waiting for further user input.'
-                )
+        self._set_default_timeout(action)
+        semaphore = (
+            self.read_only_action_semaphore
+            if is_read_only_action(action)
+            else self.action_semaphore
+        )
+        with semaphore:
+            local_obs = self._get_local_observation(action)
+            if local_obs is not None:
+                return local_obs
 
             assert action.timeout is not None
 
@@ -313,6 +465,14 @@ class ActionExecutionClient(Runtime):
                 execution_action_body: dict[str, Any] = {
                     'action': event_to_dict(action),
                 }
+                callback = self._shell_stream_callback
+                if callback is not None and isinstance(action, CmdRunAction):
+                    stream_obs = self._execute_action_streaming(
+                        execution_action_body, action.timeout + 5, callback
+                    )
+                    if stream_obs is not None:
+                        stream_obs._cause = action.id  # type: ignore[attr-defined]
+                        return stream_obs
                 response = self._send_action_server_request(
                     'POST',
                     f'{self.action_execution_server_url}/execute_action',
@@ -330,6 +490,132 @@ class ActionExecutionClient(Runtime):
                 )
             return obs
 
+    def _execute_action_streaming(
+        self,
+        execution_action_body: dict[str, Any],
+        timeout: float,
+        callback: Callable[[str], None],
+    ) -> Observation | None:
+        """Execute an action, passing callback each line its command prints while it runs.
+
+        Returns None if the action was not started, so that it can be sent the usual way.
+        """
+        url = f'{self.action_execution_server_url}/execute_action_stream'
+        start = time.monotonic()
+        output = ''
+        observation: dict | None = None
+        try:
+            with self.session.stream(
+                'POST', url, json=execution_action_body, timeout=timeout
+            ) as response:
+                if response.is_error:
+                    # Not started, e.g. by a server without streaming or a paused runtime
+                    self.log(
+                        'debug',
+                        f'Streaming the action failed with status {response.status_code}',
+                    )
+                    return None
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    message = json.loads(line)
+                    if 'observation' in message:
+                        observation = message['observation']
+                        continue
+                    output += message['output']
+                    *lines, output = output.split('\n')
+                    for text in lines:
+                        callback(text + '\n')
+        except httpx.ConnectError as e:
+            self.log('debug', f'Streaming the action failed: {e}')
+            return None
+        finally:
+            self._record_latency(url, time.monotonic() - start)
+        if output:
+            callback(output)
+        if observation is None:
+            raise AgentRuntimeDisconnectedError(
+                'The runtime closed the stream before returning an observation'
+            )
+        return observation_from_dict(observation)
+
+    def send_actions_for_execution(self, actions: list[Action]) -> list[Observation]:
+        """Execute several read-only actions in one request, returning their observations in order.
+
+        The actions run concurrently in the sandbox. Raises a ValueError if one of them is
+        not read-only (see is_read_only_action).
+        """
+        for action in actions:
+            if not is_read_only_action(action):
+                raise ValueError(
+                    f'Action {action.__class__.__name__} is not read-only, it cannot be batched'
+                )
+            self._set_default_timeout(action)
+
+        with self.read_only_action_semaphore:
+            observations: list[Observation | None] = [
+                self._get_local_observation(action) for action in actions
+            ]
+            pending = [i for i, obs in enumerate(observations) if obs is None]
+            if pending:
+                timeout = max(actions[i].timeout or 0 for i in pending)
+                try:
+                    response = self._send_action_server_request(
+                        'POST',
+                        f'{self.action_execution_server_url}/execute_actions',
+                        json={'actions': [event_to_dict(actions[i]) for i in pending]},
+                        # wait a few more seconds to get the timeout error from client side
+                        timeout=timeout + 5,
+                    )
+                    assert response.is_closed
+                    outputs = response.json()
+                except httpx.TimeoutException:
+                    raise AgentRuntimeTimeoutError(
+                        f'Runtime failed to return execute_actions before the requested timeout of {timeout}s'
+                    )
+                for i, output in zip(pending, outputs):
+                    obs = observation_from_dict(output)
+                    obs._cause = actions[i].id  # type: ignore[attr-defined]
+                    observations[i] = obs
+        return [obs for obs in observations if obs is not None]
+
+    def _set_default_timeout(self, action: Action) -> None:
+        # set timeout to default if not set
+        if action.timeout is None:
+            if isinstance(action, CmdRunAction) and action.blocking:
+                raise RuntimeError('Blocking command with no timeout set')
+            # We don't block the command if this is a default timeout action
+            action.set_hard_timeout(self.config.sandbox.timeout, blocking=False)
+
+    def _get_local_observation(self, action: Action) -> Observation | None:
+        """Get the observation of an action that is not sent to the server, if any."""
+        if not action.runnable:
+            if isinstance(action, AgentThinkAction):
+                return AgentThinkObservation('Your thought has been logged.')
+            return NullObservation('')
+        if (
+            hasattr(action, 'confirmation_state')
+            and action.confirmation_state
+            == ActionConfirmationStatus.AWAITING_CONFIRMATION
+        ):
+            return NullObservation('')
+        action_type = action.action  # type: ignore[attr-defined]
+        if action_type not in ACTION_TYPE_TO_CLASS:
+            raise ValueError(f'Action {action_type} does not exist.')
+        if not hasattr(self, action_type):
+            return ErrorObservation(
+                f'Action {action_type} is not supported in the current runtime.',
+                error_id='AGENT_ERROR$BAD_ACTION',
+            )
+        if (
+            getattr(action, 'confirmation_state', None)
+            == ActionConfirmationStatus.REJECTED
+        ):
+            return UserRejectObservation(
+                'Action has been rejected by the user! Waiting for further user input.'
+            )
+        return None
+
     def run(self, action: CmdRunAction) -> Observation:
         return self.send_action_for_execution(action)
 
@@ -454,24 +740,101 @@ class ActionExecutionClient(Runtime):
 
         # Import here to avoid circular imports
         from openhands.mcp.utils import call_tool_mcp as call_tool_mcp_handler
-        from openhands.mcp.utils import create_mcp_clients
+        from openhands.mcp.utils import get_mcp_tool_clients
+
+        connections = await self._acquire_mcp_connections()
+        try:
+            if action.name not in connections.tool_clients:
+                # A server may have added tools after we connected, so list the
+                # tools again on the connected clients
+                for client in connections.clients:
+                    try:
+                        await client.refresh_tools()
+                    except Exception as e:
+                        self.log('warning', f'Failed to refresh MCP tools: {e}')
+                connections.tool_clients = get_mcp_tool_clients(connections.clients)
+
+            # Call the tool and return the result
+            result = await call_tool_mcp_handler(
+                connections.clients, action, connections.tool_clients
+            )
+            return result
+        finally:
+            self._release_mcp_connections(connections)
+
+    async def _acquire_mcp_connections(self) -> _MCPConnections:
+        """Get the MCP clients connected to the configured servers, connecting them if the servers changed.
+
+        The clients are counted as used by a call until _release_mcp_connections, and
+        clients replaced meanwhile are only closed once their last call is done.
+        """
+        from openhands.mcp.utils import create_mcp_clients, get_mcp_tool_clients
 
         # Get the updated MCP config
         updated_mcp_config = self.get_mcp_config()
+        servers: list[MCPSSEServerConfig | MCPSHTTPServerConfig] = [
+            *updated_mcp_config.sse_servers,
+            *updated_mcp_config.shttp_servers,
+        ]
+        with self._mcp_lock:
+            connections = self._mcp_connections
+            if connections is not None and connections.servers == servers:
+                connections.calls += 1
+                return connections
+
         self.log(
             'debug',
             f'Creating MCP clients with servers: {updated_mcp_config.sse_servers}',
         )
-
-        # Create clients for this specific operation
-        mcp_clients = await create_mcp_clients(
-            updated_mcp_config.sse_servers, updated_mcp_config.shttp_servers, self.sid
+        clients = await create_mcp_clients(
+            updated_mcp_config.sse_servers,
+            updated_mcp_config.shttp_servers,
+            self.sid,
         )
-
-        # Call the tool and return the result
-        # No need for try/finally since disconnect() is now just resetting state
-        result = await call_tool_mcp_handler(mcp_clients, action)
-        return result
+        connections = _MCPConnections(
+            servers=servers,
+            clients=clients,
+            tool_clients=get_mcp_tool_clients(clients),
+            calls=1,
+        )
+        with self._mcp_lock:
+            current = self._mcp_connections
+            if current is not None and current.servers == servers:
+                # Another call connected to the same servers meanwhile
+                current.calls += 1
+                unused, connections = connections, current
+            elif self._runtime_closed:
+                unused = connections
+            else:
+                self._mcp_connections = connections
+                unused = None
+                if current is not None:
+                    current.retired = True
+                    if current.calls == 0:
+                        unused = current
+        if unused is not None:
+            unused.close()
+            if unused is connections:
+                raise RuntimeError('Runtime is closed')
+        return connections
+
+    def _release_mcp_connections(self, connections: _MCPConnections) -> None:
+        with self._mcp_lock:
+            connections.calls -= 1
+            close = connections.retired and connections.calls == 0
+        if close:
+            connections.close()
+
+    def subscribe_to_shell_stream(
+        self, callback: Callable[[str], None] | None = None
+    ) -> bool:
+        """Subscribe to the output of the commands run in the sandbox, line by line, while they run.
+
+        The lines are only passed to the callback, the observation of each command is
+        still the one added to the event stream.
+        """
+        self._shell_stream_callback = callback
+        return True
 
     def close(self) -> None:
         # Make sure we don't close the session multiple times
@@ -479,4 +842,12 @@ class ActionExecutionClient(Runtime):
         if self._runtime_closed:
             return
         self._runtime_closed = True
+        with self._mcp_lock:
+            connections = self._mcp_connections
+            self._mcp_connections = None
+        if connections is not None:
+            connections.close()
+        self.log(
+            'debug', f'Action execution server latencies: {self.get_latency_metrics()}'
+        )
         self.session.close()
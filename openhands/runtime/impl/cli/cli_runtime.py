@@ -50,6 +50,7 @@ from openhands.integrations.provider import PROVIDER_TOKEN_TYPE
 from openhands.runtime.base import Runtime
 from openhands.runtime.plugins import PluginRequirement
 from openhands.runtime.runtime_status import RuntimeStatus
+from openhands.runtime.utils.directory_index import DirectoryIndex, FileListing
 
 
 class CLIRuntime(Runtime):
@@ -118,6 +119,7 @@ class CLIRuntime(Runtime):
         self._runtime_initialized = False
         self.file_editor = OHEditor(workspace_root=self._workspace_path)
         self._shell_stream_callback: Callable[[str], None] | None = None
+        self._directory_index = DirectoryIndex()
 
         logger.warning(
             'Initializing CLIRuntime. WARNING: NO SANDBOX IS USED. '
@@ -704,6 +706,28 @@ class CLIRuntime(Runtime):
             logger.error(f'Error listing files: {str(e)}')
             return []
 
+    def get_file_listing(
+        self,
+        path: str | None = None,
+        recursive: bool = False,
+        details: bool = False,
+        exclude: list[str] | None = None,
+    ) -> FileListing:
+        if not self._runtime_initialized:
+            raise RuntimeError('Runtime not initialized')
+
+        dir_path = (
+            self._workspace_path if path is None else self._sanitize_filename(path)
+        )
+        return self._directory_index.get_listing(
+            dir_path,
+            root=self._workspace_path,
+            recursive=recursive,
+            details=details,
+            exclude_gitignored=True,
+            exclude=exclude or [],
+        )
+
     def copy_from(self, path: str) -> Path:
         """Zip all files in the sandbox and return a path in the local filesystem."""
         if not self._runtime_initialized:
@@ -0,0 +1,131 @@
+"""Search of the files of a directory tree, for the search_dir and find_file skills.
+
+Files ignored by .gitignore files, .git and node_modules directories are left out,
+and the directory scans are cached until the directories change. Files are read in
+chunks in a thread pool, and only the chunks containing the term are split into
+lines. Binary files are skipped, and the search stops as soon as too many files
+matched.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+from openhands.runtime.utils.directory_index import DirectoryIndex
+
+# More files than this matching a search is reported as too broad
+MAX_MATCHED_FILES = 100
+
+_EXCLUDED = ('.git/', 'node_modules/')
+# Files with a NUL byte in this many first bytes are binary
+_BINARY_CHECK_SIZE = 8192
+# Files are read this many bytes at a time, and cut after their last complete line
+_CHUNK_SIZE = 1024 * 1024
+_BATCH_SIZE = 64
+_MAX_WORKERS = min(8, os.cpu_count() or 1)
+
+_directory_index = DirectoryIndex()
+
+
+def _find_repository_root(dir_path: str) -> str:
+    """Get the closest directory containing a .git directory, whose .gitignore files apply."""
+    path = os.path.abspath(dir_path)
+    while True:
+        if os.path.isdir(os.path.join(path, '.git')):
+            return path
+        parent = os.path.dirname(path)
+        if parent == path:
+            return os.path.abspath(dir_path)
+        path = parent
+
+
+def list_files(dir_path: str) -> list[str]:
+    """List the files under dir_path, joined to it, leaving out ignored files."""
+    listing = _directory_index.get_listing(
+        os.path.abspath(dir_path),
+        root=_find_repository_root(dir_path),
+        recursive=True,
+        exclude_gitignored=True,
+        exclude=_EXCLUDED,
+    )
+    return [
+        os.path.join(dir_path, entry)
+        for entry in listing.entries
+        if not entry.endswith('/')
+    ]
+
+
+def _read_text_file(path: str) -> Iterator[bytes]:
+    """Read a file in chunks, yielding nothing if it is binary or cannot be read.
+
+    Each chunk but the last ends with a line break. The incomplete line at the end of
+    a read is carried over to the next one, so a term split between two reads is still
+    found. The last chunk is the rest of the file after the last line break, possibly
+    empty.
+    """
+    try:
+        with open(path, 'rb') as f:
+            chunk = f.read(_CHUNK_SIZE)
+            if b'\0' in chunk[:_BINARY_CHECK_SIZE]:
+                return
+            carry = b''
+            while chunk:
+                data = carry + chunk
+                # A \r at the end may be the first half of a \r\n
+                end = max(data.rfind(b'\n'), data.rfind(b'\r', 0, len(data) - 1)) + 1
+                carry = data[end:]
+                if end:
+                    yield data[:end]
+                chunk = f.read(_CHUNK_SIZE)
+    except OSError:
+        return
+    if carry.endswith(b'\r'):
+        yield carry
+        carry = b''
+    yield carry
+
+
+def _search_file(path: str, search_term: str) -> list[tuple[str, int, str]]:
+    term = search_term.encode('utf-8')
+    matches: list[tuple[str, int, str]] = []
+    line_offset = 0
+    for data in _read_text_file(path):
+        # Only the chunks containing the term are decoded and split into lines
+        if term in data:
+            # Same lines as reading the file in text mode, with universal newlines
+            lines = (
+                data.decode('utf-8', errors='ignore')
+                .replace('\r\n', '\n')
+                .replace('\r', '\n')
+                .split('\n')
+            )
+            if data.endswith((b'\n', b'\r')):
+                # The line break ends the last line of the chunk
+                lines.pop()
+            matches.extend(
+                (path, line_offset + line_num, line.strip())
+                for line_num, line in enumerate(lines, 1)
+                if search_term in line
+            )
+        line_offset += data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
+    return matches
+
+
+def search_files(
+    search_term: str, dir_path: str
+) -> Iterator[list[tuple[str, int, str]]]:
+    """Search the files under dir_path for search_term, yielding the matches of each matching file.
+
+    Hidden files are skipped. The caller can stop iterating once it has enough matches.
+    """
+    paths = [
+        path
+        for path in list_files(dir_path)
+        if not os.path.basename(path).startswith('.')
+    ]
+    with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as pool:
+        for start in range(0, len(paths), _BATCH_SIZE):
+            batch = paths[start : start + _BATCH_SIZE]
+            for matches in pool.map(_search_file, batch, [search_term] * len(batch)):
+                if matches:
+                    yield matches
@@ -20,6 +20,11 @@ Note:
 import os
 
 from openhands.linter import DefaultLinter, LintResult
+from openhands.runtime.plugins.agent_skills.file_ops.code_search import (
+    MAX_MATCHED_FILES,
+    list_files,
+    search_files,
+)
 
 CURRENT_FILE: str | None = None
 CURRENT_LINE = 1
@@ -305,28 +310,21 @@ def search_dir(search_term: str, dir_path: str = './') -> None:
         _output_error(f'Directory {dir_path} not found')
         return
     matches = []
-    for root, _, files in os.walk(dir_path):
-        for file in files:
-            if file.startswith('.'):
-                continue
-            file_path = os.path.join(root, file)
-            with open(file_path, 'r', errors='ignore') as f:
-                for line_num, line in enumerate(f, 1):
-                    if search_term in line:
-                        matches.append((file_path, line_num, line.strip()))
+    num_files = 0
+    for file_matches in search_files(search_term, dir_path):
+        matches.extend(file_matches)
+        num_files += 1
+        if num_files > MAX_MATCHED_FILES:
+            print(
+                f'More than {MAX_MATCHED_FILES} files matched for "{search_term}" in {dir_path}. Please narrow your search.'
+            )
+            return
 
     if not matches:
         print(f'No matches found for "{search_term}" in {dir_path}')
         return
 
     num_matches = len(matches)
-    num_files = len(set(match[0] for match in matches))
-
-    if num_files > 100:
-        print(
-            f'More than {num_files} files matched for "{search_term}" in {dir_path}. Please narrow your search.'
-        )
-        return
 
     print(f'[Found {num_matches} matches for "{search_term}" in {dir_path}]')
     for file_path, line_num, line in matches:
@@ -377,11 +375,9 @@ def find_file(file_name: str, dir_path: str = './') -> None:
         _output_error(f'Directory {dir_path} not found')
         return
 
-    matches = []
-    for root, _, files in os.walk(dir_path):
-        for file in files:
-            if file_name in file:
-                matches.append(os.path.join(root, file))
+    matches = [
+        path for path in list_files(dir_path) if file_name in os.path.basename(path)
+    ]
 
     if matches:
         print(f'[Found {len(matches)} matches for "{file_name}" in {dir_path}]')
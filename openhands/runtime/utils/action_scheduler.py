@@ -0,0 +1,112 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from openhands.events.action import Action, CmdRunAction, FileReadAction
+from openhands.runtime.utils.read_only_commands import is_read_only_command
+
+
+def is_read_only_action(action: Action) -> bool:
+    """Check whether an action only reads from the sandbox, and can run alongside other actions.
+
+    File reads and commands that only run read-only programs (listings, searches, git
+    status and diffs...) are read-only. Everything else, including any action that
+    could interact with a running command, is mutating.
+    """
+    if isinstance(action, FileReadAction):
+        return True
+    if isinstance(action, CmdRunAction):
+        return not action.is_input and is_read_only_command(action.command.strip())
+    return False
+
+
+@dataclass
+class ActionTimings:
+    """Queue wait and execution times of the actions of one type, in seconds."""
+
+    count: int = 0
+    read_only_count: int = 0
+    queue_wait_total: float = 0.0
+    queue_wait_max: float = 0.0
+    execution_total: float = 0.0
+    execution_max: float = 0.0
+
+    def record(self, read_only: bool, queue_wait: float, execution: float) -> None:
+        self.count += 1
+        self.read_only_count += read_only
+        self.queue_wait_total += queue_wait
+        self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        self.execution_total += execution
+        self.execution_max = max(self.execution_max, execution)
+
+    def to_dict(self) -> dict[str, float]:
+        return {
+            'count': self.count,
+            'read_only_count': self.read_only_count,
+            'queue_wait_avg': self.queue_wait_total / self.count if self.count else 0.0,
+            'queue_wait_max': self.queue_wait_max,
+            'execution_avg': self.execution_total / self.count if self.count else 0.0,
+            'execution_max': self.execution_max,
+        }
+
+
+class ActionScheduler:
+    """Runs mutating actions one at a time, in the order they arrive, and read-only actions concurrently.
+
+    Read-only actions do not wait for mutating ones, so that a file read or git status
+    requested by the UI is not queued behind a long running command of the agent.
+    """
+
+    def __init__(self, max_concurrent_read_only: int = 4) -> None:
+        if max_concurrent_read_only < 1:
+            raise ValueError(
+                f'max_concurrent_read_only ({max_concurrent_read_only}) must be positive'
+            )
+        self.max_concurrent_read_only = max_concurrent_read_only
+        # asyncio locks are fair, so mutating actions run in the order they arrive
+        self._lock = asyncio.Lock()
+        self._read_only_semaphore = asyncio.Semaphore(max_concurrent_read_only)
+        self._timings: dict[str, ActionTimings] = {}
+        self._running_read_only = 0
+        self._waiting = 0
+
+    @asynccontextmanager
+    async def slot(self, action_type: str, read_only: bool) -> AsyncIterator[None]:
+        """Wait for the turn of an action, and record how long it waited and ran."""
+        queued_at = time.monotonic()
+        self._waiting += 1
+        try:
+            if read_only:
+                await self._read_only_semaphore.acquire()
+            else:
+                await self._lock.acquire()
+        finally:
+            self._waiting -= 1
+        started_at = time.monotonic()
+        self._running_read_only += read_only
+        try:
+            yield
+        finally:
+            self._running_read_only -= read_only
+            if read_only:
+                self._read_only_semaphore.release()
+            else:
+                self._lock.release()
+            timings = self._timings.setdefault(action_type, ActionTimings())
+            timings.record(
+                read_only, started_at - queued_at, time.monotonic() - started_at
+            )
+
+    def get_metrics(self) -> dict:
+        """Get the current queue state and the timings of each action type."""
+        return {
+            'waiting': self._waiting,
+            'running_mutating': int(self._lock.locked()),
+            'running_read_only': self._running_read_only,
+            'actions': {
+                action_type: timings.to_dict()
+                for action_type, timings in self._timings.items()
+            },
+        }
@@ -3,8 +3,9 @@ import re
 import time
 import traceback
 import uuid
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any
+from typing import Any, Callable
 
 import bashlex
 import libtmux
@@ -18,6 +19,8 @@ from openhands.events.observation.commands import (
     CmdOutputObservation,
 )
 from openhands.runtime.utils.bash_constants import TIMEOUT_MESSAGE_TEMPLATE
+from openhands.runtime.utils.pane_output import PaneOutputMonitor
+from openhands.runtime.utils.shell_stream import ShellOutputFilter
 from openhands.utils.shutdown_listener import should_continue
 
 
@@ -173,8 +176,21 @@ def _remove_command_prefix(command_output: str, command: str) -> str:
     return command_output.lstrip().removeprefix(command.lstrip()).lstrip()
 
 
+@dataclass(frozen=True)
+class ShellState:
+    """The state of a BashSession, saved at its last prompt."""
+
+    env: dict[str, str]
+    # Arguments of bash that set the options of the session, like `-O globstar`
+    options: list[str]
+    # Names of the functions and aliases, which run instead of the programs they name
+    names: frozenset[str]
+
+
 class BashSession:
     POLL_INTERVAL = 0.5
+    # How often the pane is captured while a command runs, when its output is monitored
+    CAPTURE_INTERVAL = 5.0
     HISTORY_LIMIT = 10_000
     PS1 = CmdOutputMetadata.to_ps1_prompt()
 
@@ -190,6 +206,11 @@ class BashSession:
         self.username = username
         self._initialized = False
         self.max_memory_mb = max_memory_mb
+        self._output_monitor: PaneOutputMonitor | None = None
+        # Where the shell saves its state, see initialize
+        self.env_file = f'/tmp/openhands-env-{uuid.uuid4().hex}'
+        self._shell_state: ShellState | None = None
+        self._shell_state_stat: tuple[int, int] | None = None
 
     def initialize(self) -> None:
         self.server = libtmux.Server()
@@ -232,13 +253,27 @@ class BashSession:
         logger.debug(f'pane: {self.pane}; history_limit: {self.session.history_limit}')
         _initial_window.kill_window()
 
-        # Configure bash to use simple PS1 and disable PS2
+        # Configure bash to use simple PS1 and disable PS2. The state of the shell is saved
+        # at every prompt, so it can be read without running a command in the pane: the
+        # environment, an empty entry, the options that change how commands expand and
+        # the names of the functions and aliases
+        save_state = (
+            '{ command -p env -0; printf "\\0"; shopt -p;'
+            ' shopt -po braceexpand noglob pipefail; printf "\\0";'
+            f' compgen -A function -A alias; }} >| {self.env_file}.tmp 2>/dev/null;'
+            f' command -p mv -f {self.env_file}.tmp {self.env_file} 2>/dev/null'
+        )
         self.pane.send_keys(
-            f'export PROMPT_COMMAND=\'export PS1="{self.PS1}"\'; export PS2=""'
+            f'export PROMPT_COMMAND=\'export PS1="{self.PS1}"; {save_state}\'; export PS2=""'
         )
         time.sleep(0.1)  # Wait for command to take effect
         self._clear_screen()
 
+        # Follow the output of the pane, so commands don't need to poll it
+        output_monitor = PaneOutputMonitor(self.pane)
+        if output_monitor.start():
+            self._output_monitor = output_monitor
+
         # Store the last command for interactive input handling
         self.prev_status: BashCommandStatus | None = None
         self.prev_output: str = ''
@@ -264,17 +299,80 @@ class BashSession:
         )
         return content
 
+    def _capture_pane(self) -> tuple[str, list[re.Match]]:
+        """Capture the pane content and find the PS1 prompts in it."""
+        _start_time = time.time()
+        logger.debug(f'GETTING PANE CONTENT at {_start_time}')
+        pane_content = self._get_pane_content()
+        logger.debug(f'PANE CONTENT GOT after {time.time() - _start_time:.2f} seconds')
+        logger.debug(f'BEGIN OF PANE CONTENT: {pane_content.split("\n")[:10]}')
+        logger.debug(f'END OF PANE CONTENT: {pane_content.split("\n")[-10:]}')
+        return pane_content, CmdOutputMetadata.matches_ps1_metadata(pane_content)
+
     def close(self) -> None:
         """Clean up the session."""
         if self._closed:
             return
+        if self._output_monitor is not None:
+            self._output_monitor.close()
         self.session.kill_session()
+        for path in (self.env_file, f'{self.env_file}.tmp'):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
         self._closed = True
 
+    def read_shell_state(self) -> ShellState | None:
+        """Read the state the shell saved at its last prompt, or None if it was not saved."""
+        try:
+            st = os.stat(self.env_file)
+            if (st.st_ino, st.st_mtime_ns) == self._shell_state_stat:
+                return self._shell_state
+            with open(self.env_file, 'rb') as f:
+                data = f.read().decode('utf-8', errors='replace')
+        except OSError as e:
+            logger.debug(f'Failed to read the state of the shell: {e}')
+            return None
+        entries = data.split('\0')
+        end = entries.index('') if '' in entries[:-2] else 0
+        env = {}
+        for entry in entries[:end]:
+            name, sep, value = entry.partition('=')
+            if sep:
+                env[name] = value
+        if not env:
+            logger.debug(f'Failed to parse the state of the shell in {self.env_file}')
+            return None
+        options = []
+        for line in entries[end + 1].splitlines():
+            # `shopt -s globstar` or `set +o pipefail`
+            words = line.split()
+            if len(words) != 3 or words[2] == 'login_shell':
+                continue
+            flag = 'O' if words[0] == 'shopt' else 'o'
+            options += [('-' if words[1] in ('-s', '-o') else '+') + flag, words[2]]
+        state = ShellState(
+            env=env,
+            options=options,
+            names=frozenset(entries[end + 2].split()),
+        )
+        self._shell_state, self._shell_state_stat = state, (st.st_ino, st.st_mtime_ns)
+        return state
+
     @property
     def cwd(self) -> str:
         return self._cwd
 
+    @property
+    def is_running_command(self) -> bool:
+        """Whether the previous command may still be running in the session."""
+        return self.prev_status in {
+            BashCommandStatus.CONTINUE,
+            BashCommandStatus.NO_CHANGE_TIMEOUT,
+            BashCommandStatus.HARD_TIMEOUT,
+        }
+
     def _is_special_key(self, command: str) -> bool:
         """Check if the command is a special key."""
         # Special keys are of the form C-<key>
@@ -470,8 +568,32 @@ class BashSession:
         logger.debug(f'COMBINED OUTPUT: {combined_output}')
         return combined_output
 
-    def execute(self, action: CmdRunAction) -> CmdOutputObservation | ErrorObservation:
-        """Execute a command in the bash session."""
+    def execute(
+        self,
+        action: CmdRunAction,
+        on_output: Callable[[str], None] | None = None,
+    ) -> CmdOutputObservation | ErrorObservation:
+        """Execute a command in the bash session.
+
+        If on_output is given, it is called with the text the command prints while it
+        runs, when the output of the pane can be followed.
+        """
+        output_monitor = self._output_monitor
+        if on_output is None or output_monitor is None:
+            return self._execute(action)
+        command = action.command.strip()
+        output_monitor.set_listener(
+            ShellOutputFilter(
+                on_output,
+                skip_echo=command != '' and not self._is_special_key(command),
+            )
+        )
+        try:
+            return self._execute(action)
+        finally:
+            output_monitor.set_listener(None)
+
+    def _execute(self, action: CmdRunAction) -> CmdOutputObservation | ErrorObservation:
         if not self._initialized:
             raise RuntimeError('Bash session is not initialized')
 
@@ -568,6 +690,13 @@ class BashSession:
                 metadata=metadata,
             )
 
+        # Note what the pane printed so far, to tell the output of the command apart
+        output_monitor = self._output_monitor
+        last_bytes_written = last_prompts = 0
+        if output_monitor is not None:
+            last_bytes_written = output_monitor.bytes_written
+            last_prompts = output_monitor.prompts
+
         # Send actual command/inputs to the pane
         if command != '':
             is_special_key = self._is_special_key(command)
@@ -587,36 +716,48 @@ class BashSession:
                 )
 
         # Loop until the command completes or times out
+        ps1_matches = initial_ps1_matches
+        last_capture_time = 0.0
         while should_continue():
-            _start_time = time.time()
-            logger.debug(f'GETTING PANE CONTENT at {_start_time}')
-            cur_pane_output = self._get_pane_content()
-            logger.debug(
-                f'PANE CONTENT GOT after {time.time() - _start_time:.2f} seconds'
-            )
-            logger.debug(f'BEGIN OF PANE CONTENT: {cur_pane_output.split("\n")[:10]}')
-            logger.debug(f'END OF PANE CONTENT: {cur_pane_output.split("\n")[-10:]}')
-            ps1_matches = CmdOutputMetadata.matches_ps1_metadata(cur_pane_output)
-            current_ps1_count = len(ps1_matches)
-
-            if cur_pane_output != last_pane_output:
-                last_pane_output = cur_pane_output
-                last_change_time = time.time()
-                logger.debug(f'CONTENT UPDATED DETECTED at {last_change_time}')
-
-            # 1) Execution completed:
-            # Condition 1: A new prompt has appeared since the command started.
-            # Condition 2: The prompt count hasn't increased (potentially because the initial one scrolled off),
-            # BUT the *current* visible pane ends with a prompt, indicating completion.
-            if (
-                current_ps1_count > initial_ps1_count
-                or cur_pane_output.rstrip().endswith(CMD_OUTPUT_PS1_END.rstrip())
-            ):
-                return self._handle_completed_command(
-                    command,
-                    pane_content=cur_pane_output,
-                    ps1_matches=ps1_matches,
+            # With an output monitor, the pane is only captured once it prints a new
+            # prompt, and every CAPTURE_INTERVAL in case a prompt was missed. Output
+            # that is still streaming is tracked from the piped bytes alone.
+            capture = True
+            if output_monitor is not None and not output_monitor.closed:
+                bytes_written = output_monitor.bytes_written
+                if bytes_written != last_bytes_written:
+                    last_bytes_written = bytes_written
+                    last_change_time = time.time()
+                prompts = output_monitor.prompts
+                capture = (
+                    prompts != last_prompts
+                    or time.time() - last_capture_time >= self.CAPTURE_INTERVAL
                 )
+                last_prompts = prompts
+
+            if capture:
+                cur_pane_output, ps1_matches = self._capture_pane()
+                last_capture_time = time.time()
+
+                if cur_pane_output != last_pane_output:
+                    last_pane_output = cur_pane_output
+                    last_change_time = time.time()
+                    logger.debug(f'CONTENT UPDATED DETECTED at {last_change_time}')
+
+                # 1) Execution completed:
+                # Condition 1: A new prompt has appeared since the command started.
+                # Condition 2: The prompt count hasn't increased (potentially because the initial one scrolled off),
+                # BUT the *current* visible pane ends with a prompt, indicating completion.
+                if len(
+                    ps1_matches
+                ) > initial_ps1_count or cur_pane_output.rstrip().endswith(
+                    CMD_OUTPUT_PS1_END.rstrip()
+                ):
+                    return self._handle_completed_command(
+                        command,
+                        pane_content=cur_pane_output,
+                        ps1_matches=ps1_matches,
+                    )
 
             # Timeout checks should only trigger if a new prompt hasn't appeared yet.
 
@@ -631,9 +772,11 @@ class BashSession:
                 not action.blocking
                 and time_since_last_change >= self.NO_CHANGE_TIMEOUT_SECONDS
             ):
+                if not capture:
+                    last_pane_output, ps1_matches = self._capture_pane()
                 return self._handle_nochange_timeout_command(
                     command,
-                    pane_content=cur_pane_output,
+                    pane_content=last_pane_output,
                     ps1_matches=ps1_matches,
                 )
 
@@ -644,13 +787,19 @@ class BashSession:
             )
             if action.timeout and elapsed_time >= action.timeout:
                 logger.debug('Hard timeout triggered.')
+                if not capture:
+                    last_pane_output, ps1_matches = self._capture_pane()
                 return self._handle_hard_timeout_command(
                     command,
-                    pane_content=cur_pane_output,
+                    pane_content=last_pane_output,
                     ps1_matches=ps1_matches,
                     timeout=action.timeout,
                 )
 
-            logger.debug(f'SLEEPING for {self.POLL_INTERVAL} seconds for next poll')
-            time.sleep(self.POLL_INTERVAL)
+            if output_monitor is not None and not output_monitor.closed:
+                # Wake up as soon as the pane writes something
+                output_monitor.wait_for_output(last_bytes_written, self.POLL_INTERVAL)
+            else:
+                logger.debug(f'SLEEPING for {self.POLL_INTERVAL} seconds for next poll')
+                time.sleep(self.POLL_INTERVAL)
         raise RuntimeError('Bash session was likely interrupted...')
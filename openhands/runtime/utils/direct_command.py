@@ -0,0 +1,173 @@
+"""Runs simple, read-only commands as subprocesses instead of in the tmux session.
+
+Every CmdRunAction normally goes through the single tmux pane of the BashSession,
+which serializes commands and adds the latency of sending keys and waiting for the
+prompt. Commands that only read, like the ripgrep commands of the read-only agent or
+the git commands of the GitHandler, do not need the interactive shell: they are run
+with `bash -c` in the working directory and environment of the session, so the exit
+code and output are exact and several of them can run at the same time.
+
+Anything that could depend on or change the state of the shell, read from the
+terminal or run for long goes through the tmux session as before.
+"""
+
+import asyncio
+import os
+import pwd
+import shutil
+import signal
+import socket
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.events.action import CmdRunAction
+from openhands.events.observation.commands import (
+    CmdOutputMetadata,
+    CmdOutputObservation,
+)
+from openhands.runtime.utils.bash import BashSession
+from openhands.runtime.utils.read_only_commands import is_read_only_command
+
+
+class DirectCommandRunner:
+    """Runs the read-only commands of CmdRunActions as subprocesses.
+
+    Commands run with the environment and options the tmux session saved at its last
+    prompt. A command that does not complete within `timeout` seconds is killed, and
+    run returns None so that the caller can run it in the session instead, where it can
+    be interacted with.
+    """
+
+    def __init__(
+        self,
+        username: str,
+        max_concurrency: int = 8,
+        timeout: float = 5.0,
+        max_output_bytes: int = 32 * 1024 * 1024,
+    ) -> None:
+        self.username = username
+        self.timeout = timeout
+        self.max_output_bytes = max_output_bytes
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._hostname = socket.gethostname()
+        # The tmux session runs as this user when the server runs as root
+        self._user: str | None = None
+        if (
+            username in ['root', 'openhands']
+            and username != pwd.getpwuid(os.geteuid()).pw_name
+        ):
+            self._user = username
+
+    def can_run(self, action: CmdRunAction, bash_session: BashSession | None) -> bool:
+        """Check whether the command of the action can run as a subprocess."""
+        if action.is_input or bash_session is None:
+            return False
+        # A command sent while another one runs is an error the session reports
+        if not action.is_static and bash_session.is_running_command:
+            return False
+        state = bash_session.read_shell_state()
+        if state is None:
+            return False
+        return is_read_only_command(action.command.strip(), shell_names=state.names)
+
+    async def run(
+        self,
+        action: CmdRunAction,
+        bash_session: BashSession,
+        cwd: str,
+    ) -> CmdOutputObservation | None:
+        """Run the command of the action in cwd, returning None if it must run in the session instead."""
+        command = action.command.strip()
+        state = bash_session.read_shell_state()
+        if state is None:
+            return None
+        # Commands must never wait for credentials, and git must not refresh the index
+        # of a repository while the session may be changing it
+        env = {
+            'GIT_TERMINAL_PROMPT': '0',
+            **state.env,
+            'GIT_OPTIONAL_LOCKS': '0',
+            'PWD': cwd,
+        }
+
+        async with self._semaphore:
+            try:
+                proc = await asyncio.create_subprocess_exec(
+                    'bash',
+                    *state.options,
+                    '-c',
+                    command,
+                    executable='/bin/bash',
+                    cwd=cwd,
+                    env=env,
+                    stdin=asyncio.subprocess.DEVNULL,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.STDOUT,
+                    start_new_session=True,
+                    user=self._user,
+                )
+            except OSError as e:
+                logger.debug(f'Failed to run command as a subprocess: {e}')
+                return None
+
+            output = bytearray()
+            truncated = False
+            try:
+                async with asyncio.timeout(self.timeout):
+                    assert proc.stdout is not None
+                    while chunk := await proc.stdout.read(65536):
+                        output += chunk
+                        if len(output) > self.max_output_bytes:
+                            del output[: len(output) - self.max_output_bytes]
+                            truncated = True
+                    await proc.wait()
+            except TimeoutError:
+                logger.debug(
+                    f'Command did not complete in {self.timeout} seconds, running it in the session: {command}'
+                )
+                self._kill(proc)
+                await proc.wait()
+                return None
+
+        returncode = proc.returncode
+        assert returncode is not None
+        # Match $? when bash itself is killed by a signal
+        exit_code = returncode if returncode >= 0 else 128 - returncode
+        return self._to_observation(
+            command, bytes(output), truncated, exit_code, cwd, env
+        )
+
+    def _to_observation(
+        self,
+        command: str,
+        output: bytes,
+        truncated: bool,
+        exit_code: int,
+        cwd: str,
+        env: dict[str, str],
+    ) -> CmdOutputObservation:
+        text = output.decode('utf-8', errors='replace').replace('\r\n', '\n')
+        # Trailing spaces are not kept by the tmux pane either
+        lines = [line.rstrip() for line in text.split('\n')]
+        metadata = CmdOutputMetadata(
+            exit_code=exit_code,
+            username=self.username,
+            hostname=self._hostname,
+            working_dir=cwd,
+            py_interpreter_path=shutil.which('python', path=env.get('PATH')) or '',
+        )
+        if truncated or len(lines) > BashSession.HISTORY_LIMIT:
+            lines = lines[-BashSession.HISTORY_LIMIT :]
+            metadata.prefix = f'[Previous command outputs are truncated. Showing the last {len(lines)} lines of the output below.]\n'
+        metadata.suffix = f'\n[The command completed with exit code {exit_code}.]'
+        return CmdOutputObservation(
+            content='\n'.join(lines).strip(),
+            command=command,
+            metadata=metadata,
+        )
+
+    @staticmethod
+    def _kill(proc: asyncio.subprocess.Process) -> None:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
@@ -0,0 +1,207 @@
+"""Cached listings of the directories of the sandbox, for the file browser.
+
+The entries of each directory are scanned once and kept until the modification time
+of the directory changes, which happens whenever an entry is added, removed or
+renamed. The .gitignore files are compiled once and kept until they change. Listings
+come with an ETag, so that clients polling a directory can skip unchanged listings.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from pathspec import PathSpec
+from pathspec.patterns import GitWildMatchPattern
+
+# (name, is_dir) of the entries of a directory
+_Scan = list[tuple[str, bool]]
+
+
+@dataclass
+class FileListing:
+    """The entries of a directory, and an ETag that changes when they change.
+
+    Directories end with a slash. With details, each entry is a dict with its path,
+    size and modification time instead of its path alone.
+    """
+
+    entries: list[Any]
+    etag: str
+
+
+def get_listing_etag(entries: list[Any]) -> str:
+    digest = hashlib.sha1(json.dumps(entries).encode(), usedforsecurity=False)
+    return f'"{digest.hexdigest()}"'
+
+
+class DirectoryIndex:
+    """Lists the directories of the sandbox, from scans cached by directory modification time."""
+
+    def __init__(self, max_directories: int = 10_000) -> None:
+        self.max_directories = max_directories
+        # directory -> (mtime_ns, entries sorted with directories first)
+        self._scans: OrderedDict[str, tuple[int, _Scan]] = OrderedDict()
+        # directory -> ((mtime_ns, size) of its .gitignore, compiled patterns)
+        self._gitignores: dict[str, tuple[tuple[int, int], PathSpec]] = {}
+        self._lock = threading.Lock()
+
+    def get_listing(
+        self,
+        path: str,
+        root: str | None = None,
+        recursive: bool = False,
+        details: bool = False,
+        exclude_gitignored: bool = False,
+        exclude: Iterable[str] = (),
+    ) -> FileListing:
+        """List the entries of the directory at path, relative to it.
+
+        Args:
+            path: The absolute path of the directory.
+            root: The root of the repository the directory is in. The .gitignore files
+                of the directories between root and path apply as well.
+            recursive: Whether to list the content of the subdirectories too.
+            details: Whether to return the size and modification time of the entries.
+            exclude_gitignored: Whether to leave out the entries ignored by .gitignore files.
+            exclude: Names of entries to leave out, with a trailing slash for directories.
+        """
+        path = os.path.abspath(path)
+        # The .gitignore of each directory is added as the listing goes down to it,
+        # with the path of the listed directory relative to the .gitignore
+        specs: list[tuple[str, PathSpec]] = []
+        if exclude_gitignored:
+            for directory in self._get_ancestors(path, root)[:-1]:
+                spec = self._get_gitignore(directory)
+                if spec is not None:
+                    rel_path = os.path.relpath(path, directory).replace(os.sep, '/')
+                    specs.append((rel_path + '/', spec))
+        entries: list[Any] = []
+        self._list_into(
+            entries,
+            path,
+            '',
+            recursive,
+            details,
+            specs if exclude_gitignored else None,
+            frozenset(exclude),
+        )
+        return FileListing(entries=entries, etag=get_listing_etag(entries))
+
+    def _list_into(
+        self,
+        entries: list[Any],
+        directory: str,
+        prefix: str,
+        recursive: bool,
+        details: bool,
+        specs: list[tuple[str, PathSpec]] | None,
+        exclude: frozenset[str],
+    ) -> None:
+        """Append the entries of directory to entries, with specs None to keep gitignored ones."""
+        if specs is not None:
+            spec = self._get_gitignore(directory)
+            if spec is not None:
+                specs = [*specs, ('', spec)]
+        for name, is_dir in self._scan(directory):
+            entry = name + '/' if is_dir else name
+            if entry in exclude:
+                continue
+            if specs and any(
+                spec.match_file(rel_path + entry) for rel_path, spec in specs
+            ):
+                continue
+            entry_path = os.path.join(directory, name)
+            if details:
+                try:
+                    st = os.stat(entry_path)
+                except OSError:
+                    continue
+                entries.append(
+                    {'path': prefix + entry, 'size': st.st_size, 'mtime': st.st_mtime}
+                )
+            else:
+                entries.append(prefix + entry)
+            if recursive and is_dir and not os.path.islink(entry_path):
+                self._list_into(
+                    entries,
+                    entry_path,
+                    prefix + entry,
+                    recursive,
+                    details,
+                    None
+                    if specs is None
+                    else [(rel_path + entry, spec) for rel_path, spec in specs],
+                    exclude,
+                )
+
+    def _scan(self, directory: str) -> _Scan:
+        try:
+            mtime_ns = os.stat(directory).st_mtime_ns
+        except OSError:
+            return []
+        with self._lock:
+            cached = self._scans.get(directory)
+            if cached is not None and cached[0] == mtime_ns:
+                self._scans.move_to_end(directory)
+                return cached[1]
+        directories: _Scan = []
+        files: _Scan = []
+        try:
+            with os.scandir(directory) as it:
+                for entry in it:
+                    try:
+                        is_dir = entry.is_dir()
+                        # Leave out broken symlinks
+                        if entry.is_symlink() and not os.path.exists(entry.path):
+                            continue
+                    except OSError:
+                        continue
+                    (directories if is_dir else files).append((entry.name, is_dir))
+        except OSError:
+            return []
+        directories.sort(key=lambda e: e[0].lower())
+        files.sort(key=lambda e: e[0].lower())
+        scan = directories + files
+        with self._lock:
+            self._scans[directory] = (mtime_ns, scan)
+            self._scans.move_to_end(directory)
+            while len(self._scans) > self.max_directories:
+                self._scans.popitem(last=False)
+        return scan
+
+    def _get_gitignore(self, directory: str) -> PathSpec | None:
+        gitignore_path = os.path.join(directory, '.gitignore')
+        try:
+            st = os.stat(gitignore_path)
+        except OSError:
+            self._gitignores.pop(directory, None)
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._gitignores.get(directory)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        try:
+            with open(gitignore_path, encoding='utf-8', errors='replace') as f:
+                spec = PathSpec.from_lines(GitWildMatchPattern, f.read().splitlines())
+        except OSError:
+            return None
+        self._gitignores[directory] = (key, spec)
+        return spec
+
+    @staticmethod
+    def _get_ancestors(path: str, root: str | None) -> list[str]:
+        """Get the directories from root down to path, or path alone if it is not under root."""
+        if root is None:
+            return [path]
+        root = os.path.abspath(root)
+        if os.path.commonpath([root, path]) != root:
+            return [path]
+        ancestors = [root]
+        for part in os.path.relpath(path, root).split(os.sep):
+            if part != '.':
+                ancestors.append(os.path.join(ancestors[-1], part))
+        return ancestors
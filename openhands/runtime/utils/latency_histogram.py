@@ -0,0 +1,73 @@
+import bisect
+import threading
+
+# Upper bounds of the buckets, in seconds
+DEFAULT_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+    120.0,
+)
+
+
+class LatencyHistogram:
+    """Counts latencies in fixed buckets, so that percentiles can be estimated in constant memory."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        # One more count for the latencies above the last bucket
+        self._counts = [0] * (len(buckets) + 1)
+        self._count = 0
+        self._total = 0.0
+        self._max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        with self._lock:
+            self._counts[bisect.bisect_left(self.buckets, latency)] += 1
+            self._count += 1
+            self._total += latency
+            self._max = max(self._max, latency)
+
+    def percentile(self, percentile: float) -> float:
+        """Estimate a percentile (between 0 and 100) as the upper bound of the bucket it falls in."""
+        with self._lock:
+            if not self._count:
+                return 0.0
+            rank = percentile / 100 * self._count
+            seen = 0
+            for bound, count in zip(self.buckets, self._counts):
+                seen += count
+                if seen >= rank:
+                    return min(bound, self._max)
+            return self._max
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            count, total, max_latency = self._count, self._total, self._max
+            buckets = {
+                str(bound): count
+                for bound, count in zip(self.buckets, self._counts)
+                if count
+            }
+            if self._counts[-1]:
+                buckets['+Inf'] = self._counts[-1]
+        return {
+            'count': count,
+            'avg': total / count if count else 0.0,
+            'max': max_latency,
+            'p50': self.percentile(50),
+            'p90': self.percentile(90),
+            'p99': self.percentile(99),
+            'buckets': buckets,
+        }
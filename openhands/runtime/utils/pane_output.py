@@ -0,0 +1,139 @@
+import os
+import select
+import shlex
+import shutil
+import tempfile
+import threading
+from typing import Callable
+
+import libtmux
+
+from openhands.core.logger import openhands_logger as logger
+from openhands.events.observation.commands import CMD_OUTPUT_PS1_END
+
+_PS1_END_MARKER = CMD_OUTPUT_PS1_END.strip().encode()
+
+
+class PaneOutputMonitor:
+    """Follows the output of a tmux pane as it is written, without capturing the pane.
+
+    The output of the pane is piped (with `tmux pipe-pane`) into a FIFO that a reader
+    thread drains, counting the bytes written and the PS1 prompts printed. Only the
+    new bytes are scanned for the prompt, and callers can block until the pane
+    writes something instead of polling it. A listener can also be set to receive the
+    raw bytes as they are read.
+    """
+
+    def __init__(self, pane: libtmux.Pane) -> None:
+        self.pane = pane
+        self._condition = threading.Condition()
+        self._bytes_written = 0
+        self._prompts = 0
+        self._closed = False
+        self._fd: int | None = None
+        self._dir: str | None = None
+        self._thread: threading.Thread | None = None
+        self._listener: Callable[[bytes], None] | None = None
+
+    def start(self) -> bool:
+        """Start following the pane. Returns False if the output cannot be piped."""
+        try:
+            self._dir = tempfile.mkdtemp(prefix='openhands-pane-')
+            fifo = os.path.join(self._dir, 'output')
+            os.mkfifo(fifo, 0o600)
+            # Opened for writing as well, so that reads never see end of file, even
+            # before tmux opens the FIFO or after it closes it
+            self._fd = os.open(fifo, os.O_RDWR | os.O_NONBLOCK)
+            self.pane.cmd('pipe-pane', '-o', f'cat > {shlex.quote(fifo)}')
+        except Exception as e:
+            logger.warning(f'Failed to pipe the output of the tmux pane: {e}')
+            self.close()
+            return False
+        self._thread = threading.Thread(
+            target=self._run, name='pane-output-monitor', daemon=True
+        )
+        self._thread.start()
+        return True
+
+    @property
+    def bytes_written(self) -> int:
+        with self._condition:
+            return self._bytes_written
+
+    @property
+    def prompts(self) -> int:
+        """The number of PS1 prompts the pane has printed."""
+        with self._condition:
+            return self._prompts
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def set_listener(self, listener: Callable[[bytes], None] | None) -> None:
+        """Set the function called, from the reader thread, with each chunk the pane writes."""
+        self._listener = listener
+
+    def wait_for_output(self, bytes_written: int, timeout: float) -> int:
+        """Wait until the pane has written more than bytes_written bytes, or the timeout expires.
+
+        Returns the number of bytes written so far.
+        """
+        with self._condition:
+            self._condition.wait_for(
+                lambda: self._bytes_written > bytes_written or self._closed,
+                timeout,
+            )
+            return self._bytes_written
+
+    def close(self) -> None:
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._fd is not None:
+            try:
+                # Without a command, pipe-pane closes the pipe of the pane
+                self.pane.cmd('pipe-pane')
+            except Exception:
+                pass
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def _run(self) -> None:
+        # The end of the previous chunk, in case a prompt is split between two reads
+        carry = b''
+        fd = self._fd
+        while not self._closed and fd is not None:
+            try:
+                readable, _, _ = select.select([fd], [], [], 0.5)
+                if not readable:
+                    continue
+                chunk = os.read(fd, 65536)
+            except BlockingIOError:
+                continue
+            except OSError:
+                # The FIFO was closed
+                break
+            if not chunk:
+                continue
+            data = carry + chunk
+            prompts = data.count(_PS1_END_MARKER)
+            carry = data[-(len(_PS1_END_MARKER) - 1) :]
+            with self._condition:
+                self._bytes_written += len(chunk)
+                self._prompts += prompts
+                self._condition.notify_all()
+            listener = self._listener
+            if listener is not None:
+                try:
+                    listener(chunk)
+                except Exception as e:
+                    logger.debug(f'Pane output listener failed: {e}')
@@ -0,0 +1,424 @@
+"""Classification of shell commands that only read files."""
+
+import re
+from typing import Any, Collection
+
+import bashlex
+
+
+def _options(spec: str) -> frozenset[str]:
+    # Options taking a value end with `=`, like `-n=` for `-n 5`, `-n5` and `--lines=5`
+    return frozenset(spec.split())
+
+
+_NUMBERS = ' '.join(f'-{n}' for n in range(10))
+
+# Programs that only read files and print their results, with the options they may be
+# run with. Any other option, including abbreviations of these, makes the command
+# mutating, as it may make the program write, run other programs or never exit.
+READ_ONLY_PROGRAMS: dict[str, frozenset[str]] = {
+    'basename': _options('-a -s= -z --multiple --suffix= --zero'),
+    'cat': _options(
+        '-A -b -e -E -n -s -t -T -u -v --show-all --number-nonblank --number'
+        ' --squeeze-blank --show-ends --show-tabs --show-nonprinting'
+    ),
+    'comm': _options(
+        '-1 -2 -3 -z --check-order --nocheck-order --output-delimiter= --total'
+        ' --zero-terminated'
+    ),
+    'cut': _options(
+        '-b= -c= -d= -f= -n -s -z --bytes= --characters= --delimiter= --fields='
+        ' --complement --only-delimited --output-delimiter= --zero-terminated'
+    ),
+    # Operands other than +FORMAT set the date, see _has_read_only_operands
+    'date': _options(
+        '-d= -f= -I -r= -R -u --date= --file= --iso-8601 --iso-8601= --reference='
+        ' --rfc-email --rfc-3339= --utc --universal'
+    ),
+    'df': _options(
+        '-a -B= -h -H -i -k -l -P -t= -T -x= --all --block-size= --human-readable'
+        ' --si --inodes --local --portability --print-type --type= --exclude-type='
+        ' --output --output= --total'
+    ),
+    'diff': _options(
+        '-a -b -B -c -C= -d -E -F= -i -I= -N -p -q -r -s -S= -t -T -u -U= -w -W= -x='
+        ' -X= -y -Z --brief --report-identical-files --context --context= --unified'
+        ' --unified= --side-by-side --width= --recursive --new-file'
+        ' --unidirectional-new-file --ignore-case --ignore-file-name-case'
+        ' --no-ignore-file-name-case --ignore-tab-expansion --ignore-trailing-space'
+        ' --ignore-space-change --ignore-all-space --ignore-blank-lines'
+        ' --ignore-matching-lines= --text --strip-trailing-cr --color --color='
+        ' --normal --exclude= --exclude-from= --label= --no-dereference'
+        ' --suppress-common-lines --suppress-blank-empty --show-c-function'
+        ' --show-function-line= --expand-tabs --initial-tab --tabsize= --minimal'
+        ' --speed-large-files --starting-file= --from-file= --to-file='
+    ),
+    'dirname': _options('-z --zero'),
+    'du': _options(
+        '-0 -a -b -B= -c -d= -h -H -k -l -L -m -P -s -t= -x -X= --null --all'
+        ' --apparent-size --block-size= --bytes --total --max-depth= --human-readable'
+        ' --inodes --count-links --dereference --no-dereference --si --summarize'
+        ' --threshold= --time --time= --time-style= --exclude= --exclude-from='
+        ' --one-file-system'
+    ),
+    'echo': frozenset(),
+    'false': frozenset(),
+    'file': _options(
+        '-0 -b -e= -E -f= -F= -h -i -k -L -m= -N -P= -r -s -z -Z --brief --mime'
+        ' --mime-type --mime-encoding --exclude= --files-from= --separator='
+        ' --no-dereference --dereference --keep-going --preserve-date --no-pad'
+        ' --print0 --raw --special-files --uncompress --uncompress-noreport'
+        ' --extension --parameter='
+    ),
+    # The options and expression of find are checked by _find_is_read_only
+    'find': frozenset(),
+    'git': frozenset(),
+    'grep': _options(
+        f'{_NUMBERS} -a -A= -b -B= -c -C= -d= -D= -e= -E -f= -F -G -h -H -i -I -l -L'
+        ' -m= -n -o -P -q -r -R -s -T -U -v -w -x -y -z -Z --after-context='
+        ' --before-context= --context= --basic-regexp --extended-regexp'
+        ' --fixed-strings --perl-regexp --regexp= --file= --ignore-case'
+        ' --no-ignore-case --word-regexp --line-regexp --null-data --no-messages'
+        ' --invert-match --max-count= --byte-offset --line-number --no-line-number'
+        ' --line-buffered --with-filename --no-filename --label= --only-matching'
+        ' --quiet --silent --binary-files= --text --directories= --devices='
+        ' --exclude= --exclude-from= --exclude-dir= --include= --recursive'
+        ' --dereference-recursive --files-without-match --files-with-matches'
+        ' --count --initial-tab --null --binary --color --color= --colour --colour='
+    ),
+    'head': _options(
+        f'{_NUMBERS} -c= -n= -q -v -z --bytes= --lines= --quiet --silent --verbose'
+        ' --zero-terminated'
+    ),
+    'ls': _options(
+        '-1 -a -A -b -B -c -C -d -D -f -F -g -G -h -H -i -I= -k -l -L -m -n -N -o -p'
+        ' -q -Q -r -R -s -S -t -T= -u -U -v -w= -x -X -Z --all --almost-all --author'
+        ' --escape --block-size= --ignore-backups --color --color= --directory'
+        ' --dired --classify --classify= --file-type --format= --full-time'
+        ' --group-directories-first --no-group --human-readable --si'
+        ' --dereference-command-line --dereference-command-line-symlink-to-dir'
+        ' --hide= --hyperlink --hyperlink= --indicator-style= --inode --ignore='
+        ' --kibibytes --dereference --literal --numeric-uid-gid --hide-control-chars'
+        ' --show-control-chars --quote-name --quoting-style= --reverse --recursive'
+        ' --size --sort= --time= --time-style= --tabsize= --width= --context --zero'
+    ),
+    'nl': _options(
+        '-b= -d= -f= -h= -i= -l= -n= -p -s= -v= -w= --body-numbering='
+        ' --section-delimiter= --footer-numbering= --header-numbering='
+        ' --line-increment= --join-blank-lines= --number-format= --no-renumber'
+        ' --number-separator= --starting-line-number= --number-width='
+    ),
+    'printf': frozenset(),
+    'pwd': _options('-L -P'),
+    'readlink': _options(
+        '-e -f -m -n -q -s -v -z --canonicalize --canonicalize-existing'
+        ' --canonicalize-missing --no-newline --quiet --silent --verbose --zero'
+    ),
+    'realpath': _options(
+        '-e -L -m -P -q -s -z --canonicalize-existing --canonicalize-missing'
+        ' --logical --physical --quiet --relative-to= --relative-base= --strip'
+        ' --no-symlinks --zero'
+    ),
+    'rg': _options(
+        f'{_NUMBERS} -0 -a -A= -b -B= -c -C= -d= -e= -E= -f= -F -g= -H -i -I -j= -l'
+        ' -L -m= -M= -n -N -o -p -P -q -r= -s -S -t= -T= -u -U -v -w -x --regexp='
+        ' --file= --after-context= --before-context= --context= --binary --text'
+        ' --byte-offset --case-sensitive --ignore-case --smart-case --color='
+        ' --colors= --column --no-column --context-separator= --count'
+        ' --count-matches --crlf --encoding= --engine= --field-context-separator='
+        ' --field-match-separator= --files --files-with-matches'
+        ' --files-without-match --fixed-strings --follow --glob= --iglob='
+        ' --glob-case-insensitive --heading --no-heading --hidden --no-hidden'
+        ' --ignore-file= --ignore-file-case-insensitive --invert-match --json'
+        ' --line-buffered --line-number --no-line-number --line-regexp'
+        ' --max-columns= --max-columns-preview --max-count= --max-depth='
+        ' --max-filesize= --multiline --multiline-dotall --no-config --no-ignore'
+        ' --no-ignore-dot --no-ignore-exclude --no-ignore-files --no-ignore-global'
+        ' --no-ignore-parent --no-ignore-vcs --no-messages --null --null-data'
+        ' --one-file-system --only-matching --passthru --path-separator= --pcre2'
+        ' --pretty --quiet --replace= --sort= --sortr= --stats --threads= --trim'
+        ' --type= --type-not= --type-list --unrestricted --vimgrep --with-filename'
+        ' --no-filename --word-regexp'
+    ),
+    'sort': _options(
+        '-b -c -C -d -f -g -h -i -k= -m -M -n -r -R -s -t= -u -V -z'
+        ' --ignore-leading-blanks --dictionary-order --ignore-case'
+        ' --general-numeric-sort --ignore-nonprinting --month-sort'
+        ' --human-numeric-sort --numeric-sort --random-sort --reverse --sort='
+        ' --version-sort --check --check= --key= --merge --stable'
+        ' --field-separator= --unique --zero-terminated'
+    ),
+    'stat': _options(
+        '-c= -f -L -t --cached= --dereference --file-system --format= --printf= --terse'
+    ),
+    'tail': _options(
+        f'{_NUMBERS} -c= -n= -q -v -z --bytes= --lines= --quiet --silent --verbose'
+        ' --zero-terminated'
+    ),
+    'test': frozenset(),
+    'tr': _options(
+        '-c -C -d -s -t --complement --delete --squeeze-repeats --truncate-set1'
+    ),
+    'tree': _options(
+        '-a -A -c -C -d -D -f -F -g -h -i -I= -J -l -L= -n -N -p -P= -q -Q -r -s -S'
+        ' -t -u -U -v -x -X --noreport --charset= --filelimit= --filesfirst'
+        ' --dirsfirst --du --gitignore --ignore-case --info --inodes --device'
+        ' --matchdirs --metafirst --prune --si --sort= --timefmt='
+    ),
+    'true': frozenset(),
+    # A second operand is the output file, see _has_read_only_operands
+    'uniq': _options(
+        '-c -d -D -f= -i -s= -u -w= -z --count --repeated --all-repeated'
+        ' --all-repeated= --group --group= --skip-fields= --ignore-case'
+        ' --skip-chars= --unique --check-chars= --zero-terminated'
+    ),
+    'wc': _options(
+        '-c -l -L -m -w --bytes --chars --lines --max-line-length --words --total='
+    ),
+    'which': _options('-a -s'),
+}
+for _program in ('md5sum', 'sha1sum', 'sha256sum'):
+    READ_ONLY_PROGRAMS[_program] = _options(
+        '-b -c -t -w -z --binary --check --tag --text --zero --ignore-missing'
+        ' --quiet --status --strict --warn'
+    )
+for _program in ('egrep', 'fgrep'):
+    READ_ONLY_PROGRAMS[_program] = READ_ONLY_PROGRAMS['grep']
+
+# Programs whose arguments are never options that matter
+ANY_ARGUMENT_PROGRAMS = frozenset({'echo', 'false', 'test', 'true'})
+# Shell builtins, which only take options before their operands
+BUILTIN_PROGRAMS = frozenset({'printf', 'pwd'})
+
+# The expression of find may use these tests, actions and operators, those ending with
+# `=` taking a value
+FIND_EXPRESSION = _options(
+    '! ( ) , -a -and -o -or -not -amin= -anewer= -atime= -cmin= -cnewer= -ctime='
+    ' -depth -empty -executable -false -follow -fstype= -gid= -group= -ilname='
+    ' -iname= -inum= -ipath= -iregex= -iwholename= -links= -lname= -ls -maxdepth='
+    ' -mindepth= -mmin= -mount -mtime= -name= -newer= -nogroup -noleaf -nouser'
+    ' -path= -perm= -print -print0 -printf= -prune -quit -readable -regex='
+    ' -regextype= -samefile= -size= -true -type= -uid= -used= -user= -wholename='
+    ' -writable -xdev -xtype= -ignore_readdir_race -noignore_readdir_race'
+)
+_FIND_NEWER = re.compile(r'^-newer[aBcmt][aBcmt]$')
+_FIND_OPTION = re.compile(r'^-([HLP]|D|O[0-9]*)$')
+
+# git subcommands that only read the repository
+GIT_READ_SUBCOMMANDS = frozenset(
+    {
+        'blame',
+        'cat-file',
+        'check-ignore',
+        'describe',
+        'diff',
+        'diff-files',
+        'diff-index',
+        'diff-tree',
+        'for-each-ref',
+        'grep',
+        'log',
+        'ls-files',
+        'ls-tree',
+        'merge-base',
+        'name-rev',
+        'rev-list',
+        'rev-parse',
+        'shortlog',
+        'show',
+        'status',
+    }
+)
+GIT_READ_REMOTE_COMMANDS = frozenset({'-v', '--verbose', 'get-url', 'show'})
+GIT_READ_BRANCH_OPTIONS = frozenset(
+    {'-a', '--all', '-r', '--remotes', '-v', '-vv', '--list', '--show-current'}
+)
+# Options git may be run with before the subcommand. Others, like `-c`, can make it
+# run any program.
+GIT_GLOBAL_OPTIONS = _options(
+    '-C= -P --no-pager --git-dir= --work-tree= --bare --no-replace-objects'
+    ' --literal-pathspecs --glob-pathspecs --noglob-pathspecs --icase-pathspecs'
+    ' --no-optional-locks'
+)
+# Options of the read subcommands that write files or run other programs. git also
+# accepts any unambiguous prefix of a long option.
+GIT_UNSAFE_OPTIONS = frozenset({'--output', '--ext-diff', '--open-files-in-pager'})
+
+# A history expansion or quick substitution of the interactive shell
+_HISTORY_EXPANSION = re.compile(r'![^\s=(]|^\s*\^', re.MULTILINE)
+
+
+def _parse_options(
+    allowed: frozenset[str], args: list[str], permute: bool = True
+) -> list[str] | None:
+    """Get the operands of a program, or None if it is given an option that is not allowed.
+
+    With permute, options may follow operands, as GNU programs allow.
+    """
+    operands: list[str] = []
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        i += 1
+        if arg == '--':
+            operands += args[i:]
+            break
+        if not arg.startswith('-') or arg == '-':
+            operands.append(arg)
+            if not permute:
+                operands += args[i:]
+                break
+        elif arg.startswith('--'):
+            name, sep, _ = arg.partition('=')
+            if sep:
+                if name + '=' not in allowed:
+                    return None
+            elif name + '=' in allowed and name not in allowed:
+                # The value is the next argument
+                i += 1
+            elif name not in allowed:
+                return None
+        else:
+            # A group of short options, the last of which may take a value
+            for j, char in enumerate(arg[1:], 2):
+                if f'-{char}' in allowed:
+                    continue
+                if f'-{char}=' not in allowed:
+                    return None
+                if j == len(arg):
+                    i += 1
+                break
+    return operands
+
+
+def _has_read_only_operands(program: str, operands: list[str]) -> bool:
+    if program == 'date':
+        return all(operand.startswith('+') for operand in operands)
+    if program == 'uniq':
+        return len(operands) <= 1
+    return True
+
+
+def _find_is_read_only(args: list[str]) -> bool:
+    i = 0
+    # Options, then the starting points, then the expression
+    while i < len(args) and _FIND_OPTION.match(args[i]):
+        i += 2 if args[i] == '-D' else 1
+    while (
+        i < len(args)
+        and not args[i].startswith('-')
+        and args[i] not in ('!', '(', ')', ',')
+    ):
+        i += 1
+    while i < len(args):
+        arg = args[i]
+        i += 1
+        if arg + '=' in FIND_EXPRESSION or _FIND_NEWER.match(arg):
+            # The value is the next argument
+            i += 1
+        elif arg not in FIND_EXPRESSION:
+            return False
+    return True
+
+
+def _git_is_read_only(args: list[str]) -> bool:
+    operands = _parse_options(GIT_GLOBAL_OPTIONS, args, permute=False)
+    if not operands:
+        return False
+    subcommand, rest = operands[0], operands[1:]
+    for arg in rest:
+        if arg == '--':
+            break
+        if arg.startswith('--'):
+            name = arg.partition('=')[0]
+            if len(name) > 2 and any(
+                option.startswith(name) for option in GIT_UNSAFE_OPTIONS
+            ):
+                return False
+        elif subcommand == 'grep' and arg.startswith('-') and 'O' in arg:
+            # `-O<pager>` opens the matching files in a pager
+            return False
+    if subcommand == 'remote':
+        return not rest or rest[0] in GIT_READ_REMOTE_COMMANDS
+    if subcommand == 'branch':
+        return all(arg in GIT_READ_BRANCH_OPTIONS for arg in rest)
+    return subcommand in GIT_READ_SUBCOMMANDS
+
+
+def _program_is_read_only(program: str, args: list[str]) -> bool:
+    if program in ANY_ARGUMENT_PROGRAMS:
+        return True
+    if program == 'git':
+        return _git_is_read_only(args)
+    if program == 'find':
+        return _find_is_read_only(args)
+    operands = _parse_options(
+        READ_ONLY_PROGRAMS[program], args, permute=program not in BUILTIN_PROGRAMS
+    )
+    return operands is not None and _has_read_only_operands(program, operands)
+
+
+def _is_expanded(word: Any) -> bool:
+    # Parameters, special parameters like $? and $!, tildes and substitutions all
+    # depend on the state of the shell
+    return bool(getattr(word, 'parts', None))
+
+
+def _is_read_only_node(node: Any, shell_names: Collection[str]) -> bool:
+    kind = node.kind
+    if kind in ('list', 'pipeline'):
+        return all(_is_read_only_node(part, shell_names) for part in node.parts)
+    if kind == 'operator':
+        # Background jobs outlive the command
+        return node.op in ('&&', '||', ';', '\n')
+    if kind == 'pipe':
+        return node.pipe == '|'
+    if kind != 'command':
+        # Compound commands, functions, subshells...
+        return False
+
+    words: list[str] = []
+    for part in node.parts:
+        if part.kind == 'word':
+            if _is_expanded(part):
+                return False
+            words.append(part.word)
+        elif part.kind == 'redirect':
+            if getattr(part, 'heredoc', None) is not None:
+                return False
+            if part.type == '>&' and isinstance(part.output, int):
+                continue
+            if _is_expanded(part.output):
+                return False
+            if part.type == '<':
+                continue
+            if part.type == '>' and getattr(part.output, 'word', None) == '/dev/null':
+                continue
+            return False
+        else:
+            # Assignments
+            return False
+
+    if not words or words[0] not in READ_ONLY_PROGRAMS or words[0] in shell_names:
+        return False
+    return _program_is_read_only(words[0], words[1:])
+
+
+def is_read_only_command(command: str, shell_names: Collection[str] = ()) -> bool:
+    """Check whether a command only runs programs that read, without depending on the state of the shell.
+
+    The command may chain (`&&`, `||`, `;`) and pipe the programs of READ_ONLY_PROGRAMS
+    with the options they allow, and redirect from files and to /dev/null. Any other
+    shell syntax, including expansions of variables, assignments, command
+    substitutions, background jobs and compound commands, makes the command mutating.
+    shell_names are the functions and aliases of the shell, which do not run the
+    programs they name.
+    """
+    if not command.strip() or '\\\n' in command or _HISTORY_EXPANSION.search(command):
+        return False
+    try:
+        nodes = bashlex.parse(command)
+    except Exception:
+        # bashlex raises a variety of errors on syntax it does not support
+        return False
+    return all(_is_read_only_node(node, shell_names) for node in nodes)
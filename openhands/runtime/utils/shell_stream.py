@@ -0,0 +1,134 @@
+"""Live output of the commands run in the bash session, streamed while they run.
+
+The raw bytes the tmux pane writes are turned into plain text by ShellOutputFilter,
+and handed from the thread reading the pane to the coroutine sending them to the
+client through an OutputStreamBuffer. The observation of the command is still built
+from the pane once it completes: the stream is only a preview of its output.
+"""
+
+import asyncio
+import codecs
+import re
+import threading
+from typing import Callable
+
+from openhands.events.observation.commands import (
+    CMD_OUTPUT_PS1_BEGIN,
+    CMD_OUTPUT_PS1_END,
+)
+
+_PS1_BEGIN = CMD_OUTPUT_PS1_BEGIN.strip()
+_PS1_END = CMD_OUTPUT_PS1_END.strip()
+_PS1_BLOCK = re.compile(
+    f'\n?{re.escape(_PS1_BEGIN)}.*?{re.escape(_PS1_END)}\n?', re.DOTALL
+)
+# CSI sequences (colors, cursor moves, modes), OSC sequences (titles) and other escapes
+_ESCAPE_SEQUENCE = re.compile(
+    r'\x1b\[[0-?]*[ -/]*[@-~]|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)|\x1b[@-Z\\-_]'
+)
+_INCOMPLETE_ESCAPE_SEQUENCE = re.compile(
+    r'\x1b(?:\[[0-?]*[ -/]*|\][^\x07\x1b]*\x1b?)?$'
+)
+
+
+class ShellOutputFilter:
+    """Turns the raw bytes written by the tmux pane into the text printed by a command.
+
+    Escape sequences, carriage returns and the PS1 prompts are removed, and with
+    skip_echo the first line, the command echoed by the terminal, is dropped. Text
+    that could be the start of an escape sequence or prompt split between two chunks
+    is held back until the next chunk.
+    """
+
+    def __init__(self, on_output: Callable[[str], None], skip_echo: bool) -> None:
+        self._on_output = on_output
+        self._skip_echo = skip_echo
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._pending = ''
+
+    def __call__(self, chunk: bytes) -> None:
+        text = self._pending + self._decoder.decode(chunk)
+        text, self._pending = self._split_complete(text)
+        text = _ESCAPE_SEQUENCE.sub('', text).replace('\r', '')
+        text = _PS1_BLOCK.sub('', text)
+        if self._skip_echo:
+            _, newline, text = text.partition('\n')
+            self._skip_echo = not newline
+        if text:
+            self._on_output(text)
+
+    @staticmethod
+    def _split_complete(text: str) -> tuple[str, str]:
+        """Split text into what can be filtered now and what must wait for the next chunk."""
+        cut = len(text)
+        # An unterminated prompt
+        begin = text.rfind(_PS1_BEGIN)
+        if begin != -1 and text.find(_PS1_END, begin) == -1:
+            cut = begin
+        # The start of the marker of a prompt
+        for length in range(min(len(_PS1_BEGIN) - 1, cut), 0, -1):
+            if _PS1_BEGIN.startswith(text[cut - length : cut]):
+                cut -= length
+                break
+        # An unterminated escape sequence
+        match = _INCOMPLETE_ESCAPE_SEQUENCE.search(text, 0, cut)
+        if match is not None:
+            cut = match.start()
+        return text[:cut], text[cut:]
+
+
+class OutputStreamBuffer:
+    """Text written by a thread and read by a coroutine, bounded to max_chars.
+
+    Writes never block, so that a slow reader never stalls the thread reading the pane:
+    the text written while the reader is busy is sent as one chunk, and when more than
+    max_chars are waiting, the oldest are dropped and replaced by a note.
+    """
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, max_chars: int = 1024 * 1024
+    ) -> None:
+        self._loop = loop
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._chunks: list[str] = []
+        self._size = 0
+        self._dropped = 0
+        self._closed = False
+        self._ready = asyncio.Event()
+
+    def write(self, text: str) -> None:
+        with self._lock:
+            if self._closed:
+                return
+            self._chunks.append(text)
+            self._size += len(text)
+            if self._size > self.max_chars:
+                data = ''.join(self._chunks)
+                excess = len(data) - self.max_chars
+                self._dropped += excess
+                self._chunks = [data[excess:]]
+                self._size = self.max_chars
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+        self._loop.call_soon_threadsafe(self._ready.set)
+
+    async def read(self) -> str | None:
+        """Wait for the text written since the last read. Returns None once closed and drained."""
+        while True:
+            with self._lock:
+                if self._chunks:
+                    text = ''.join(self._chunks)
+                    if self._dropped:
+                        text = f'[... {self._dropped} characters skipped ...]\n{text}'
+                    self._chunks = []
+                    self._size = 0
+                    self._dropped = 0
+                    return text
+                if self._closed:
+                    return None
+                self._ready.clear()
+            await self._ready.wait()
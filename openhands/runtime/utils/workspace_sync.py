@@ -0,0 +1,253 @@
+"""Incremental sync of directory trees between the host and the sandbox.
+
+Both sides describe a tree with a manifest mapping each file, by its path relative to
+the root of the tree, to its size, modification time and SHA-256 hash. Files are only
+hashed if the other side has a file of the same size at the same path, as files of
+different sizes differ anyway. Only the files whose size or hash differ are
+transferred, as an uncompressed tar stream that is built and extracted on the fly,
+without temporary archives.
+
+Extracted files are written next to their destination and renamed into place once
+complete, so an interrupted transfer only leaves complete files behind, and syncing
+again resumes by transferring the files that are still missing or stale.
+"""
+
+import hashlib
+import io
+import os
+import stat
+import tarfile
+import time
+import zipfile
+from collections import OrderedDict
+from typing import Callable, Iterable, Iterator, Mapping
+
+from openhands.core.logger import openhands_logger as logger
+
+CHUNK_SIZE = 1024 * 1024
+
+_BLOCK_SIZE = tarfile.BLOCKSIZE
+_PART_SUFFIX = '.oh-sync-part'
+
+# (size, mtime_ns, sha256) of a file, with an empty sha256 if the file was not hashed
+ManifestEntry = tuple[int, int, str]
+Manifest = dict[str, ManifestEntry]
+
+
+class ManifestBuilder:
+    """Builds the manifests of directory trees, only hashing files that changed since the last build."""
+
+    def __init__(self, max_files: int = 100_000) -> None:
+        self.max_files = max_files
+        # absolute path -> (size, mtime_ns, sha256), least recently used first
+        self._hashes: OrderedDict[str, ManifestEntry] = OrderedDict()
+
+    def build(self, root: str, sizes: Mapping[str, int] | None = None) -> Manifest:
+        """Build the manifest of the regular files under root. Returns an empty manifest if root does not exist.
+
+        If sizes is given, only the files with the same size in sizes are hashed.
+        """
+        manifest: Manifest = {}
+        if not os.path.isdir(root):
+            return manifest
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith(_PART_SUFFIX):
+                    continue
+                path = os.path.join(dirpath, filename)
+                rel_path = os.path.relpath(path, root).replace(os.sep, '/')
+                try:
+                    entry = self.get_entry(
+                        path, None if sizes is None else sizes.get(rel_path, -1)
+                    )
+                except OSError:
+                    # Removed while walking, or not a readable file
+                    continue
+                if entry is not None:
+                    manifest[rel_path] = entry
+        return manifest
+
+    def get_entry(self, path: str, size: int | None = None) -> ManifestEntry | None:
+        """Get the entry of the file at path, only hashing it if size is None or its size."""
+        st = os.stat(path)
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        cached = self._hashes.get(path)
+        if cached is not None and cached[:2] == (st.st_size, st.st_mtime_ns):
+            self._hashes.move_to_end(path)
+            return cached
+        if size is not None and size != st.st_size:
+            return (st.st_size, st.st_mtime_ns, '')
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            while chunk := f.read(CHUNK_SIZE):
+                digest.update(chunk)
+        entry = (st.st_size, st.st_mtime_ns, digest.hexdigest())
+        self._hashes[path] = entry
+        self._hashes.move_to_end(path)
+        while len(self._hashes) > self.max_files:
+            self._hashes.popitem(last=False)
+        return entry
+
+
+def get_sizes(manifest: Manifest) -> dict[str, int]:
+    """Get the size of each file of a manifest, to only hash the files of that size on the other side."""
+    return {rel_path: entry[0] for rel_path, entry in manifest.items()}
+
+
+def get_changed_files(source: Manifest, destination: Manifest) -> list[str]:
+    """Get the paths of the files of source that are missing or different in destination."""
+    changed = []
+    for rel_path, (size, _, sha256) in source.items():
+        entry = destination.get(rel_path)
+        # Files that were not hashed on either side are compared by size alone
+        if (
+            entry is None
+            or entry[0] != size
+            or not sha256
+            or not entry[2]
+            or entry[2] != sha256
+        ):
+            changed.append(rel_path)
+    return changed
+
+
+def is_in_tree(root: str, rel_path: str) -> bool:
+    """Whether the path relative to root stays under root, once symbolic links are resolved."""
+    root = os.path.realpath(root)
+    path = os.path.realpath(os.path.join(root, rel_path))
+    return os.path.commonpath([root, path]) == root
+
+
+def iter_tar(root: str, rel_paths: Iterable[str]) -> Iterator[bytes]:
+    """Stream a tar archive of the given files under root, one chunk at a time.
+
+    Files that disappeared since they were listed, or whose path leaves root, are skipped.
+    """
+    for rel_path in rel_paths:
+        path = os.path.join(root, rel_path)
+        if not is_in_tree(root, rel_path):
+            logger.warning(f'Skipping {rel_path!r} in sync, it is not under {root}')
+            continue
+        try:
+            f = open(path, 'rb')
+        except OSError as e:
+            logger.debug(f'Skipping {path} in sync: {e}')
+            continue
+        with f:
+            st = os.fstat(f.fileno())
+            info = tarfile.TarInfo(rel_path)
+            info.size = st.st_size
+            info.mtime = st.st_mtime
+            info.mode = st.st_mode & 0o777
+            yield info.tobuf(tarfile.PAX_FORMAT)
+            remaining = st.st_size
+            while remaining > 0:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    # Truncated while reading, pad to the size in the header
+                    chunk = b'\0' * remaining
+                remaining -= len(chunk)
+                yield chunk
+            padding = -st.st_size % _BLOCK_SIZE
+            if padding:
+                yield b'\0' * padding
+    yield b'\0' * (2 * _BLOCK_SIZE)
+
+
+class ChunkReader(io.RawIOBase):
+    """A readable file object over a function returning the next chunk of a stream, or b'' at its end."""
+
+    def __init__(self, next_chunk: Callable[[], bytes]) -> None:
+        self._next_chunk = next_chunk
+        self._buffer = b''
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, b) -> int:  # type: ignore[no-untyped-def]
+        while not self._buffer and not self._eof:
+            self._buffer = self._next_chunk()
+            self._eof = not self._buffer
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
+def extract_tar(
+    fileobj: io.RawIOBase | io.BufferedIOBase, destination: str
+) -> list[str]:
+    """Extract the regular files of a tar stream into destination, returning their relative paths.
+
+    Each file is written to a temporary file and renamed into place once complete.
+    Members that are not regular files, or whose path leaves destination, are skipped.
+    """
+    destination = os.path.realpath(destination)
+    os.makedirs(destination, exist_ok=True)
+    extracted = []
+    with tarfile.open(fileobj=fileobj, mode='r|') as tar:
+        for member in tar:
+            path = os.path.realpath(os.path.join(destination, member.name))
+            if not member.isfile() or not is_in_tree(destination, member.name):
+                logger.warning(f'Skipping member {member.name!r} of synced archive')
+                continue
+            src = tar.extractfile(member)
+            assert src is not None
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            part_path = path + _PART_SUFFIX
+            try:
+                with open(part_path, 'wb') as dst:
+                    while chunk := src.read(CHUNK_SIZE):
+                        dst.write(chunk)
+                os.chmod(part_path, member.mode & 0o777 or 0o644)
+                os.utime(part_path, (time.time(), member.mtime))
+                os.replace(part_path, path)
+            finally:
+                if os.path.exists(part_path):
+                    os.unlink(part_path)
+            extracted.append(member.name)
+    return extracted
+
+
+class _ChunkWriter:
+    """An unseekable file object collecting what is written, for streaming archives."""
+
+    def __init__(self) -> None:
+        self.chunks: list[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def take(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def iter_zip(root: str) -> Iterator[bytes]:
+    """Stream a zip archive of the files under root, one chunk at a time."""
+    writer = _ChunkWriter()
+    with zipfile.ZipFile(writer, 'w') as zipf:  # type: ignore[call-overload]
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    f = open(path, 'rb')
+                except OSError as e:
+                    logger.debug(f'Skipping {path} in zip: {e}')
+                    continue
+                with f:
+                    info = zipfile.ZipInfo.from_file(path, os.path.relpath(path, root))
+                    with zipf.open(info, 'w') as dst:
+                        while chunk := f.read(CHUNK_SIZE):
+                            dst.write(chunk)
+                            if data := writer.take():
+                                yield data
+    if data := writer.take():
+        yield data
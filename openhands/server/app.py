@@ -1,3 +1,4 @@
+import asyncio
 import contextlib
 import warnings
 from contextlib import asynccontextmanager
@@ -14,6 +15,7 @@ from fastapi import (
 
 import openhands.agenthub  # noqa F401 (we import this to get the agents registered)
 from openhands import __version__
+from openhands.llm.model_info_cache import prefetch_model_info
 from openhands.server.routes.conversation import app as conversation_api_router
 from openhands.server.routes.feedback import app as feedback_api_router
 from openhands.server.routes.files import app as files_api_router
@@ -29,7 +31,7 @@ from openhands.server.routes.secrets import app as secrets_router
 from openhands.server.routes.security import app as security_api_router
 from openhands.server.routes.settings import app as settings_router
 from openhands.server.routes.trajectory import app as trajectory_router
-from openhands.server.shared import conversation_manager
+from openhands.server.shared import config, conversation_manager
 
 mcp_app = mcp_server.http_app(path='/mcp')
 
@@ -48,8 +50,10 @@ def combine_lifespans(*lifespans):
 
 @asynccontextmanager
 async def _lifespan(app: FastAPI) -> AsyncIterator[None]:
+    prefetch_task = asyncio.create_task(prefetch_model_info(config.get_llm_config()))
     async with conversation_manager:
         yield
+    prefetch_task.cancel()
 
 
 app = FastAPI(
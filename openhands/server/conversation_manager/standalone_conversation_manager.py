@@ -2,7 +2,7 @@ import asyncio
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Callable, Iterable
+from typing import Any, Callable, Iterable
 
 import socketio
 
@@ -23,7 +23,7 @@ from openhands.storage.data_models.conversation_metadata import ConversationMeta
 from openhands.storage.data_models.conversation_status import ConversationStatus
 from openhands.storage.data_models.settings import Settings
 from openhands.storage.files import FileStore
-from openhands.utils.async_utils import GENERAL_TIMEOUT, call_async_from_sync, wait_all
+from openhands.utils.async_utils import wait_all
 from openhands.utils.conversation_summary import (
     auto_generate_title,
     get_default_conversation_title,
@@ -34,6 +34,8 @@ from openhands.utils.shutdown_listener import should_continue
 from .conversation_manager import ConversationManager
 
 _CLEANUP_INTERVAL = 15
+# Events update the metadata of their conversation at most once per this many seconds
+_CONVERSATION_UPDATE_DELAY = 1
 UPDATED_AT_CALLBACK_ID = 'updated_at_callback_id'
 
 
@@ -61,6 +63,11 @@ class StandaloneConversationManager(ConversationManager):
     _conversations_lock: asyncio.Lock = field(default_factory=asyncio.Lock)
     _cleanup_task: asyncio.Task | None = None
     _conversation_store_class: type[ConversationStore] | None = None
+    # conversation_id -> (user_id, settings, latest event with LLM metrics) of the update to make
+    _pending_conversation_updates: dict[
+        str, tuple[str | None, Settings, Any | None]
+    ] = field(default_factory=dict)
+    _conversation_update_tasks: dict[str, asyncio.Task] = field(default_factory=dict)
 
     async def __aenter__(self):
         self._cleanup_task = asyncio.create_task(self._cleanup_stale())
@@ -389,6 +396,8 @@ class StandaloneConversationManager(ConversationManager):
             await self.sio.disconnect(connection_id)
             self._local_connection_id_to_session_id.pop(connection_id, None)
 
+        await self._flush_conversation_update(sid)
+
         session = self._local_agent_loops_by_sid.pop(sid, None)
         if not session:
             logger.warning(f'no_session_to_close:{sid}', extra={'session_id': sid})
@@ -421,10 +430,11 @@ class StandaloneConversationManager(ConversationManager):
         conversation_id: str,
         settings: Settings,
     ) -> Callable:
+        loop = asyncio.get_running_loop()
+
         def callback(event, *args, **kwargs):
-            call_async_from_sync(
-                self._update_conversation_for_event,
-                GENERAL_TIMEOUT,
+            loop.call_soon_threadsafe(
+                self._queue_conversation_update,
                 user_id,
                 conversation_id,
                 settings,
@@ -433,9 +443,57 @@ class StandaloneConversationManager(ConversationManager):
 
         return callback
 
+    def _queue_conversation_update(
+        self,
+        user_id: str | None,
+        conversation_id: str,
+        settings: Settings,
+        event=None,
+    ) -> None:
+        """Update the metadata of a conversation after a delay, with the updates of the events until then."""
+        pending = self._pending_conversation_updates.get(conversation_id)
+        if not getattr(event, 'llm_metrics', None) and pending is not None:
+            # Keep the latest metrics
+            event = pending[2]
+        self._pending_conversation_updates[conversation_id] = (
+            user_id,
+            settings,
+            event,
+        )
+        if conversation_id not in self._conversation_update_tasks:
+            self._conversation_update_tasks[conversation_id] = asyncio.create_task(
+                self._update_conversation_after_delay(conversation_id)
+            )
+
+    async def _update_conversation_after_delay(self, conversation_id: str) -> None:
+        try:
+            while True:
+                await asyncio.sleep(_CONVERSATION_UPDATE_DELAY)
+                pending = self._pending_conversation_updates.pop(conversation_id, None)
+                if pending is None:
+                    return
+                user_id, settings, event = pending
+                try:
+                    await self._update_conversation_for_event(
+                        user_id, conversation_id, settings, event
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f'Error updating conversation metadata: {e}',
+                        extra={'session_id': conversation_id},
+                    )
+        finally:
+            self._conversation_update_tasks.pop(conversation_id, None)
+
+    async def _flush_conversation_update(self, conversation_id: str) -> None:
+        """Wait for the pending metadata update of a conversation to be made."""
+        task = self._conversation_update_tasks.get(conversation_id)
+        if task is not None:
+            await task
+
     async def _update_conversation_for_event(
         self,
-        user_id: str,
+        user_id: str | None,
         conversation_id: str,
         settings: Settings,
         event=None,
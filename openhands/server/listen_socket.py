@@ -7,19 +7,8 @@ from urllib.parse import parse_qs
 from socketio.exceptions import ConnectionRefusedError
 
 from openhands.core.logger import openhands_logger as logger
-from openhands.events.action import (
-    NullAction,
-)
-from openhands.events.action.agent import RecallAction
-from openhands.events.async_event_store_wrapper import AsyncEventStoreWrapper
+from openhands.core.schema import ActionType, ObservationType
 from openhands.events.event_store import EventStore
-from openhands.events.observation import (
-    NullObservation,
-)
-from openhands.events.observation.agent import (
-    AgentStateChangedObservation,
-)
-from openhands.events.serialization import event_to_dict
 from openhands.experiments.experiment_manager import ExperimentManagerImpl
 from openhands.integrations.provider import PROVIDER_TOKEN_TYPE, ProviderToken
 from openhands.integrations.service_types import ProviderType
@@ -37,6 +26,12 @@ from openhands.storage.conversation.conversation_validator import (
     create_conversation_validator,
 )
 from openhands.storage.data_models.user_secrets import UserSecrets
+from openhands.utils.async_utils import call_sync_from_async
+
+# Clients connecting with batch_events=true receive the replayed events as lists of
+# up to this many events, in oh_event_batch messages
+REPLAY_BATCH_SIZE = 100
+_SKIPPED_ACTIONS = (ActionType.NULL, ActionType.RECALL)
 
 
 def create_provider_tokens_object(
@@ -87,6 +82,7 @@ async def connect(connection_id: str, environ: dict) -> None:
     try:
         logger.info(f'sio:connect: {connection_id}')
         query_params = parse_qs(environ.get('QUERY_STRING', ''))
+        batch_events = query_params.get('batch_events', ['false'])[0] == 'true'
         latest_event_id_str = query_params.get('latest_event_id', [-1])[0]
         try:
             latest_event_id = int(latest_event_id_str)
@@ -138,30 +134,9 @@ async def connect(connection_id: str, environ: dict) -> None:
         logger.info(
             f'Replaying event stream for conversation {conversation_id} with connection_id {connection_id}...'
         )
-        agent_state_changed = None
-
-        # Create an async store to replay events
-        async_store = AsyncEventStoreWrapper(event_store, latest_event_id + 1)
-
-        # Process all available events
-        async for event in async_store:
-            logger.debug(f'oh_event: {event.__class__.__name__}')
-
-            if isinstance(
-                event,
-                (NullAction, NullObservation, RecallAction),
-            ):
-                continue
-            elif isinstance(event, AgentStateChangedObservation):
-                agent_state_changed = event
-            else:
-                await sio.emit('oh_event', event_to_dict(event), to=connection_id)
-
-        # Send the agent state changed event last if we have one
-        if agent_state_changed:
-            await sio.emit(
-                'oh_event', event_to_dict(agent_state_changed), to=connection_id
-            )
+        await _replay_events(
+            connection_id, event_store, latest_event_id + 1, batch_events
+        )
 
         logger.info(
             f'Finished replaying event stream for conversation {conversation_id}'
@@ -189,6 +164,44 @@ async def connect(connection_id: str, environ: dict) -> None:
         raise
 
 
+async def _replay_events(
+    connection_id: str, event_store: EventStore, start_id: int, batch_events: bool
+) -> None:
+    """Send the stored events from start_id to a connection, as they are stored.
+
+    Pages of events are read in a thread and sent without being decoded, in batches
+    if the client supports them. The latest agent state change is sent last.
+    """
+    agent_state_changed = None
+    batch: list[dict] = []
+    pages = iter(event_store.search_event_dict_pages(start_id))
+    while True:
+        page = await call_sync_from_async(next, pages, None)
+        if page is None:
+            break
+        for data in page:
+            if (
+                data.get('action') in _SKIPPED_ACTIONS
+                or data.get('observation') == ObservationType.NULL
+            ):
+                continue
+            if data.get('observation') == ObservationType.AGENT_STATE_CHANGED:
+                agent_state_changed = data
+            elif batch_events:
+                batch.append(data)
+            else:
+                await sio.emit('oh_event', data, to=connection_id)
+        if len(batch) >= REPLAY_BATCH_SIZE:
+            await sio.emit('oh_event_batch', batch, to=connection_id)
+            batch = []
+    if batch:
+        await sio.emit('oh_event_batch', batch, to=connection_id)
+
+    # Send the agent state changed event last if we have one
+    if agent_state_changed:
+        await sio.emit('oh_event', agent_state_changed, to=connection_id)
+
+
 @sio.event
 async def oh_user_action(connection_id: str, data: dict[str, Any]) -> None:
     await conversation_manager.send_to_event_stream(connection_id, data)
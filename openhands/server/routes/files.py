@@ -1,10 +1,8 @@
 import os
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, status
-from fastapi.responses import FileResponse, JSONResponse
-from pathspec import PathSpec
-from pathspec.patterns import GitWildMatchPattern
+from fastapi import APIRouter, Depends, HTTPException, Request, UploadFile, status
+from fastapi.responses import FileResponse, JSONResponse, Response
 from starlette.background import BackgroundTask
 
 from openhands.core.exceptions import AgentRuntimeUnavailableError
@@ -34,20 +32,27 @@ app = APIRouter(
 
 @app.get(
     '/list-files',
-    response_model=list[str],
+    response_model=None,
     responses={
+        200: {'description': 'Files listed', 'model': list[str]},
+        304: {'description': 'Files unchanged since the If-None-Match ETag'},
+        400: {'description': 'Listing options not supported by the runtime'},
         404: {'description': 'Runtime not initialized', 'model': dict},
         500: {'description': 'Error listing or filtering files', 'model': dict},
     },
 )
 async def list_files(
+    request: Request,
     conversation: ServerConversation = Depends(get_conversation),
     path: str | None = None,
-) -> list[str] | JSONResponse:
+    recursive: bool = False,
+    details: bool = False,
+) -> Response:
     """List files in the specified path.
 
     This function retrieves a list of files from the agent's runtime file store,
-    excluding certain system and hidden files/directories.
+    excluding certain system and hidden files/directories and the files ignored by
+    .gitignore files.
 
     To list files:
     ```sh
@@ -57,9 +62,13 @@ async def list_files(
     Args:
         request (Request): The incoming request object.
         path (str, optional): The path to list files from. Defaults to None.
+        recursive (bool, optional): Whether to list the files of subdirectories too.
+        details (bool, optional): Whether to return the size and modification time of
+            each file, as objects with path, size and mtime keys.
 
     Returns:
-        list: A list of file names in the specified path.
+        list: A list of file names in the specified path, with an ETag header. If the
+            ETag in the If-None-Match header still matches, a 304 response instead.
 
     Raises:
         HTTPException: If there's an error listing the files.
@@ -72,42 +81,35 @@ async def list_files(
 
     runtime: Runtime = conversation.runtime
     try:
-        file_list = await call_sync_from_async(runtime.list_files, path)
-    except AgentRuntimeUnavailableError as e:
-        logger.error(f'Error listing files: {e}')
+        # The runtime leaves out gitignored files, with the .gitignore files it caches
+        listing = await call_sync_from_async(
+            runtime.get_file_listing, path, recursive, details, FILES_TO_IGNORE
+        )
+    except NotImplementedError as e:
         return JSONResponse(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={'error': f'Error listing files: {e}'},
+            status_code=status.HTTP_400_BAD_REQUEST,
+            content={'error': str(e)},
         )
-    if path:
-        file_list = [os.path.join(path, f) for f in file_list]
-
-    file_list = [f for f in file_list if f not in FILES_TO_IGNORE]
-
-    async def filter_for_gitignore(file_list: list[str], base_path: str) -> list[str]:
-        gitignore_path = os.path.join(base_path, '.gitignore')
-        try:
-            read_action = FileReadAction(gitignore_path)
-            observation = await call_sync_from_async(runtime.run_action, read_action)
-            spec = PathSpec.from_lines(
-                GitWildMatchPattern, observation.content.splitlines()
-            )
-        except Exception as e:
-            logger.warning(e)
-            return file_list
-        file_list = [entry for entry in file_list if not spec.match_file(entry)]
-        return file_list
-
-    try:
-        file_list = await filter_for_gitignore(file_list, '')
     except AgentRuntimeUnavailableError as e:
-        logger.error(f'Error filtering files: {e}')
+        logger.error(f'Error listing files: {e}')
         return JSONResponse(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            content={'error': f'Error filtering files: {e}'},
+            content={'error': f'Error listing files: {e}'},
         )
+    headers = {'ETag': listing.etag}
+    if request.headers.get('If-None-Match') == listing.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-    return file_list
+    file_list: list[Any] = listing.entries
+    if path:
+        if details:
+            file_list = [
+                {**entry, 'path': os.path.join(path, entry['path'])}
+                for entry in file_list
+            ]
+        else:
+            file_list = [os.path.join(path, f) for f in file_list]
+    return JSONResponse(content=file_list, headers=headers)
 
 
 # NOTE: We use response_model=None for endpoints that can return multiple response types
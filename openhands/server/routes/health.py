@@ -2,6 +2,7 @@ import time
 
 from fastapi import FastAPI, Request
 
+from openhands.events.decoded_event_cache import decoded_event_cache
 from openhands.runtime.utils.system_stats import get_system_stats
 
 start_time = time.time()
@@ -27,6 +28,7 @@ def add_health_endpoints(app: FastAPI):
             'uptime': uptime,
             'idle_time': idle_time,
             'resources': get_system_stats(),
+            'event_cache': decoded_event_cache.get_stats(),
         }
         return response
 
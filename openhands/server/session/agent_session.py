@@ -16,6 +16,7 @@ from openhands.core.schema.agent import AgentState
 from openhands.events.action import ChangeAgentStateAction, MessageAction
 from openhands.events.event import Event, EventSource
 from openhands.events.stream import EventStream
+from openhands.events.write_behind import WriteBehindConfig
 from openhands.integrations.provider import (
     CUSTOM_SECRETS_TYPE,
     PROVIDER_TOKEN_TYPE,
@@ -64,16 +65,18 @@ class AgentSession:
         file_store: FileStore,
         status_callback: Callable | None = None,
         user_id: str | None = None,
+        write_behind: WriteBehindConfig | None = None,
     ) -> None:
         """Initializes a new instance of the Session class
 
         Parameters:
         - sid: The session ID
         - file_store: Instance of the FileStore
+        - write_behind: Options for persisting events in batches, if enabled
         """
 
         self.sid = sid
-        self.event_stream = EventStream(sid, file_store, user_id)
+        self.event_stream = EventStream(sid, file_store, user_id, write_behind)
         self.file_store = file_store
         self._status_callback = status_callback
         self.user_id = user_id
@@ -230,7 +233,11 @@ class AgentSession:
                 )
                 break
         if self.event_stream is not None:
-            self.event_stream.close()
+            try:
+                self.event_stream.close()
+            except Exception as e:
+                # Still close the rest of the session
+                self.logger.error(f'Error closing event stream of {self.sid}: {e}')
         if self.controller is not None:
             self.controller.save_state()
             await self.controller.close()
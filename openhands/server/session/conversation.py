@@ -27,6 +27,8 @@ class ServerConversation:
         self.config = config
         self.file_store = file_store
         self.user_id = user_id
+        # The agent session of the conversation writes its events, this stream only
+        # reads them, so it needs no writer thread
         self.event_stream = EventStream(sid, file_store, user_id)
         if config.security.security_analyzer:
             self.security_analyzer = options.SecurityAnalyzers.get(
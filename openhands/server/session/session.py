@@ -1,5 +1,6 @@
 import asyncio
 import time
+from collections import deque
 from copy import deepcopy
 from logging import LoggerAdapter
 
@@ -27,6 +28,7 @@ from openhands.events.observation.agent import RecallObservation
 from openhands.events.observation.error import ErrorObservation
 from openhands.events.serialization import event_from_dict, event_to_dict
 from openhands.events.stream import EventStreamSubscriber
+from openhands.events.write_behind import WriteBehindConfig
 from openhands.llm.llm import LLM
 from openhands.server.session.agent_session import AgentSession
 from openhands.server.session.conversation_init_data import ConversationInitData
@@ -34,6 +36,10 @@ from openhands.storage.data_models.settings import Settings
 from openhands.storage.files import FileStore
 
 ROOM_KEY = 'room:{sid}'
+# Queued messages are sent to the clients in batches of up to this many, and senders
+# wait while this many are queued, so that slow clients do not buffer without bound
+SEND_BATCH_SIZE = 64
+MAX_PENDING_SENDS = 1000
 
 
 class Session:
@@ -66,6 +72,7 @@ class Session:
             file_store,
             status_callback=self.queue_status_message,
             user_id=user_id,
+            write_behind=WriteBehindConfig.from_config(config),
         )
         self.agent_session.event_stream.subscribe(
             EventStreamSubscriber.SERVER, self.on_event, self.sid
@@ -74,8 +81,13 @@ class Session:
         self.config = deepcopy(config)
         self.loop = asyncio.get_event_loop()
         self.user_id = user_id
+        self._send_queue: deque[dict[str, object]] = deque()
+        self._send_task: asyncio.Task | None = None
+        self._send_queue_drained = asyncio.Event()
 
     async def close(self) -> None:
+        if self._send_task is not None:
+            await self._send_task
         if self.sio:
             await self.sio.emit(
                 'oh_event',
@@ -299,17 +311,44 @@ class Session:
         self.agent_session.event_stream.add_event(event, EventSource.USER)
 
     async def send(self, data: dict[str, object]) -> None:
+        """Queue a message for the clients. Waits while too many messages are queued."""
         if asyncio.get_running_loop() != self.loop:
-            self.loop.create_task(self._send(data))
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self._queue_send(data), self.loop)
+            )
+            return
+        await self._queue_send(data)
+
+    async def _queue_send(self, data: dict[str, object]) -> None:
+        while self.is_alive and len(self._send_queue) >= MAX_PENDING_SENDS:
+            self._send_queue_drained.clear()
+            await self._send_queue_drained.wait()
+        if not self.is_alive:
             return
-        await self._send(data)
+        self._send_queue.append(data)
+        if self._send_task is None or self._send_task.done():
+            # The task starts on the next iteration of the loop, so the messages
+            # queued until then are sent in the same batch
+            self._send_task = self.loop.create_task(self._flush_send_queue())
+
+    async def _flush_send_queue(self) -> None:
+        while self._send_queue:
+            batch = [
+                self._send_queue.popleft()
+                for _ in range(min(SEND_BATCH_SIZE, len(self._send_queue)))
+            ]
+            if not await self._send(batch):
+                self._send_queue.clear()
+            self._send_queue_drained.set()
 
-    async def _send(self, data: dict[str, object]) -> bool:
+    async def _send(self, batch: list[dict[str, object]]) -> bool:
         try:
             if not self.is_alive:
                 return False
             if self.sio:
-                await self.sio.emit('oh_event', data, to=ROOM_KEY.format(sid=self.sid))
+                room = ROOM_KEY.format(sid=self.sid)
+                for data in batch:
+                    await self.sio.emit('oh_event', data, to=room)
             await asyncio.sleep(0.001)  # This flushes the data to the client
             self.last_active_ts = int(time.time())
             return True
@@ -31,6 +31,7 @@ file_store: FileStore = get_file_store(
     config.file_store_path,
     config.file_store_web_hook_url,
     config.file_store_web_hook_headers,
+    config.file_store_event_format,
 )
 
 client_manager = None
@@ -15,7 +15,10 @@ def get_file_store(
     file_store_path: str | None = None,
     file_store_web_hook_url: str | None = None,
     file_store_web_hook_headers: dict | None = None,
+    file_store_event_format: str = 'files',
 ) -> FileStore:
+    if file_store_event_format not in ('files', 'segmented'):
+        raise ValueError(f'Unknown file store event format: {file_store_event_format}')
     store: FileStore
     if file_store_type == 'local':
         if file_store_path is None:
@@ -40,4 +43,10 @@ def get_file_store(
             file_store_web_hook_url,
             httpx.Client(headers=file_store_web_hook_headers or {}),
         )
+    if file_store_event_format == 'segmented' and not store.supports_append:
+        # Every event would rewrite, and send to the web hook, its whole segment
+        raise ValueError(
+            f"The 'segmented' event format needs a file store that can append, which {type(store).__name__} cannot"
+        )
+    store.event_format = file_store_event_format
     return store
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import threading
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -24,6 +25,16 @@ from openhands.utils.search_utils import offset_to_page_id, page_id_to_offset
 
 conversation_metadata_type_adapter = TypeAdapter(ConversationMetadata)
 
+# Maps the id of each conversation to its creation time, so that a page of conversations
+# can be found without loading the metadata of every conversation. It starts with a dot
+# so that it is not listed as a conversation.
+CONVERSATION_INDEX_FILENAME = '.conversation_index.json'
+_CONVERSATION_INDEX_VERSION = 1
+_conversation_index_lock = threading.Lock()
+# The index this process last read or wrote, by filename, so that saving the metadata of
+# an indexed conversation does not reread it
+_cached_conversation_indexes: dict[str, dict[str, str]] = {}
+
 
 @dataclass
 class FileConversationStore(ConversationStore):
@@ -33,10 +44,16 @@ class FileConversationStore(ConversationStore):
         json_str = conversation_metadata_type_adapter.dump_json(metadata)
         path = self.get_conversation_metadata_filename(metadata.conversation_id)
         await call_sync_from_async(self.file_store.write, path, json_str)
+        await call_sync_from_async(
+            self._update_index, metadata.conversation_id, _sort_key(metadata)
+        )
 
     async def get_metadata(self, conversation_id: str) -> ConversationMetadata:
+        return await call_sync_from_async(self._read_metadata, conversation_id)
+
+    def _read_metadata(self, conversation_id: str) -> ConversationMetadata:
         path = self.get_conversation_metadata_filename(conversation_id)
-        json_str = await call_sync_from_async(self.file_store.read, path)
+        json_str = self.file_store.read(path)
 
         # Validate the JSON
         json_obj = json.loads(json_str)
@@ -55,6 +72,7 @@ class FileConversationStore(ConversationStore):
             Path(self.get_conversation_metadata_filename(conversation_id)).parent
         )
         await call_sync_from_async(self.file_store.delete, path)
+        await call_sync_from_async(self._update_index, conversation_id, None)
 
     async def exists(self, conversation_id: str) -> bool:
         path = self.get_conversation_metadata_filename(conversation_id)
@@ -69,32 +87,116 @@ class FileConversationStore(ConversationStore):
         page_id: str | None = None,
         limit: int = 20,
     ) -> ConversationMetadataResultSet:
-        conversations: list[ConversationMetadata] = []
-        metadata_dir = self.get_conversation_metadata_dir()
-        try:
-            conversation_ids = [
-                path.split('/')[-2]
-                for path in self.file_store.list(metadata_dir)
-                if not path.startswith(f'{metadata_dir}/.')
-            ]
-        except FileNotFoundError:
-            return ConversationMetadataResultSet([])
+        index = await call_sync_from_async(self._load_index)
+        # Newest first, as ISO timestamps sort chronologically
+        conversation_ids = sorted(index, key=lambda cid: index[cid], reverse=True)
         num_conversations = len(conversation_ids)
         start = page_id_to_offset(page_id)
         end = min(limit + start, num_conversations)
         conversations = []
-        for conversation_id in conversation_ids:
+        missing_ids = []
+        for conversation_id in conversation_ids[start:end]:
             try:
                 conversations.append(await self.get_metadata(conversation_id))
+            except FileNotFoundError:
+                # Deleted without going through this store
+                missing_ids.append(conversation_id)
             except Exception:
                 logger.warning(
                     f'Could not load conversation metadata: {conversation_id}'
                 )
-        conversations.sort(key=_sort_key, reverse=True)
-        conversations = conversations[start:end]
+        for conversation_id in missing_ids:
+            await call_sync_from_async(self._update_index, conversation_id, None)
         next_page_id = offset_to_page_id(end, end < num_conversations)
         return ConversationMetadataResultSet(conversations, next_page_id)
 
+    def get_conversation_index_filename(self) -> str:
+        return f'{self.get_conversation_metadata_dir()}/{CONVERSATION_INDEX_FILENAME}'
+
+    def _load_index(self) -> dict[str, str]:
+        """Load the creation time of each conversation, indexing the conversations it misses.
+
+        Processes do not share a lock, so an update of the index can be lost. The index
+        is reconciled with the listed conversations on every load, which only reads the
+        metadata of the conversations missing from it.
+        """
+        conversation_ids = self._list_conversation_ids()
+        with _conversation_index_lock:
+            index = self._read_index()
+            conversations = dict(index) if index is not None else {}
+            for conversation_id in conversations.keys() - conversation_ids:
+                del conversations[conversation_id]
+            for conversation_id in conversation_ids - conversations.keys():
+                try:
+                    metadata = self._read_metadata(conversation_id)
+                except FileNotFoundError:
+                    continue
+                except Exception:
+                    logger.warning(
+                        f'Could not load conversation metadata: {conversation_id}'
+                    )
+                    continue
+                conversations[conversation_id] = _sort_key(metadata)
+            if conversations != index:
+                if index is not None:
+                    logger.info('Conversation index was out of date, updating it')
+                self._write_index(conversations)
+        return conversations
+
+    def _list_conversation_ids(self) -> set[str]:
+        metadata_dir = self.get_conversation_metadata_dir()
+        try:
+            return {
+                path.split('/')[-2]
+                for path in self.file_store.list(metadata_dir)
+                if not path.startswith(f'{metadata_dir}/.')
+            }
+        except FileNotFoundError:
+            return set()
+
+    def _update_index(self, conversation_id: str, created_at: str | None) -> None:
+        """Set the creation time of a conversation in the index, or remove it if None."""
+        filename = self.get_conversation_index_filename()
+        with _conversation_index_lock:
+            cached = _cached_conversation_indexes.get(filename)
+            if cached is not None and cached.get(conversation_id) == created_at:
+                return
+            conversations = self._read_index()
+            if conversations is None:
+                # Built from the stored metadata on the next search
+                return
+            if conversations.get(conversation_id) == created_at:
+                return
+            if created_at is None:
+                conversations.pop(conversation_id, None)
+            else:
+                conversations[conversation_id] = created_at
+            self._write_index(conversations)
+
+    def _read_index(self) -> dict[str, str] | None:
+        """Read the index, or None if it is missing or invalid."""
+        filename = self.get_conversation_index_filename()
+        try:
+            index = json.loads(self.file_store.read(filename))
+            if index.get('version') != _CONVERSATION_INDEX_VERSION:
+                raise ValueError(f'Unknown version {index.get("version")}')
+            conversations = dict(index['conversations'])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, AttributeError, TypeError) as e:
+            logger.warning(f'Invalid conversation index, rebuilding it: {e}')
+            return None
+        _cached_conversation_indexes[filename] = dict(conversations)
+        return conversations
+
+    def _write_index(self, conversations: dict[str, str]) -> None:
+        filename = self.get_conversation_index_filename()
+        content = json.dumps(
+            {'version': _CONVERSATION_INDEX_VERSION, 'conversations': conversations}
+        )
+        self.file_store.write(filename, content)
+        _cached_conversation_indexes[filename] = dict(conversations)
+
     def get_conversation_metadata_dir(self) -> str:
         return CONVERSATION_BASE_DIR
 
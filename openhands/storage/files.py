@@ -2,6 +2,13 @@ from abc import abstractmethod
 
 
 class FileStore:
+    # Layout used when persisting conversation events: 'files' writes one JSON file per
+    # event, 'segmented' appends records to rolling segment files (see events/event_log.py)
+    event_format: str = 'files'
+    # Whether append only writes the appended contents. The default append rewrites the
+    # whole file, which the 'segmented' event format would do on every event.
+    supports_append: bool = False
+
     @abstractmethod
     def write(self, path: str, contents: str | bytes) -> None:
         pass
@@ -17,3 +24,26 @@ class FileStore:
     @abstractmethod
     def delete(self, path: str) -> None:
         pass
+
+    def append(self, path: str, contents: str | bytes) -> None:
+        """Append to a file, creating it if it does not exist.
+
+        Stores without native append support fall back to rewriting the whole file.
+        """
+        try:
+            existing = self.read(path)
+        except FileNotFoundError:
+            existing = ''
+        if isinstance(contents, bytes):
+            contents = contents.decode('utf-8')
+        self.write(path, existing + contents)
+
+    def read_range(self, path: str, start: int = 0, end: int | None = None) -> bytes:
+        """Read the bytes in [start, end) of a file. If end is None, read to the end of the file."""
+        return self.read(path).encode('utf-8')[start:end]
+
+    def sync(self, path: str) -> None:
+        """Flush a written file to durable storage.
+
+        Writes to object stores are durable once they return, so this is a no-op by default.
+        """
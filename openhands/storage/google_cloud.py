@@ -35,6 +35,20 @@ class GoogleCloudFileStore(FileStore):
         except NotFound as err:
             raise FileNotFoundError(err)
 
+    def read_range(self, path: str, start: int = 0, end: int | None = None) -> bytes:
+        if end is not None and end <= start:
+            return b''
+        blob: Blob = self.bucket.blob(path)
+        try:
+            # The end offset of download_as_bytes is inclusive
+            return bytes(
+                blob.download_as_bytes(
+                    start=start, end=None if end is None else end - 1
+                )
+            )
+        except NotFound as err:
+            raise FileNotFoundError(err)
+
     def list(self, path: str) -> list[str]:
         if not path or path == '/':
             path = ''
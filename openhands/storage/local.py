@@ -7,6 +7,7 @@ from openhands.storage.files import FileStore
 
 class LocalFileStore(FileStore):
     root: str
+    supports_append = True
 
     def __init__(self, root: str):
         if root.startswith('~'):
@@ -31,6 +32,28 @@ class LocalFileStore(FileStore):
         with open(full_path, 'r') as f:
             return f.read()
 
+    def append(self, path: str, contents: str | bytes) -> None:
+        full_path = self.get_full_path(path)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        mode = 'a' if isinstance(contents, str) else 'ab'
+        with open(full_path, mode) as f:
+            f.write(contents)
+
+    def read_range(self, path: str, start: int = 0, end: int | None = None) -> bytes:
+        full_path = self.get_full_path(path)
+        with open(full_path, 'rb') as f:
+            f.seek(start)
+            if end is None:
+                return f.read()
+            return f.read(max(end - start, 0))
+
+    def sync(self, path: str) -> None:
+        fd = os.open(self.get_full_path(path), os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
     def list(self, path: str) -> list[str]:
         full_path = self.get_full_path(path)
         files = [os.path.join(path, f) for f in os.listdir(full_path)]
@@ -18,6 +18,20 @@ def get_conversation_event_filename(
     return f'{get_conversation_events_dir(sid, user_id)}{id}.json'
 
 
+def get_conversation_event_log_dir(sid: str, user_id: str | None = None) -> str:
+    return f'{get_conversation_dir(sid, user_id)}event_log/'
+
+
+def get_conversation_event_index_dir(sid: str, user_id: str | None = None) -> str:
+    return f'{get_conversation_dir(sid, user_id)}event_index/'
+
+
+def get_conversation_event_manifest_filename(
+    sid: str, user_id: str | None = None
+) -> str:
+    return f'{get_conversation_dir(sid, user_id)}event_manifest.json'
+
+
 def get_conversation_metadata_filename(sid: str, user_id: str | None = None) -> str:
     return f'{get_conversation_dir(sid, user_id)}metadata.json'
 
@@ -28,3 +42,15 @@ def get_conversation_init_data_filename(sid: str, user_id: str | None = None) ->
 
 def get_conversation_agent_state_filename(sid: str, user_id: str | None = None) -> str:
     return f'{get_conversation_dir(sid, user_id)}agent_state.pkl'
+
+
+def get_conversation_agent_state_json_filename(
+    sid: str, user_id: str | None = None
+) -> str:
+    return f'{get_conversation_dir(sid, user_id)}agent_state.json'
+
+
+def get_conversation_agent_metrics_log_filename(
+    sid: str, user_id: str | None = None, name: str = 'metrics'
+) -> str:
+    return f'{get_conversation_dir(sid, user_id)}agent_state_{name}.jsonl'
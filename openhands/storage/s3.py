@@ -1,5 +1,5 @@
 import os
-from typing import Any, TypedDict
+from typing import Any, Iterator, TypedDict
 
 import boto3
 import botocore
@@ -81,6 +81,33 @@ class S3FileStore(FileStore):
                 f"Error: Failed to read from bucket '{self.bucket}' at path {path}: {e}"
             )
 
+    def read_range(self, path: str, start: int = 0, end: int | None = None) -> bytes:
+        if end is not None and end <= start:
+            return b''
+        byte_range = f'bytes={start}-' if end is None else f'bytes={start}-{end - 1}'
+        try:
+            response: GetObjectOutputDict = self.client.get_object(
+                Bucket=self.bucket, Key=path, Range=byte_range
+            )
+            with response['Body'] as stream:
+                return bytes(stream.read())
+        except botocore.exceptions.ClientError as e:
+            if e.response['Error']['Code'] == 'InvalidRange':
+                # The range starts beyond the end of the object
+                return b''
+            elif e.response['Error']['Code'] == 'NoSuchBucket':
+                raise FileNotFoundError(
+                    f"Error: The bucket '{self.bucket}' does not exist."
+                )
+            elif e.response['Error']['Code'] == 'NoSuchKey':
+                raise FileNotFoundError(
+                    f"Error: The object key '{path}' does not exist in bucket '{self.bucket}'."
+                )
+            else:
+                raise FileNotFoundError(
+                    f"Error: Failed to read from bucket '{self.bucket}' at path {path}: {e}"
+                )
+
     def list(self, path: str) -> list[str]:
         if not path or path == '/':
             path = ''
@@ -95,14 +122,7 @@ class S3FileStore(FileStore):
         # prefix="foo", delimiter="/"  yields  []  # :(
         results: set[str] = set()
         prefix_len = len(path)
-        response: ListObjectsV2OutputDict = self.client.list_objects_v2(
-            Bucket=self.bucket, Prefix=path
-        )
-        contents = response.get('Contents')
-        if not contents:
-            return []
-        paths = [obj['Key'] for obj in contents]
-        for sub_path in paths:
+        for sub_path in self._list_keys(path):
             if sub_path == path:
                 continue
             try:
@@ -122,11 +142,8 @@ class S3FileStore(FileStore):
                 path = path[:-1]
 
             # Try to delete any child resources (Assume the path is a directory)
-            response = self.client.list_objects_v2(
-                Bucket=self.bucket, Prefix=f'{path}/'
-            )
-            for content in response.get('Contents') or []:
-                self.client.delete_object(Bucket=self.bucket, Key=content['Key'])
+            for key in self._list_keys(f'{path}/'):
+                self.client.delete_object(Bucket=self.bucket, Key=key)
 
             # Next try to delete item as a file
             self.client.delete_object(Bucket=self.bucket, Key=path)
@@ -153,6 +170,14 @@ class S3FileStore(FileStore):
                 f"Error: Failed to delete key '{path}' from bucket '{self.bucket}: {e}"
             )
 
+    def _list_keys(self, prefix: str) -> Iterator[str]:
+        """List all keys with the given prefix. A single list_objects_v2 call returns at most 1000 keys."""
+        paginator = self.client.get_paginator('list_objects_v2')
+        page: ListObjectsV2OutputDict
+        for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix):
+            for obj in page.get('Contents') or []:
+                yield obj['Key']
+
     def _ensure_url_scheme(self, secure: bool, url: str | None) -> str | None:
         if not url:
             return None
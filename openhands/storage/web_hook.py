@@ -50,6 +50,17 @@ class WebHookFileStore(FileStore):
         self.file_store.write(path, contents)
         EXECUTOR.submit(self._on_write, path, contents)
 
+    def append(self, path: str, contents: str | bytes) -> None:
+        """
+        Append contents to a file and trigger a webhook with the full file contents.
+
+        Args:
+            path: The path to append to
+            contents: The contents to append
+        """
+        self.file_store.append(path, contents)
+        EXECUTOR.submit(self._on_append, path)
+
     def read(self, path: str) -> str:
         """
         Read contents from a file.
@@ -62,6 +73,20 @@ class WebHookFileStore(FileStore):
         """
         return self.file_store.read(path)
 
+    def read_range(self, path: str, start: int = 0, end: int | None = None) -> bytes:
+        """
+        Read a byte range from a file.
+
+        Args:
+            path: The path to read from
+            start: The offset of the first byte to read
+            end: The offset after the last byte to read, or None to read to the end
+
+        Returns:
+            The bytes in the requested range
+        """
+        return self.file_store.read_range(path, start, end)
+
     def list(self, path: str) -> list[str]:
         """
         List files in a directory.
@@ -74,6 +99,15 @@ class WebHookFileStore(FileStore):
         """
         return self.file_store.list(path)
 
+    def sync(self, path: str) -> None:
+        """
+        Flush a written file to durable storage.
+
+        Args:
+            path: The path to sync
+        """
+        self.file_store.sync(path)
+
     def delete(self, path: str) -> None:
         """
         Delete a file and trigger a webhook.
@@ -105,6 +139,15 @@ class WebHookFileStore(FileStore):
         response = self.client.post(base_url, content=contents)
         response.raise_for_status()
 
+    def _on_append(self, path: str) -> None:
+        """
+        Send the full contents of a file to the webhook URL after it was appended to.
+
+        Args:
+            path: The path that was appended to
+        """
+        self._on_write(path, self.file_store.read(path))
+
     @tenacity.retry(
         wait=tenacity.wait_fixed(1),
         stop=tenacity.stop_after_attempt(3),
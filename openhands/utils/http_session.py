@@ -1,3 +1,5 @@
+import importlib.util
+import os
 from dataclasses import dataclass, field
 from typing import MutableMapping
 
@@ -5,7 +7,27 @@ import httpx
 
 from openhands.core.logger import openhands_logger as logger
 
-CLIENT = httpx.Client()
+
+def _create_client() -> httpx.Client:
+    """Create the client whose connection pool is shared by all the sessions of the process.
+
+    The pool can be tuned with the HTTP_MAX_CONNECTIONS, HTTP_MAX_KEEPALIVE_CONNECTIONS
+    and HTTP_KEEPALIVE_EXPIRY environment variables. HTTP/2 is negotiated with servers
+    that support it when the h2 package is installed, unless HTTP2_ENABLED is false.
+    """
+    limits = httpx.Limits(
+        max_connections=int(os.getenv('HTTP_MAX_CONNECTIONS', 100)),
+        max_keepalive_connections=int(os.getenv('HTTP_MAX_KEEPALIVE_CONNECTIONS', 20)),
+        keepalive_expiry=float(os.getenv('HTTP_KEEPALIVE_EXPIRY', 30)),
+    )
+    http2 = (
+        os.getenv('HTTP2_ENABLED', 'true').lower() in ('true', '1', 'yes')
+        and importlib.util.find_spec('h2') is not None
+    )
+    return httpx.Client(limits=limits, http2=http2)
+
+
+CLIENT = _create_client()
 
 
 @dataclass